@@ -15,6 +15,9 @@ import app.models.template
 import app.models.component_template_config
 import app.models.application
 import app.models.application_components
+import app.models.applied_manifest
+import app.models.cluster_status
+import app.models.cache_version
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,28 @@
+"""applied_manifest_component
+
+Revision ID: applied_manifest_component
+Revises: cache_versions
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'applied_manifest_component'
+down_revision: Union[str, None] = 'cache_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add component_uuid column to applied_manifests
+    op.add_column('applied_manifests', sa.Column('component_uuid', sa.String(), nullable=True))
+    op.create_index(op.f('ix_applied_manifests_component_uuid'), 'applied_manifests', ['component_uuid'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_applied_manifests_component_uuid'), table_name='applied_manifests')
+    op.drop_column('applied_manifests', 'component_uuid')
@@ -0,0 +1,43 @@
+"""applied_manifests
+
+Revision ID: applied_manifests
+Revises: cluster_gateway_reference
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'applied_manifests'
+down_revision: Union[str, None] = 'cluster_gateway_reference'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create applied_manifests table
+    op.create_table(
+        'applied_manifests',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cluster_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('namespace', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('manifest_hash', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['cluster_id'], ['clusters.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('cluster_id', 'kind', 'namespace', 'name', name='uix_applied_manifest_object')
+    )
+    op.create_index(op.f('ix_applied_manifests_id'), 'applied_manifests', ['id'], unique=False)
+    op.create_index(op.f('ix_applied_manifests_cluster_id'), 'applied_manifests', ['cluster_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_applied_manifests_cluster_id'), table_name='applied_manifests')
+    op.drop_index(op.f('ix_applied_manifests_id'), table_name='applied_manifests')
+    op.drop_table('applied_manifests')
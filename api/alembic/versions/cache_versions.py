@@ -0,0 +1,34 @@
+"""cache_versions
+
+Revision ID: cache_versions
+Revises: cluster_statuses
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'cache_versions'
+down_revision: Union[str, None] = 'cluster_statuses'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create cache_versions table
+    cache_versions = op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # Linha criada aqui para que o primeiro incremento seja sempre um UPDATE
+    op.bulk_insert(cache_versions, [{'name': 'template_sets', 'version': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('cache_versions')
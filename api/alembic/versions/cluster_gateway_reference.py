@@ -0,0 +1,28 @@
+"""cluster_gateway_reference
+
+Revision ID: cluster_gateway_reference
+Revises: initial_schema
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'cluster_gateway_reference'
+down_revision: Union[str, None] = 'initial_schema'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Referência fixa (opcional) do Gateway usado pelos HTTPRoutes do cluster
+    op.add_column('clusters', sa.Column('gateway_namespace', sa.String(), nullable=True))
+    op.add_column('clusters', sa.Column('gateway_name', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('clusters', 'gateway_name')
+    op.drop_column('clusters', 'gateway_namespace')
@@ -0,0 +1,44 @@
+"""cluster_statuses
+
+Revision ID: cluster_statuses
+Revises: applied_manifests
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'cluster_statuses'
+down_revision: Union[str, None] = 'applied_manifests'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create cluster_statuses table
+    op.create_table(
+        'cluster_statuses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cluster_id', sa.Integer(), nullable=False),
+        sa.Column('reachable', sa.Boolean(), nullable=False),
+        sa.Column('latency_ms', sa.Float(), nullable=True),
+        sa.Column('server_version', sa.String(), nullable=True),
+        sa.Column('detail', sa.JSON(), nullable=False),
+        sa.Column('gateway_api_enabled', sa.Boolean(), nullable=False),
+        sa.Column('gateway_resources', sa.JSON(), nullable=False),
+        sa.Column('probed_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['cluster_id'], ['clusters.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('cluster_id')
+    )
+    op.create_index(op.f('ix_cluster_statuses_id'), 'cluster_statuses', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cluster_statuses_id'), table_name='cluster_statuses')
+    op.drop_table('cluster_statuses')
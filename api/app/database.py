@@ -23,3 +23,15 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def close_after(db, func, *args):
+    """
+    Executa func(db, *args) e fecha a sessão em seguida, devolvendo a conexão ao pool.
+    Usado pelos endpoints async antes de aguardar o Kubernetes: a sessão da requisição
+    (a mesma usada na autenticação) não pode ficar presa enquanto um cluster lento responde.
+    """
+    try:
+        return func(db, *args)
+    finally:
+        db.close()
@@ -1,10 +1,10 @@
-from fastapi import Depends, HTTPException, status, Header
+from fastapi import Depends, HTTPException, status, Header, WebSocket
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional, Union
 from datetime import datetime
 from uuid import uuid4
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models.user import User, UserRole
 from app.models.token import Token
 from app.services.auth import AuthService
@@ -12,11 +12,7 @@ from app.services.auth import AuthService
 security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user_or_token(
-    x_tron_token: Optional[str] = Header(None, alias="x-tron-token"),
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
-) -> Union[User, Token]:
+def authenticate(db: Session, x_tron_token: Optional[str], jwt_token: Optional[str]) -> Union[User, Token]:
     """
     Valida autenticação via JWT (Bearer token) ou x-tron-token.
     Retorna User ou Token dependendo do método de autenticação.
@@ -46,13 +42,12 @@ async def get_current_user_or_token(
         return token
 
     # Fallback para JWT
-    if not credentials:
+    if not jwt_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token de autenticação não fornecido"
         )
 
-    jwt_token = credentials.credentials
     payload = AuthService.verify_token(jwt_token)
 
     if payload.get("type") != "access":
@@ -84,6 +79,18 @@ async def get_current_user_or_token(
     return user
 
 
+async def get_current_user_or_token(
+    x_tron_token: Optional[str] = Header(None, alias="x-tron-token"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: Session = Depends(get_db)
+) -> Union[User, Token]:
+    """
+    Valida autenticação via JWT (Bearer token) ou x-tron-token.
+    Retorna User ou Token dependendo do método de autenticação.
+    """
+    return authenticate(db, x_tron_token, credentials.credentials if credentials else None)
+
+
 # Classe auxiliar para simular User quando autenticado via Token
 class TokenUser:
     """Classe simples que simula User para tokens de API"""
@@ -128,3 +135,56 @@ def require_role(allowed_roles: list[UserRole]):
         return current_user
     return role_checker
 
+
+
+# Subprotocolo dos WebSockets de exec. Navegadores não permitem headers customizados em
+# WebSockets e a URL (query params) fica registrada em logs de proxies, então as credenciais
+# vão como subprotocolos adicionais: "bearer.<jwt>" ou "tron-token.<token>"
+WS_SUBPROTOCOL = "tron.exec"
+WS_BEARER_PREFIX = "bearer."
+WS_TRON_TOKEN_PREFIX = "tron-token."
+
+
+def websocket_subprotocol(websocket: WebSocket) -> Optional[str]:
+    """Subprotocolo a ser confirmado no accept (só o WS_SUBPROTOCOL, nunca o que carrega a credencial)."""
+    return WS_SUBPROTOCOL if WS_SUBPROTOCOL in websocket.scope.get("subprotocols", []) else None
+
+
+def websocket_credentials(websocket: WebSocket) -> tuple[Optional[str], Optional[str]]:
+    """
+    Lê as credenciais de uma conexão WebSocket: headers x-tron-token / Authorization
+    (clientes não-navegador) ou subprotocolos em Sec-WebSocket-Protocol.
+
+    Returns:
+        Tupla (x_tron_token, jwt_token)
+    """
+    x_tron_token = websocket.headers.get("x-tron-token")
+    jwt_token = None
+    authorization = websocket.headers.get("authorization")
+    if authorization and authorization.lower().startswith("bearer "):
+        jwt_token = authorization[len("bearer "):]
+
+    for subprotocol in websocket.scope.get("subprotocols", []):
+        if subprotocol.startswith(WS_BEARER_PREFIX) and not jwt_token:
+            jwt_token = subprotocol[len(WS_BEARER_PREFIX):]
+        elif subprotocol.startswith(WS_TRON_TOKEN_PREFIX) and not x_tron_token:
+            x_tron_token = subprotocol[len(WS_TRON_TOKEN_PREFIX):]
+    return x_tron_token, jwt_token
+
+
+def authenticate_websocket(websocket: WebSocket, allowed_roles: list[UserRole]) -> Union[User, TokenUser]:
+    """
+    Autentica uma conexão WebSocket antes do accept (ver websocket_credentials).
+
+    Usa uma sessão própria, fechada antes de retornar: a conexão do pool do banco não
+    fica presa durante a sessão interativa.
+    """
+    x_tron_token, jwt_token = websocket_credentials(websocket)
+
+    db = SessionLocal()
+    try:
+        current_auth = authenticate(db, x_tron_token, jwt_token)
+        current_user = current_auth if isinstance(current_auth, User) else TokenUser(current_auth)
+        return require_role(allowed_roles)(current_user)
+    finally:
+        db.close()
@@ -0,0 +1,3 @@
+# Header com o token (continue do Kubernetes) para buscar a próxima página de uma listagem.
+# Ausente quando não há mais páginas.
+CONTINUE_TOKEN_HEADER = "X-Continue-Token"
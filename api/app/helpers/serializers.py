@@ -1,12 +1,16 @@
 
-def serialize_application_component(application_component):
+def serialize_application_component(application_component, settings_override=None, url_override=None):
     """
     Serializa um ApplicationComponent para uso nos templates Kubernetes.
     Inclui informações do componente, instância, aplicação e ambiente.
+
+    `settings_override` e `url_override` substituem os valores salvos (usado para
+    pré-visualizar alterações, ex: diff de settings ainda não salvos).
     """
     # Fazer uma cópia do settings para não modificar o original
     import copy
-    settings = copy.deepcopy(application_component.settings) if application_component.settings else {}
+    source_settings = application_component.settings if settings_override is None else settings_override
+    settings = copy.deepcopy(source_settings) if source_settings else {}
 
     # Garantir que command seja sempre uma lista quando não for None
     # Isso é necessário porque o schema pode retornar string, lista ou None
@@ -71,7 +75,7 @@ def serialize_application_component(application_component):
         "environment_uuid": str(application_component.instance.environment.uuid),
         "image": application_component.instance.image,
         "version": application_component.instance.version,
-        "url": application_component.url,
+        "url": application_component.url if url_override is None else url_override,
         "enabled": application_component.enabled,
         "settings": settings
     }
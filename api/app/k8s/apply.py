@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import time
+
+from app.k8s.metrics import submit_with_context
+
+
+K8S_APPLY_MAX_WORKERS = int(os.getenv("K8S_APPLY_MAX_WORKERS", "4"))
+
+# Ordem de dependência entre os kinds. Documentos de um mesmo tier são independentes
+# entre si e podem ser aplicados em paralelo; kinds não listados (HPA, HTTPRoute,
+# TCPRoute, UDPRoute, ...) ficam no último tier.
+APPLY_TIERS = (
+    ("Namespace",),
+    ("ConfigMap", "Secret", "Service", "ServiceAccount"),
+    ("Deployment", "CronJob", "StatefulSet", "DaemonSet", "Job"),
+)
+
+# Annotation com o hash do manifesto renderizado, gravada em cada objeto aplicado
+MANIFEST_HASH_ANNOTATION = "tron.io/manifest-hash"
+
+# Labels gravadas em todos os objetos renderizados pelo Tron (usadas no prune de órfãos)
+MANAGED_BY_LABEL = "app.kubernetes.io/managed-by"
+MANAGED_BY_VALUE = "tron"
+COMPONENT_UUID_LABEL = "tron.io/component-uuid"
+
+
+def manifest_key(document: dict) -> tuple:
+    """Identifica um objeto no cluster: (kind, namespace, name)."""
+    metadata = document.get("metadata") or {}
+    return (document.get("kind"), metadata.get("namespace"), metadata.get("name"))
+
+
+def manifest_hash(document: dict) -> str:
+    """Hash estável do manifesto renderizado (ignora a própria annotation de hash)."""
+    metadata = dict(document.get("metadata") or {})
+    annotations = dict(metadata.get("annotations") or {})
+    annotations.pop(MANIFEST_HASH_ANNOTATION, None)
+    if annotations:
+        metadata["annotations"] = annotations
+    else:
+        metadata.pop("annotations", None)
+
+    payload = json.dumps({**document, "metadata": metadata}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def stamp_manifest_hash(document: dict) -> dict:
+    """Retorna uma cópia do documento com a annotation de hash preenchida."""
+    metadata = dict(document.get("metadata") or {})
+    metadata["annotations"] = {
+        **(metadata.get("annotations") or {}),
+        MANIFEST_HASH_ANNOTATION: manifest_hash(document),
+    }
+    return {**document, "metadata": metadata}
+
+
+def get_manifest_hash(document: dict) -> str | None:
+    """Lê a annotation de hash de um documento já marcado."""
+    annotations = (document.get("metadata") or {}).get("annotations") or {}
+    return annotations.get(MANIFEST_HASH_ANNOTATION)
+
+
+def stamp_component_labels(document: dict, component_uuid: str) -> dict:
+    """Retorna uma cópia do documento com as labels managed-by e component-uuid."""
+    metadata = dict(document.get("metadata") or {})
+    metadata["labels"] = {
+        **(metadata.get("labels") or {}),
+        MANAGED_BY_LABEL: MANAGED_BY_VALUE,
+        COMPONENT_UUID_LABEL: component_uuid,
+    }
+    return {**document, "metadata": metadata}
+
+
+def get_component_uuid(document: dict) -> str | None:
+    """Lê a label de component-uuid de um documento (None se ele não foi marcado)."""
+    labels = (document.get("metadata") or {}).get("labels") or {}
+    return labels.get(COMPONENT_UUID_LABEL)
+
+
+def component_label_selector(component_uuid: str) -> str:
+    return f"{MANAGED_BY_LABEL}={MANAGED_BY_VALUE},{COMPONENT_UUID_LABEL}={component_uuid}"
+
+
+def document_tier(document: dict) -> int:
+    """Retorna o índice do tier de dependência de um documento."""
+    kind = document.get("kind")
+    for index, kinds in enumerate(APPLY_TIERS):
+        if kind in kinds:
+            return index
+    return len(APPLY_TIERS)
+
+
+def group_documents_by_tier(yaml_documents, reverse: bool = False) -> list[list[dict]]:
+    """
+    Agrupa os documentos por tier, preservando a ordem original dentro de cada tier.
+    Documentos vazios ou inválidos (template que não renderizou nada) são descartados.
+
+    Args:
+        yaml_documents: Lista de documentos renderizados
+        reverse: Se True, retorna os tiers em ordem inversa (usado para deletes)
+    """
+    tiers = [[] for _ in range(len(APPLY_TIERS) + 1)]
+    for document in yaml_documents:
+        if document is None or not isinstance(document, dict):
+            continue
+        tiers[document_tier(document)].append(document)
+
+    tiers = [tier for tier in tiers if tier]
+    if reverse:
+        tiers.reverse()
+    return tiers
+
+
+def _run_document(apply_document, document: dict) -> tuple[dict, Exception | None]:
+    metadata = document.get("metadata") or {}
+    started_at = time.monotonic()
+    error = None
+    try:
+        apply_document(document)
+    except Exception as e:
+        error = e
+
+    result = {
+        "kind": document.get("kind"),
+        "name": metadata.get("name"),
+        "namespace": metadata.get("namespace"),
+        "status": "error" if error else "ok",
+        "duration_ms": round((time.monotonic() - started_at) * 1000, 2),
+    }
+    if error:
+        result["error"] = str(getattr(error, "detail", error))
+    return result, error
+
+
+def run_in_tiers(executor, tiers: list[list[dict]], apply_document, operation: str) -> dict:
+    """
+    Executa `apply_document` para cada documento, tier a tier.
+
+    Os documentos de um tier são submetidos ao executor do cluster e o próximo tier só
+    começa quando todos terminarem. Se algum documento falhar, os tiers seguintes não são
+    executados e o primeiro erro é relançado.
+
+    Returns:
+        Dict com o resultado e a duração de cada documento
+    """
+    started_at = time.monotonic()
+    results = []
+
+    for tier in tiers:
+        if len(tier) == 1:
+            outcomes = [_run_document(apply_document, tier[0])]
+        else:
+            futures = [
+                submit_with_context(executor, _run_document, apply_document, document) for document in tier
+            ]
+            outcomes = [future.result() for future in futures]
+
+        results.extend(result for result, _ in outcomes)
+
+        errors = [error for _, error in outcomes if error is not None]
+        if errors:
+            print(f"Failed to {operation} documents: {[r for r in results if r['status'] == 'error']}")
+            raise errors[0]
+
+    return {
+        "operation": operation,
+        "results": results,
+        "duration_ms": round((time.monotonic() - started_at) * 1000, 2),
+    }
@@ -0,0 +1,562 @@
+import asyncio
+import codecs
+import json
+import os
+import ssl
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlencode
+
+import httpx
+from fastapi import HTTPException
+from kubernetes.client.rest import ApiException
+from websockets.asyncio.client import connect as websocket_connect
+
+from app.k8s import formatters, metrics, usage
+from app.k8s.breaker import CircuitBreaker, CircuitOpenError
+from app.k8s.client import (
+    K8S_CONNECT_TIMEOUT,
+    K8S_LIST_CHUNK_SIZE,
+    K8S_READ_TIMEOUT,
+    PARTIAL_OBJECT_METADATA_ACCEPT,
+    cluster_label,
+    parse_exec_status,
+)
+
+
+K8S_ASYNC_MAX_CONNECTIONS = int(os.getenv("K8S_ASYNC_MAX_CONNECTIONS", "20"))
+# Tempo máximo sem receber nenhum byte de um stream de logs antes de encerrá-lo
+K8S_LOG_STREAM_IDLE_TIMEOUT = float(os.getenv("K8S_LOG_STREAM_IDLE_TIMEOUT", "300"))
+
+# Canais do subprotocolo de exec do Kubernetes (v4.channel.k8s.io)
+EXEC_SUBPROTOCOL = "v4.channel.k8s.io"
+STDIN_CHANNEL = 0
+STDOUT_CHANNEL = 1
+STDERR_CHANNEL = 2
+ERROR_CHANNEL = 3
+RESIZE_CHANNEL = 4
+
+
+class AsyncK8sClient:
+    """
+    Cliente Kubernetes assíncrono (httpx + websockets) com a mesma superfície do K8sClient
+    para leituras, logs e exec.
+
+    Usado pelos endpoints async, de modo que um API server lento ou travado não ocupe
+    threads do threadpool do FastAPI. As respostas são lidas como JSON cru e formatadas
+    por app.k8s.formatters, sem passar pelos modelos do kubernetes-client.
+    Use app.k8s.registry.get_async_k8s_client para obter instâncias compartilhadas.
+    """
+
+    def __init__(self, url: str, token: str, verify_ssl: bool = False, max_connections: int = K8S_ASYNC_MAX_CONNECTIONS,
+                 breaker: CircuitBreaker = None, cluster_name: str = None,
+                 pod_metrics_cache: usage.PodMetricsCache = None):
+        self.url = url.rstrip("/")
+        self.verify_ssl = verify_ssl
+        self.breaker = breaker or CircuitBreaker()
+        self.pod_metrics_cache = pod_metrics_cache or usage.PodMetricsCache()
+        self.cluster_name = cluster_name or cluster_label(self.url)
+        self._headers = {"Authorization": f"Bearer {token}"}
+        self.http = httpx.AsyncClient(
+            base_url=self.url,
+            headers={**self._headers, "Accept": "application/json"},
+            verify=verify_ssl,
+            timeout=httpx.Timeout(K8S_READ_TIMEOUT, connect=K8S_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def _request(self, method: str, path: str, stream: bool = False, **kwargs) -> httpx.Response:
+        """
+        Executa uma requisição no API server.
+        Erros HTTP e de transporte são convertidos em ApiException, como no cliente síncrono.
+
+        Com stream=True o corpo de uma resposta de sucesso não é lido: o chamador deve
+        consumi-lo e fechar a resposta.
+        """
+        if not metrics.K8S_METRICS_ENABLED:
+            return await self._request_with_breaker(method, path, stream=stream, **kwargs)
+
+        # Instrumentação por cluster/verbo/recurso/operação (ver app.k8s.metrics)
+        started_at = time.monotonic()
+        status = 0
+        response = None
+        try:
+            response = await self._request_with_breaker(method, path, stream=stream, **kwargs)
+            status = response.status_code
+            return response
+        except ApiException as e:
+            status = e.status
+            raise
+        finally:
+            metrics.api_metrics.record(
+                self.cluster_name, method, path, status, time.monotonic() - started_at,
+                bytes_out=len(kwargs.get("content") or b""),
+                bytes_in=len(response.content) if response is not None and not stream else 0,
+            )
+
+    async def _request_with_breaker(self, method: str, path: str, stream: bool = False, **kwargs) -> httpx.Response:
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError as e:
+            raise ApiException(status=503, reason=str(e))
+
+        try:
+            if stream:
+                response = await self.http.send(self.http.build_request(method, path, **kwargs), stream=True)
+            else:
+                response = await self.http.request(method, path, **kwargs)
+        except httpx.TimeoutException as e:
+            self.breaker.record_failure(e)
+            raise ApiException(status=504, reason=f"Timeout calling Kubernetes API: {e}")
+        except httpx.TransportError as e:
+            self.breaker.record_failure(e)
+            raise ApiException(status=503, reason=f"Kubernetes API unreachable: {e}")
+
+        if response.status_code >= 500:
+            self.breaker.record_failure(Exception(f"{response.status_code} {response.reason_phrase}"))
+        else:
+            self.breaker.record_success()
+
+        if response.status_code >= 400:
+            if stream:
+                await response.aread()
+                await response.aclose()
+            error = ApiException(status=response.status_code, reason=response.reason_phrase)
+            error.body = response.text
+            raise error
+        return response
+
+    async def _get_json(self, path: str, params: dict = None, accept: str = None) -> dict:
+        headers = {"Accept": accept} if accept else None
+        response = await self._request(
+            "GET", path, params={k: v for k, v in (params or {}).items() if v}, headers=headers
+        )
+        return response.json()
+
+    async def _list_all(self, path: str, params: dict, accept: str = None) -> list[dict]:
+        """
+        Lista todos os objetos de uma coleção em páginas de K8S_LIST_CHUNK_SIZE (limit/continue),
+        evitando uma única resposta gigante do API server.
+        """
+        items = []
+        continue_token = None
+        while True:
+            page = await self._get_json(
+                path, {**params, "limit": K8S_LIST_CHUNK_SIZE, "continue": continue_token}, accept=accept
+            )
+            items.extend(page.get("items") or [])
+            continue_token = (page.get("metadata") or {}).get("continue")
+            if not continue_token:
+                return items
+
+    async def _list_page(self, path: str, params: dict, limit: int, continue_token: str = None) -> tuple[list[dict], str | None]:
+        """
+        Lista uma única página da coleção.
+
+        Returns:
+            Tupla (objetos, token para a próxima página ou None)
+        """
+        try:
+            page = await self._get_json(path, {**params, "limit": limit, "continue": continue_token})
+        except ApiException as e:
+            if e.status == 410:
+                raise HTTPException(status_code=410, detail="Continue token expired, restart the listing")
+            if e.status == 400 and continue_token:
+                raise HTTPException(status_code=400, detail="Invalid continue token")
+            raise
+        return page.get("items") or [], (page.get("metadata") or {}).get("continue") or None
+
+    async def get_pod_usage(self, namespace: str) -> dict:
+        """Uso real dos pods de um namespace (ver K8sClient.get_pod_usage)."""
+        pod_usage = self.pod_metrics_cache.get(namespace)
+        if pod_usage is not None:
+            return pod_usage
+
+        pod_usage = {}
+        try:
+            pod_usage = usage.build_pod_usage(
+                await self._list_all(usage.POD_METRICS_PATH.format(namespace=namespace), {})
+            )
+        except ApiException as e:
+            # 404: metrics-server não instalado
+            if e.status != 404:
+                print(f"Warning: Could not list pod metrics in namespace '{namespace}': {e}")
+        self.pod_metrics_cache.set(namespace, pod_usage)
+        return pod_usage
+
+    async def list_raw_pods(self, namespace: str, label_selector: str = None) -> list[dict]:
+        """Lista os pods de um namespace como JSON cru (com labels, para agrupar por componente)."""
+        return await self._list_all(f"/api/v1/namespaces/{namespace}/pods", {"labelSelector": label_selector})
+
+    async def list_pod_names(self, namespace: str, label_selector: str = None) -> list[str]:
+        """Lista os nomes dos pods de um namespace (somente metadados, ver K8sClient.list_object_names)."""
+        pods = await self._list_all(
+            f"/api/v1/namespaces/{namespace}/pods",
+            {"labelSelector": label_selector},
+            accept=PARTIAL_OBJECT_METADATA_ACCEPT,
+        )
+        return [(pod.get("metadata") or {}).get("name") for pod in pods]
+
+    async def list_pods(self, namespace: str, label_selector: str = None):
+        """
+        Lista pods de um namespace, opcionalmente filtrados por label selector.
+
+        Returns:
+            Lista de pods com informações formatadas
+        """
+        try:
+            pods = await self._list_all(
+                f"/api/v1/namespaces/{namespace}/pods", {"labelSelector": label_selector}
+            )
+            return [formatters.format_pod(pod) for pod in pods]
+        except ApiException as e:
+            print(f"Erro ao listar pods: {e}")
+            return []
+
+    async def list_jobs(self, namespace: str, label_selector: str = None, field_selector: str = None):
+        """
+        Lista Jobs de um namespace, opcionalmente filtrados por label/field selector.
+
+        Returns:
+            Lista de jobs com informações formatadas
+        """
+        try:
+            jobs = await self._list_all(
+                f"/apis/batch/v1/namespaces/{namespace}/jobs",
+                {"labelSelector": label_selector, "fieldSelector": field_selector},
+            )
+            formatted_jobs = [formatters.format_job(job) for job in jobs]
+            # Ordenar por criação (mais recente primeiro)
+            formatted_jobs.sort(key=lambda x: x["age_seconds"], reverse=False)
+            return formatted_jobs
+        except ApiException as e:
+            print(f"Erro ao listar jobs: {e}")
+            return []
+
+    async def list_jobs_page(self, namespace: str, limit: int, continue_token: str = None,
+                             label_selector: str = None, field_selector: str = None):
+        """
+        Lista uma página de Jobs. A ordem entre páginas é a do API server (por nome);
+        dentro da página os jobs são ordenados por criação.
+
+        Returns:
+            Tupla (jobs formatados, token da próxima página ou None)
+        """
+        jobs, next_token = await self._list_page(
+            f"/apis/batch/v1/namespaces/{namespace}/jobs",
+            {"labelSelector": label_selector, "fieldSelector": field_selector},
+            limit,
+            continue_token,
+        )
+        formatted_jobs = [formatters.format_job(job) for job in jobs]
+        formatted_jobs.sort(key=lambda x: x["age_seconds"], reverse=False)
+        return formatted_jobs, next_token
+
+    async def list_events(self, namespace: str, field_selector: str = None, label_selector: str = None):
+        """
+        Lista eventos de um namespace, opcionalmente filtrados por field/label selector.
+
+        Returns:
+            Lista de eventos formatados
+        """
+        try:
+            events = await self._list_all(
+                f"/api/v1/namespaces/{namespace}/events",
+                {"fieldSelector": field_selector, "labelSelector": label_selector},
+            )
+            formatted_events = [formatters.format_event(event) for event in events]
+            # Ordenar por timestamp (mais recente primeiro)
+            formatted_events.sort(key=lambda x: x["age_seconds"], reverse=False)
+            return formatted_events
+        except ApiException as e:
+            print(f"Erro ao listar eventos: {e}")
+            return []
+
+    async def list_events_page(self, namespace: str, limit: int, continue_token: str = None,
+                               field_selector: str = None, label_selector: str = None):
+        """
+        Lista uma página de eventos. A ordem entre páginas é a do API server (por nome);
+        dentro da página os eventos são ordenados por timestamp.
+
+        Returns:
+            Tupla (eventos formatados, token da próxima página ou None)
+        """
+        events, next_token = await self._list_page(
+            f"/api/v1/namespaces/{namespace}/events",
+            {"fieldSelector": field_selector, "labelSelector": label_selector},
+            limit,
+            continue_token,
+        )
+        formatted_events = [formatters.format_event(event) for event in events]
+        formatted_events.sort(key=lambda x: x["age_seconds"], reverse=False)
+        return formatted_events, next_token
+
+    async def get_pod_logs(self, namespace: str, pod_name: str, container_name: str = None, tail_lines: int = 100):
+        """
+        Obtém os logs de um pod do Kubernetes.
+
+        Returns:
+            String com os logs do pod
+        """
+        try:
+            response = await self._request(
+                "GET",
+                f"/api/v1/namespaces/{namespace}/pods/{pod_name}/log",
+                params={k: v for k, v in {"container": container_name, "tailLines": tail_lines}.items() if v},
+            )
+            return response.text
+        except ApiException as e:
+            if e.status == 404:
+                raise HTTPException(status_code=404, detail=f"Pod {pod_name} not found")
+            print(f"Erro ao obter logs do pod {pod_name}: {e}")
+            raise HTTPException(status_code=e.status, detail=f"Failed to get logs: {str(e)}")
+
+    async def open_pod_log_stream(
+        self,
+        namespace: str,
+        pod_name: str,
+        container_name: str = None,
+        follow: bool = False,
+        since_seconds: int = None,
+        timestamps: bool = False,
+        limit_bytes: int = None,
+        tail_lines: int = None,
+    ) -> httpx.Response:
+        """
+        Abre o stream de logs de um pod sem ler o corpo da resposta.
+
+        Erros (pod inexistente, container inválido) são levantados antes de qualquer byte
+        ser enviado ao cliente. O chamador deve consumir o corpo com iter_log_stream.
+        """
+        params = {
+            "container": container_name,
+            "follow": "true" if follow else None,
+            "sinceSeconds": since_seconds,
+            "timestamps": "true" if timestamps else None,
+            "limitBytes": limit_bytes,
+            "tailLines": tail_lines,
+        }
+        try:
+            return await self._request(
+                "GET",
+                f"/api/v1/namespaces/{namespace}/pods/{pod_name}/log",
+                stream=True,
+                params={k: v for k, v in params.items() if v is not None},
+                # O read timeout funciona como timeout de inatividade do stream
+                timeout=httpx.Timeout(K8S_READ_TIMEOUT, connect=K8S_CONNECT_TIMEOUT, read=K8S_LOG_STREAM_IDLE_TIMEOUT),
+            )
+        except ApiException as e:
+            if e.status == 404:
+                raise HTTPException(status_code=404, detail=f"Pod {pod_name} not found")
+            raise HTTPException(status_code=e.status, detail=f"Failed to get logs: {e.body or e.reason}")
+
+    @staticmethod
+    async def iter_log_stream(response: httpx.Response, sse: bool = False):
+        """
+        Repassa os logs conforme chegam do API server.
+
+        O próximo pedaço só é lido quando o anterior foi entregue ao cliente (back-pressure),
+        então a memória usada é constante. O stream termina sem erro quando o pod para de
+        enviar dados por K8S_LOG_STREAM_IDLE_TIMEOUT segundos.
+
+        Args:
+            response: Resposta aberta por open_pod_log_stream
+            sse: Se True, envia cada linha como um evento Server-Sent Events
+        """
+        try:
+            if sse:
+                # Enviar um comentário inicial para que o cliente receba o primeiro byte imediatamente
+                yield b": connected\n\n"
+                async for line in response.aiter_lines():
+                    yield f"data: {line.rstrip(chr(13) + chr(10))}\n\n".encode("utf-8")
+                yield b"event: end\ndata: \n\n"
+            else:
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+        except httpx.ReadTimeout:
+            if sse:
+                yield b"event: idle-timeout\ndata: \n\n"
+        except httpx.HTTPError as e:
+            print(f"Warning: Log stream interrupted: {e}")
+        finally:
+            await response.aclose()
+
+    async def delete_pod(self, namespace: str, pod_name: str):
+        """Deleta um pod específico do Kubernetes. Retorna True também se ele já não existir."""
+        try:
+            await self._request("DELETE", f"/api/v1/namespaces/{namespace}/pods/{pod_name}")
+            return True
+        except ApiException as e:
+            if e.status == 404:
+                # Pod já não existe, não é um erro
+                return True
+            print(f"Erro ao deletar pod {pod_name}: {e}")
+            raise e
+
+    async def delete_job(self, namespace: str, job_name: str):
+        """Deleta um Job (e seus pods) de um namespace."""
+        try:
+            await self._request(
+                "DELETE",
+                f"/apis/batch/v1/namespaces/{namespace}/jobs/{job_name}",
+                params={"propagationPolicy": "Background"},
+            )
+            return True
+        except ApiException as e:
+            if e.status == 404:
+                raise HTTPException(status_code=404, detail=f"Job '{job_name}' not found")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error deleting job '{job_name}': {str(e)}"
+            )
+
+    def _exec_url(self, namespace: str, pod_name: str, command: list[str], container_name: str = None,
+                  stdin: bool = False, tty: bool = False) -> str:
+        params = [("command", part) for part in command]
+        params += [("stdout", "true"), ("stderr", "false" if tty else "true")]
+        if stdin:
+            params.append(("stdin", "true"))
+        if tty:
+            params.append(("tty", "true"))
+        if container_name:
+            params.append(("container", container_name))
+
+        ws_url = "wss" + self.url[len("https"):] if self.url.startswith("https") else "ws" + self.url[len("http"):]
+        return f"{ws_url}/api/v1/namespaces/{namespace}/pods/{pod_name}/exec?{urlencode(params)}"
+
+    @asynccontextmanager
+    async def connect_exec(self, namespace: str, pod_name: str, command: list[str], container_name: str = None,
+                           stdin: bool = False, tty: bool = False):
+        """
+        Abre o WebSocket de exec de um pod (subprotocolo v4.channel.k8s.io).
+        Cada mensagem binária começa com o byte do canal (stdin, stdout, stderr, erro, resize).
+        """
+        ssl_context = None
+        if self.url.startswith("https"):
+            ssl_context = ssl.create_default_context()
+            if not self.verify_ssl:
+                ssl_context.check_hostname = False
+                ssl_context.verify_mode = ssl.CERT_NONE
+
+        async with websocket_connect(
+            self._exec_url(namespace, pod_name, command, container_name, stdin=stdin, tty=tty),
+            subprotocols=[EXEC_SUBPROTOCOL],
+            additional_headers=self._headers,
+            ssl=ssl_context,
+            open_timeout=K8S_CONNECT_TIMEOUT,
+            max_size=None,
+        ) as websocket:
+            yield websocket
+
+    async def exec_pod_command(self, namespace: str, pod_name: str, command: list[str], container_name: str = None):
+        """
+        Executa um comando em um pod e aguarda o término sem ocupar uma thread.
+
+        Returns:
+            Dict com stdout, stderr e o exit code real lido do canal de erro
+        """
+        stdout = []
+        stderr = []
+        return_code = None
+
+        try:
+            async with self.connect_exec(namespace, pod_name, command, container_name) as websocket:
+                async for message in websocket:
+                    if isinstance(message, str):
+                        message = message.encode("utf-8")
+                    if not message:
+                        continue
+                    channel, payload = message[0], message[1:]
+                    if channel == STDOUT_CHANNEL:
+                        stdout.append(payload)
+                    elif channel == STDERR_CHANNEL:
+                        stderr.append(payload)
+                    elif channel == ERROR_CHANNEL and payload:
+                        return_code = parse_exec_status(payload)
+        except Exception as e:
+            status_code = getattr(getattr(e, "response", None), "status_code", None)
+            if status_code == 404:
+                raise HTTPException(status_code=404, detail=f"Pod {pod_name} not found")
+            print(f"Erro ao executar comando no pod {pod_name}: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to execute command: {str(e)}")
+
+        return {
+            "stdout": b"".join(stdout).decode("utf-8", errors="replace"),
+            "stderr": b"".join(stderr).decode("utf-8", errors="replace"),
+            "return_code": return_code if return_code is not None else 0,
+        }
+
+    async def exec_session(self, websocket, namespace: str, pod_name: str, command: list[str],
+                           container_name: str = None, tty: bool = False) -> int | None:
+        """
+        Faz o proxy bidirecional entre um WebSocket do cliente (já aceito) e o exec do pod.
+
+        Mensagens do cliente (texto JSON ou binário):
+            {"type": "stdin", "data": "..."}         -> canal de stdin
+            {"type": "resize", "cols": 80, "rows": 24} -> canal de resize (apenas com tty)
+            frames binários                          -> repassados como stdin
+        Mensagens para o cliente:
+            {"type": "stdout" | "stderr", "data": "..."}
+
+        Nada é acumulado em memória: cada mensagem é repassada assim que chega.
+
+        Returns:
+            Exit code real lido do canal de erro, ou None se o cliente desconectou antes
+            do comando terminar
+        """
+        async with self.connect_exec(namespace, pod_name, command, container_name, stdin=True, tty=tty) as upstream:
+
+            async def client_to_pod():
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        return
+                    if message.get("bytes") is not None:
+                        await upstream.send(bytes([STDIN_CHANNEL]) + message["bytes"])
+                        continue
+                    try:
+                        data = json.loads(message.get("text") or "")
+                    except ValueError:
+                        continue
+                    if data.get("type") == "stdin":
+                        await upstream.send(bytes([STDIN_CHANNEL]) + str(data.get("data", "")).encode("utf-8"))
+                    elif data.get("type") == "resize" and tty:
+                        size = {"Width": int(data.get("cols", 80)), "Height": int(data.get("rows", 24))}
+                        await upstream.send(bytes([RESIZE_CHANNEL]) + json.dumps(size).encode("utf-8"))
+
+            async def pod_to_client():
+                # Decoders incrementais: uma sequência UTF-8 pode vir dividida entre mensagens
+                decoders = {
+                    STDOUT_CHANNEL: ("stdout", codecs.getincrementaldecoder("utf-8")(errors="replace")),
+                    STDERR_CHANNEL: ("stderr", codecs.getincrementaldecoder("utf-8")(errors="replace")),
+                }
+                return_code = None
+                async for message in upstream:
+                    if isinstance(message, str):
+                        message = message.encode("utf-8")
+                    if not message:
+                        continue
+                    channel, payload = message[0], message[1:]
+                    if channel in decoders:
+                        stream_name, decoder = decoders[channel]
+                        text = decoder.decode(payload)
+                        if text:
+                            await websocket.send_json({"type": stream_name, "data": text})
+                    elif channel == ERROR_CHANNEL and payload:
+                        return_code = parse_exec_status(payload)
+                return return_code if return_code is not None else 0
+
+            pod_task = asyncio.create_task(pod_to_client())
+            client_task = asyncio.create_task(client_to_pod())
+            done, pending = await asyncio.wait({pod_task, client_task}, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+            if pod_task in done:
+                return pod_task.result()
+            client_task.result()
+            return None
@@ -0,0 +1,46 @@
+import threading
+
+
+class PeriodicTask:
+    """
+    Executa uma função periodicamente em uma thread daemon.
+
+    Usado para manter caches por cluster aquecidos (referência do Gateway, etc.)
+    sem bloquear as requisições HTTP.
+    """
+
+    def __init__(self, name: str, interval: float, target, run_immediately: bool = True):
+        self.name = name
+        self.interval = interval
+        self.target = target
+        self.run_immediately = run_immediately
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        if not self.run_immediately:
+            if self._stop_event.wait(self.interval):
+                return
+
+        while True:
+            try:
+                self.target()
+            except Exception as e:
+                # Log mas não interrompe a tarefa periódica
+                print(f"Warning: Background task '{self.name}' failed: {e}")
+
+            if self._stop_event.wait(self.interval):
+                return
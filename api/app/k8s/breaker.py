@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+
+
+K8S_BREAKER_FAILURE_THRESHOLD = int(os.getenv("K8S_BREAKER_FAILURE_THRESHOLD", "3"))
+K8S_BREAKER_BASE_BACKOFF_SECONDS = float(os.getenv("K8S_BREAKER_BASE_BACKOFF_SECONDS", "5"))
+K8S_BREAKER_MAX_BACKOFF_SECONDS = float(os.getenv("K8S_BREAKER_MAX_BACKOFF_SECONDS", "300"))
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Chamada recusada porque o circuito do cluster está aberto."""
+
+    def __init__(self, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(f"Cluster API unavailable (circuit open), retrying in {retry_in:.0f}s")
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de um cluster (closed -> open -> half-open).
+
+    Após `failure_threshold` falhas de transporte consecutivas (timeout, conexão recusada,
+    5xx), o circuito abre e as chamadas falham imediatamente. Passado o backoff, uma única
+    chamada de teste é liberada (half-open): sucesso fecha o circuito, falha reabre com o
+    backoff dobrado (até `max_backoff`).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = K8S_BREAKER_FAILURE_THRESHOLD,
+        base_backoff: float = K8S_BREAKER_BASE_BACKOFF_SECONDS,
+        max_backoff: float = K8S_BREAKER_MAX_BACKOFF_SECONDS,
+    ):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self.opened_until = None
+        self.last_error = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Libera ou recusa (CircuitOpenError) uma chamada ao cluster."""
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return
+
+            now = time.monotonic()
+            if self.state == STATE_OPEN and now >= self.opened_until:
+                self.state = STATE_HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+
+            raise CircuitOpenError(max((self.opened_until or now) - now, 0))
+
+    def record_success(self):
+        with self._lock:
+            self.state = STATE_CLOSED
+            self.consecutive_failures = 0
+            self.open_count = 0
+            self.opened_until = None
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            if self.state == STATE_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                backoff = min(self.base_backoff * (2 ** self.open_count), self.max_backoff)
+                self.open_count += 1
+                self.state = STATE_OPEN
+                self.opened_until = time.monotonic() + backoff
+                self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_in = None
+            if self.state == STATE_OPEN and self.opened_until is not None:
+                retry_in = round(max(self.opened_until - time.monotonic(), 0), 1)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "retry_in_seconds": retry_in,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,103 @@
+import os
+import time
+
+from kubernetes.utils import parse_quantity
+
+from app.k8s.gateway import GatewayReferenceCache
+
+
+# Idade máxima do snapshot antes de uma nova busca ser agendada (o valor antigo continua sendo servido)
+K8S_CAPACITY_TTL_SECONDS = float(os.getenv("K8S_CAPACITY_TTL_SECONDS", "60"))
+K8S_CAPACITY_REFRESH_SECONDS = float(os.getenv("K8S_CAPACITY_REFRESH_SECONDS", "60"))
+K8S_CAPACITY_COLD_WAIT_SECONDS = float(os.getenv("K8S_CAPACITY_COLD_WAIT_SECONDS", "5"))
+
+
+def _node_is_ready(node) -> bool:
+    for condition in (node.status.conditions or []) if node.status else []:
+        if condition.type == "Ready":
+            return condition.status == "True"
+    return False
+
+
+def _sum_resources(resource_lists: list[dict]) -> dict:
+    cpu = 0
+    memory = 0
+    pods = 0
+    for resources in resource_lists:
+        resources = resources or {}
+        if resources.get("cpu"):
+            cpu += parse_quantity(resources["cpu"])
+        if resources.get("memory"):
+            memory += parse_quantity(resources["memory"])
+        if resources.get("pods"):
+            pods += parse_quantity(resources["pods"])
+
+    return {
+        "cpu": float(cpu),
+        "memory_mb": int(memory) // (1024 * 1024),
+        "pods": int(pods),
+    }
+
+
+def build_capacity_snapshot(nodes) -> dict:
+    """
+    Monta o snapshot de capacidade do cluster a partir de uma única listagem de nodes.
+
+    Quantidades (ex: '3500m', '16Gi') são convertidas com kubernetes.utils.parse_quantity.
+    Apenas nodes Ready entram no total alocável.
+
+    Returns:
+        Dict com total de nodes, nodes Ready, capacity e allocatable (cpu em cores,
+        memória em MB e quantidade de pods) e os valores históricos de available_*
+    """
+    ready_nodes = [node for node in nodes if _node_is_ready(node)]
+    capacity = _sum_resources([node.status.capacity for node in nodes if node.status])
+    return {
+        "nodes": len(nodes),
+        "ready_nodes": len(ready_nodes),
+        "capacity": capacity,
+        "allocatable": _sum_resources([node.status.allocatable for node in ready_nodes]),
+        "available": _legacy_available(nodes, capacity),
+        "refreshed_at": time.time(),
+    }
+
+
+def _legacy_available(nodes, capacity: dict) -> dict:
+    """
+    Valores históricos de available_cpu/available_memory, mantidos para não mudar o contrato
+    de GET /clusters/{uuid}: cpu é a capacity (cores inteiros) de todos os nodes; memory é
+    a allocatable menos a capacity de todos os nodes, em Ki.
+    """
+    allocatable_memory = 0
+    capacity_memory = 0
+    for node in nodes:
+        if not node.status:
+            continue
+        if (node.status.allocatable or {}).get("memory"):
+            allocatable_memory += parse_quantity(node.status.allocatable["memory"])
+        if (node.status.capacity or {}).get("memory"):
+            capacity_memory += parse_quantity(node.status.capacity["memory"])
+
+    return {
+        "cpu": int(capacity["cpu"]),
+        "memory": int(allocatable_memory - capacity_memory) // 1024,
+    }
+
+
+class CapacitySnapshotCache(GatewayReferenceCache):
+    """
+    Cache do snapshot de capacidade de um cluster.
+
+    Além da busca periódica em background, um snapshot mais velho que
+    K8S_CAPACITY_TTL_SECONDS agenda uma nova busca na leitura; enquanto ela não
+    termina o valor anterior continua sendo retornado.
+    """
+
+    description = "capacity snapshot"
+
+    def get(self, loader, wait_timeout: float = 0, max_age: float = K8S_CAPACITY_TTL_SECONDS) -> dict | None:
+        value = super().get(loader, wait_timeout=wait_timeout)
+        refreshed_at = self.refreshed_at
+        if refreshed_at is not None and time.time() - refreshed_at > max_age:
+            self.refresh_async(loader)
+        return value
@@ -1,10 +1,22 @@
 import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
+import urllib3
 from kubernetes import client
-from kubernetes.client.rest import ApiException
+from kubernetes.client.rest import ApiException, RESTResponse
 from kubernetes.stream import stream
+from kubernetes.stream.ws_client import ERROR_CHANNEL as EXEC_ERROR_CHANNEL
 from fastapi import HTTPException
 
+from app.k8s import apply, capacity, diff, discovery, formatters, metrics, usage
+from app.k8s.breaker import CircuitBreaker, CircuitOpenError
+from app.k8s.gateway import GatewayReferenceCache
+from app.k8s.informer import InformerManager
+
 
 K8S_API_MAPPING = {
     "Deployment": (
@@ -52,25 +64,345 @@ K8S_API_MAPPING = {
 }
 
 
+# Nome (plural) dos recursos no path da API para os kinds com plural irregular
+K8S_RESOURCE_PLURALS = {
+    "Ingress": "ingresses",
+    "HorizontalPodAutoscaler": "horizontalpodautoscalers",
+    "NetworkPolicy": "networkpolicies",
+}
+
+# Field manager usado nas operações de server-side apply
+K8S_FIELD_MANAGER = "tron"
+
+# Timeouts (segundos) aplicados a toda chamada ao API server que não define o seu próprio
+K8S_CONNECT_TIMEOUT = float(os.getenv("K8S_CONNECT_TIMEOUT", "5"))
+K8S_READ_TIMEOUT = float(os.getenv("K8S_READ_TIMEOUT", "30"))
+# Novas tentativas do urllib3 em erros de conexão (o circuit breaker cuida do resto)
+K8S_CONNECT_RETRIES = int(os.getenv("K8S_CONNECT_RETRIES", "1"))
+
+# Tamanho das páginas (limit/continue) usadas para listar coleções grandes
+K8S_LIST_CHUNK_SIZE = int(os.getenv("K8S_LIST_CHUNK_SIZE", "500"))
+
+# Workers do pool de leituras paralelas (diff e listagens do prune), separado do pool de apply
+K8S_READ_MAX_WORKERS = int(os.getenv("K8S_READ_MAX_WORKERS", "4"))
+
+
+def kind_to_resource_name(kind: str) -> str:
+    """Converte um Kind para o nome do recurso no path da API (ex: HTTPRoute -> httproutes)"""
+    if kind in K8S_RESOURCE_PLURALS:
+        return K8S_RESOURCE_PLURALS[kind]
+    lower = kind.lower()
+    # Adicionar 's' se não terminar com 's'
+    if not lower.endswith('s'):
+        return lower + 's'
+    return lower
+
+
+def resource_collection_path(api_version: str, kind: str, namespace: str) -> str:
+    """
+    Monta o path REST da coleção de um recurso namespaced.
+
+    Ex: ("apps/v1", "Deployment", "ns") -> /apis/apps/v1/namespaces/ns/deployments
+        ("v1", "Service", "ns") -> /api/v1/namespaces/ns/services
+    """
+    api_parts = api_version.split('/')
+    resource_name = kind_to_resource_name(kind)
+    if len(api_parts) == 2:
+        api_group, api_version_part = api_parts
+        return f"/apis/{api_group}/{api_version_part}/namespaces/{namespace}/{resource_name}"
+    return f"/api/{api_version}/namespaces/{namespace}/{resource_name}"
+
+
+# Accept para listagens somente de metadados (com fallback para a lista completa em JSON)
+PARTIAL_OBJECT_METADATA_ACCEPT = (
+    "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,application/json"
+)
+
+# Kinds renderizados pelos templates que podem ser removidos pelo prune quando deixam de ser
+# renderizados (template desabilitado). Workloads ficam de fora: são removidos apenas pelo delete
+# explícito do componente.
+PRUNABLE_KINDS = (
+    ("Service", "v1"),
+    ("ConfigMap", "v1"),
+    ("Secret", "v1"),
+    ("HorizontalPodAutoscaler", "autoscaling/v2"),
+    ("Ingress", "networking.k8s.io/v1"),
+    ("HTTPRoute", "gateway.networking.k8s.io/v1"),
+    ("TCPRoute", "gateway.networking.k8s.io/v1alpha2"),
+    ("UDPRoute", "gateway.networking.k8s.io/v1alpha2"),
+)
+GATEWAY_API_GROUP = "gateway.networking.k8s.io"
+
+
+def get_hpa_scale_targets(yaml_documents) -> set:
+    """Retorna os (namespace, kind, name) escalados por algum HPA presente nos documentos."""
+    targets = set()
+    for document in yaml_documents:
+        if not document or not isinstance(document, dict):
+            continue
+        if document.get("kind") != "HorizontalPodAutoscaler":
+            continue
+        namespace = (document.get("metadata") or {}).get("namespace")
+        target_ref = (document.get("spec") or {}).get("scaleTargetRef") or {}
+        if target_ref.get("kind") and target_ref.get("name"):
+            targets.add((namespace, target_ref["kind"], target_ref["name"]))
+    return targets
+
+
+def is_transport_failure(error: Exception) -> bool:
+    """
+    Indica se o erro mostra que o API server está indisponível (conta para o circuit breaker).
+    Respostas 4xx (404, 409, 422, ...) significam que o servidor respondeu normalmente.
+    """
+    if isinstance(error, ApiException):
+        return error.status == 0 or error.status >= 500
+    return True
+
+
+def cluster_label(url: str) -> str:
+    """Nome usado nas métricas quando o cluster não é informado: o host do API server."""
+    return urlparse(url).hostname or url
+
+
+def _request_body_size(body) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    return len(json.dumps(body, default=str))
+
+
+def _response_size(response) -> int:
+    """Bytes recebidos: corpo lido ou, em respostas não pré-carregadas, o Content-Length."""
+    if response is None:
+        return 0
+    if isinstance(response, RESTResponse):
+        return len(response.data or b"")
+    try:
+        return int(response.headers.get("Content-Length") or 0)
+    except (AttributeError, TypeError, ValueError):
+        return 0
+
+
+def _response_retries(response) -> int:
+    raw = getattr(response, "urllib3_response", response)
+    retries = getattr(raw, "retries", None)
+    return len(retries.history) if retries is not None and retries.history else 0
+
+
+class TronApiClient(client.ApiClient):
+    """
+    ApiClient com timeouts padrão e circuit breaker por cluster.
+
+    Toda chamada sem `_request_timeout` explícito usa (K8S_CONNECT_TIMEOUT, K8S_READ_TIMEOUT).
+    Erros de transporte do urllib3 viram ApiException (504 em timeouts, 503 nos demais),
+    como no AsyncK8sClient, e com o circuito aberto as chamadas falham imediatamente com 503.
+    """
+
+    def __init__(self, configuration, breaker: CircuitBreaker, cluster_name: str = None):
+        super().__init__(configuration)
+        self.breaker = breaker
+        self.cluster_name = cluster_name or cluster_label(configuration.host)
+
+    def request(self, method, url, query_params=None, headers=None,
+                post_params=None, body=None, _preload_content=True,
+                _request_timeout=None):
+        kwargs = dict(
+            query_params=query_params,
+            headers=headers,
+            post_params=post_params,
+            body=body,
+            _preload_content=_preload_content,
+            _request_timeout=_request_timeout,
+        )
+        if not metrics.K8S_METRICS_ENABLED:
+            return self._request_with_breaker(method, url, **kwargs)
+
+        # Instrumentação por cluster/verbo/recurso/operação (ver app.k8s.metrics)
+        started_at = time.monotonic()
+        status = 0
+        response = None
+        try:
+            response = self._request_with_breaker(method, url, **kwargs)
+            status = getattr(response, "status", 0)
+            return response
+        except ApiException as e:
+            status = e.status
+            raise
+        finally:
+            metrics.api_metrics.record(
+                self.cluster_name, method, url, status, time.monotonic() - started_at,
+                bytes_out=_request_body_size(body),
+                bytes_in=_response_size(response),
+                retries=_response_retries(response),
+            )
+
+    def _request_with_breaker(self, method, url, query_params=None, headers=None,
+                              post_params=None, body=None, _preload_content=True,
+                              _request_timeout=None):
+        if _request_timeout is None:
+            _request_timeout = (K8S_CONNECT_TIMEOUT, K8S_READ_TIMEOUT)
+
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError as e:
+            raise ApiException(status=503, reason=str(e))
+
+        try:
+            response = super().request(
+                method, url,
+                query_params=query_params,
+                headers=headers,
+                post_params=post_params,
+                body=body,
+                _preload_content=_preload_content,
+                _request_timeout=_request_timeout,
+            )
+        except ApiException as e:
+            if is_transport_failure(e):
+                self.breaker.record_failure(e)
+            else:
+                self.breaker.record_success()
+            raise
+        except urllib3.exceptions.HTTPError as e:
+            self.breaker.record_failure(e)
+            timed_out = isinstance(e, urllib3.exceptions.TimeoutError) or isinstance(
+                getattr(e, "reason", None), urllib3.exceptions.TimeoutError
+            )
+            if timed_out:
+                raise ApiException(status=504, reason=f"Timeout calling Kubernetes API: {e}")
+            raise ApiException(status=503, reason=f"Kubernetes API unreachable: {e}")
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+
+        self.breaker.record_success()
+        return response
+
+
+def _api_error_message(error: ApiException) -> str:
+    """Extrai a mensagem de erro do corpo de uma ApiException (Status do Kubernetes)."""
+    try:
+        body = json.loads(error.body) if error.body else {}
+        if isinstance(body, dict) and body.get("message"):
+            return body["message"]
+    except (TypeError, ValueError):
+        pass
+    return f"({error.status}) {error.reason}"
+
+
+def strip_hpa_managed_fields(document: dict, hpa_scale_targets: set) -> dict:
+    """
+    Remove spec.replicas de workloads escalados por HPA, para que o apply não
+    sobrescreva a quantidade de réplicas definida pelo autoscaler.
+    """
+    metadata = document.get("metadata") or {}
+    key = (metadata.get("namespace"), document.get("kind"), metadata.get("name"))
+    if key in hpa_scale_targets and "replicas" in (document.get("spec") or {}):
+        return {**document, "spec": {k: v for k, v in document["spec"].items() if k != "replicas"}}
+    return document
+
+
+def list_all_items(list_func, **kwargs) -> list:
+    """
+    Chama uma função list_namespaced_* do kubernetes-client em páginas de
+    K8S_LIST_CHUNK_SIZE (limit/continue) e retorna todos os itens.
+    Argumentos None (ex: label_selector não informado) são descartados.
+    """
+    kwargs = {key: value for key, value in kwargs.items() if value is not None}
+    items = []
+    continue_token = None
+    while True:
+        if continue_token:
+            kwargs["_continue"] = continue_token
+        page = list_func(limit=K8S_LIST_CHUNK_SIZE, **kwargs)
+        items.extend(page.items)
+        continue_token = page.metadata._continue if page.metadata else None
+        if not continue_token:
+            return items
+
+
+def parse_exec_status(payload: bytes | str) -> int:
+    """
+    Extrai o exit code da mensagem de status enviada no canal de erro do exec.
+
+    Ex: {"status": "Failure", "reason": "NonZeroExitCode",
+         "details": {"causes": [{"reason": "ExitCode", "message": "2"}]}}
+    """
+    try:
+        status = json.loads(payload)
+    except (TypeError, ValueError):
+        return 1
+
+    if status.get("status") == "Success":
+        return 0
+
+    for cause in (status.get("details") or {}).get("causes") or []:
+        if cause.get("reason") == "ExitCode":
+            try:
+                return int(cause.get("message"))
+            except (TypeError, ValueError):
+                break
+    return 1
+
+
 class K8sClient:
-    def __init__(self, url: str, token: str, verify_ssl: bool = False):
+    def __init__(self, url: str, token: str, verify_ssl: bool = False, connection_pool_maxsize: int = None,
+                 cluster_name: str = None):
         """
         Inicializa o cliente Kubernetes com os parâmetros fornecidos.
+
+        O ApiClient mantém um pool de conexões urllib3 (keep-alive), então uma mesma
+        instância deve ser reaproveitada entre chamadas ao mesmo cluster.
+        Use app.k8s.registry.get_k8s_client para obter instâncias compartilhadas.
         """
         self.configuration = client.Configuration()
         self.configuration.host = url
         self.configuration.verify_ssl = verify_ssl
         self.configuration.api_key = {"authorization": f"Bearer {token}"}
-        self.api_client = client.ApiClient(self.configuration)
-        self.api_client = client.ApiClient(self.configuration)
+        if connection_pool_maxsize:
+            self.configuration.connection_pool_maxsize = connection_pool_maxsize
+        self.configuration.retries = K8S_CONNECT_RETRIES
+        # Estado de disponibilidade do cluster, compartilhado com o AsyncK8sClient pelo registry
+        self.breaker = CircuitBreaker()
+        self.api_client = TronApiClient(self.configuration, self.breaker, cluster_name=cluster_name)
+        self.discovery = discovery.DiscoveryCache()
+        self.gateway_reference_cache = GatewayReferenceCache()
+        self.capacity_cache = capacity.CapacitySnapshotCache()
+        # Uso real dos pods (metrics-server), compartilhado com o AsyncK8sClient pelo registry
+        self.pod_metrics_cache = usage.PodMetricsCache()
+        # Namespaces que já sabemos existir no cluster (evita um GET por apply)
+        self.known_namespaces = set()
+        self._namespaces_lock = threading.Lock()
+        # Cache LIST+WATCH de pods, jobs e eventos (opcional, ver K8S_INFORMERS_ENABLED)
+        self.informers = InformerManager(self, list_chunk_size=K8S_LIST_CHUNK_SIZE)
+        # Pools de workers do cluster: apply_executor aplica os documentos de um mesmo tier em
+        # paralelo; read_executor faz as leituras paralelas do diff e do prune. Uma tarefa nunca
+        # deve submeter (e esperar) outra no pool em que está rodando: com o pool cheio, ela
+        # esperaria para sempre por um worker.
+        self.apply_executor = ThreadPoolExecutor(
+            max_workers=apply.K8S_APPLY_MAX_WORKERS, thread_name_prefix="k8s-apply"
+        )
+        self.read_executor = ThreadPoolExecutor(
+            max_workers=K8S_READ_MAX_WORKERS, thread_name_prefix="k8s-read"
+        )
+
+    def close(self):
+        """Libera os recursos do cliente (chamado quando ele sai do registry)."""
+        self.apply_executor.shutdown(wait=False)
+        self.read_executor.shutdown(wait=False)
+        self.informers.stop()
+        # Conexões keep-alive do pool do urllib3
+        self.api_client.rest_client.pool_manager.clear()
 
     def validate_connection(self):
         """
-        Valida a conexão ao Kubernetes tentando listar os namespaces.
+        Valida a conexão ao Kubernetes tentando listar os namespaces
+        (uma única página de um item: só a permissão e a conectividade importam).
         """
         try:
             v1 = client.CoreV1Api(self.api_client)
-            v1.list_namespace()
+            v1.list_namespace(limit=1)
             message = {"status": "ok", "message": "connected"}
             return (True, message)
         except ApiException as e:
@@ -83,6 +415,11 @@ class K8sClient:
             message = {"status": "error", "message": {"code": str(e.status), "message": error_message}}
             return (False, message)
 
+    def get_server_version(self) -> str | None:
+        """Retorna a versão do API server (ex: 'v1.30.2')."""
+        version = client.VersionApi(self.api_client).get_code()
+        return version.git_version if version else None
+
     def get_namespaces(self):
         """
         Retorna uma lista de namespaces do cluster Kubernetes.
@@ -101,53 +438,73 @@ class K8sClient:
         body = client.V1Namespace(metadata=client.V1ObjectMeta(name=name))
         try:
             v1 = client.CoreV1Api(self.api_client)
-            return v1.create_namespace(body=body)
+            created_namespace = v1.create_namespace(body=body)
+            self._remember_namespace(name)
+            return created_namespace
         except ApiException as e:
+            if e.status == 409:
+                self._remember_namespace(name)
             print(f"Erro ao criar namespace: {e}")
             return None
 
-    def get_available_cpu(self):
+    def get_capacity_snapshot(self) -> dict:
         """
-        Retorna a quantidade total de CPU disponível no cluster Kubernetes.
+        Lista os nodes uma única vez e retorna a capacidade do cluster
+        (ver app.k8s.capacity.build_capacity_snapshot).
         """
-        try:
-            v1 = client.CoreV1Api(self.api_client)
-            nodes = v1.list_node().items
+        v1 = client.CoreV1Api(self.api_client)
+        nodes = list_all_items(v1.list_node)
+        return capacity.build_capacity_snapshot(nodes)
 
-            total_cpu = 0
-            for node in nodes:
-                cpu_capacity = node.status.capacity["cpu"]
-                total_cpu += int(cpu_capacity)
+    def get_cached_capacity(self, wait_timeout: float = 0) -> dict | None:
+        """
+        Retorna o snapshot de capacidade cacheado, agendando uma busca se ele estiver
+        frio ou vencido. Retorna None se ainda não houver snapshot após `wait_timeout`.
+        """
+        return self.capacity_cache.get(self.get_capacity_snapshot, wait_timeout=wait_timeout)
 
-            return total_cpu
-        except ApiException as e:
-            print(f"Erro ao obter a quantidade de CPU disponível: {e}")
+    def get_available_cpu(self):
+        """
+        Retorna a quantidade total de CPU (capacity, em cores) dos nodes do cluster Kubernetes.
+        O total alocável dos nodes Ready está em get_cached_capacity()["allocatable"].
+        """
+        snapshot = self.get_cached_capacity(wait_timeout=capacity.K8S_CAPACITY_COLD_WAIT_SECONDS)
+        if snapshot is None:
             return None
+        return snapshot["available"]["cpu"]
 
     def get_available_memory(self):
         """
-        Obtém a quantidade de memória disponível no cluster Kubernetes.
+        Obtém a memória disponível no cluster Kubernetes (allocatable - capacity dos nodes, em Ki).
+        O total alocável dos nodes Ready, em MB, está em get_cached_capacity()["allocatable"].
         """
-        v1 = client.CoreV1Api(self.api_client)
-        nodes = v1.list_node().items
+        snapshot = self.get_cached_capacity(wait_timeout=capacity.K8S_CAPACITY_COLD_WAIT_SECONDS)
+        if snapshot is None:
+            return None
+        return snapshot["available"]["memory"]
 
-        total_memory = 0
-        total_allocated_memory = 0
+    def _remember_namespace(self, namespace_name):
+        with self._namespaces_lock:
+            self.known_namespaces.add(namespace_name)
 
-        for node in nodes:
+    def forget_namespace(self, namespace_name):
+        """Remove o namespace do cache de namespaces conhecidos (será verificado novamente)."""
+        with self._namespaces_lock:
+            self.known_namespaces.discard(namespace_name)
 
-            node_memory = node.status.allocatable.get("memory")
-            if node_memory:
-                total_memory += int(node_memory[:-2])
-            node_allocated_memory = node.status.capacity.get("memory")
-            if node_allocated_memory:
-                total_allocated_memory += int(node_allocated_memory[:-2])
+    def ensure_namespace_exists(self, namespace_name):
+        """
+        Cria o namespace se ele não existir.
+        Namespaces já conhecidos pelo cliente não geram nenhuma chamada ao cluster.
 
-        available_memory = total_memory - total_allocated_memory
-        return available_memory
+        Returns:
+            True se o namespace foi criado por esta chamada
+        """
+        created = False
+        with self._namespaces_lock:
+            if namespace_name in self.known_namespaces:
+                return created
 
-    def ensure_namespace_exists(self, namespace_name):
-        """Cria o namespace se ele não existir."""
         v1 = client.CoreV1Api(self.api_client)
         try:
             v1.read_namespace(name=namespace_name)
@@ -155,15 +512,25 @@ class K8sClient:
             if e.status == 404:
                 namespace_metadata = client.V1ObjectMeta(name=namespace_name)
                 namespace_body = client.V1Namespace(metadata=namespace_metadata)
-                v1.create_namespace(body=namespace_body)
+                try:
+                    v1.create_namespace(body=namespace_body)
+                    created = True
+                except ApiException as create_e:
+                    # Criado concorrentemente por outra requisição
+                    if create_e.status != 409:
+                        raise create_e
             else:
                 raise e
 
+        self._remember_namespace(namespace_name)
+        return created
+
     def delete_namespace(self, namespace_name):
         """
         Deleta um namespace do Kubernetes.
         Quando um namespace é deletado, todos os recursos dentro dele são automaticamente deletados.
         """
+        self.forget_namespace(namespace_name)
         v1 = client.CoreV1Api(self.api_client)
         try:
             v1.delete_namespace(name=namespace_name, body=client.V1DeleteOptions())
@@ -269,12 +636,14 @@ class K8sClient:
                 if exec_command.peek_stderr():
                     stderr += exec_command.read_stderr()
 
+            # Exit code real, enviado pelo API server no canal de erro ao final do comando
+            status = exec_command.read_channel(EXEC_ERROR_CHANNEL)
             exec_command.close()
 
             return {
                 "stdout": stdout,
                 "stderr": stderr,
-                "return_code": 0 if not stderr else 1
+                "return_code": parse_exec_status(status) if status else 0
             }
         except ApiException as e:
             if e.status == 404:
@@ -340,145 +709,474 @@ class K8sClient:
                         # Log mas não falha - não é crítico
                         print(f"Warning: Could not delete {kind} '{component_name}': {e}")
 
-    def apply_or_delete_yaml_to_k8s(self, yaml_documents, operation="create"):
-        # Para operações upsert, limpar recursos Gateway API órfãos antes de aplicar
-        if operation == "upsert":
-            # Coletar informações dos documentos para identificar namespace e component_name
-            namespace = None
-            component_name = None
+    def prune_component_resources(self, namespace: str, component_uuid: str, expected_resources: list) -> list[dict]:
+        """
+        Remove os objetos do componente que não fazem mais parte do conjunto renderizado.
+
+        Para cada kind de PRUNABLE_KINDS é feito um único LIST filtrado pelas labels
+        managed-by/component-uuid (ver app.k8s.apply.stamp_component_labels); são deletados
+        apenas os objetos cujo (kind, name) não está em `expected_resources`. Kinds do
+        Gateway API não instalados no cluster são ignorados.
+
+        Returns:
+            Lista com o resultado de cada objeto removido
+        """
+        expected = {
+            (resource.get("kind"), (resource.get("metadata") or {}).get("name"))
+            for resource in expected_resources
+            if resource and isinstance(resource, dict)
+        }
+
+        gateway_kinds = None
+        prunable_kinds = []
+        for kind, api_version in PRUNABLE_KINDS:
+            if api_version.startswith(GATEWAY_API_GROUP + "/"):
+                if gateway_kinds is None:
+                    gateway_kinds = (
+                        self.get_gateway_api_resources() if self.check_api_available(GATEWAY_API_GROUP) else []
+                    )
+                if kind not in gateway_kinds:
+                    continue
+            prunable_kinds.append((kind, api_version))
+
+        label_selector = apply.component_label_selector(component_uuid)
+        futures = [
+            metrics.submit_with_context(
+                self.read_executor, self.list_object_names, api_version, kind, namespace, label_selector
+            )
+            for kind, api_version in prunable_kinds
+        ]
+
+        results = []
+        for (kind, api_version), future in zip(prunable_kinds, futures):
+            try:
+                names = future.result()
+            except ApiException as e:
+                print(f"Warning: Could not list {kind} for prune in namespace '{namespace}': {e}")
+                continue
+
+            for name in names:
+                if (kind, name) in expected:
+                    continue
+                results.append(self._prune_object(api_version, kind, namespace, name))
+        return results
+
+    def _prune_object(self, api_version: str, kind: str, namespace: str, name: str) -> dict:
+        started_at = time.monotonic()
+        result = {"kind": kind, "name": name, "namespace": namespace, "status": "pruned"}
+        try:
+            self.api_client.call_api(
+                f"{resource_collection_path(api_version, kind, namespace)}/{name}",
+                'DELETE',
+                query_params=[("propagationPolicy", "Background")],
+                auth_settings=['BearerToken'],
+                response_type='object',
+                _preload_content=True
+            )
+            print(f"Pruned orphaned {kind} '{name}' from namespace '{namespace}'")
+        except ApiException as e:
+            if e.status != 404:
+                # Log mas não falha - o próximo apply tenta novamente
+                print(f"Warning: Could not prune {kind} '{name}': {e}")
+                result["status"] = "prune_error"
+                result["error"] = _api_error_message(e)
+        result["duration_ms"] = round((time.monotonic() - started_at) * 1000, 2)
+        return result
+
+    def server_side_apply(self, document: dict, dry_run: bool = False):
+        """
+        Aplica um documento usando server-side apply (uma única requisição PATCH).
+
+        O servidor faz o merge com base na posse dos campos (managedFields): campos que o
+        Tron não envia, como spec.replicas de um Deployment escalado por HPA, continuam
+        pertencendo ao seu gerenciador atual.
+
+        Args:
+            document: Manifesto completo (kind, apiVersion, metadata.name, metadata.namespace)
+            dry_run: Se True, o servidor valida e retorna o resultado sem persistir
+
+        Returns:
+            Objeto resultante (dict) retornado pelo API server
+        """
+        metadata = document.get("metadata") or {}
+        api_path = (
+            f"{resource_collection_path(document['apiVersion'], document['kind'], metadata['namespace'])}"
+            f"/{metadata['name']}"
+        )
+
+        query_params = [("fieldManager", K8S_FIELD_MANAGER), ("force", "true")]
+        if dry_run:
+            query_params.append(("dryRun", "All"))
+
+        response = self.api_client.call_api(
+            api_path,
+            'PATCH',
+            query_params=query_params,
+            header_params={
+                'Content-Type': 'application/apply-patch+yaml',
+                'Accept': 'application/json',
+            },
+            body=document,
+            auth_settings=['BearerToken'],
+            response_type='object',
+            _preload_content=True
+        )
+        return response[0] if isinstance(response, tuple) else response
+
+    def get_object(self, document: dict) -> dict | None:
+        """
+        Busca o objeto atual no cluster correspondente ao documento.
+
+        Returns:
+            Objeto (dict) ou None se ele não existir
+        """
+        metadata = document.get("metadata") or {}
+        api_path = (
+            f"{resource_collection_path(document['apiVersion'], document['kind'], metadata['namespace'])}"
+            f"/{metadata['name']}"
+        )
+        try:
+            response = self.api_client.call_api(
+                api_path,
+                'GET',
+                header_params={'Accept': 'application/json'},
+                auth_settings=['BearerToken'],
+                response_type='object',
+                _preload_content=True
+            )
+        except ApiException as e:
+            if e.status == 404:
+                return None
+            raise
+        return response[0] if isinstance(response, tuple) else response
 
-            # Procurar primeiro por recursos Gateway API para obter o nome correto
+    def _diff_document(self, document: dict, hpa_scale_targets: set) -> dict:
+        document = strip_hpa_managed_fields(document, hpa_scale_targets)
+        try:
+            live = self.get_object(document)
+        except ApiException as e:
+            return diff.diff_result(document, None, None, error=f"Failed to read live object: {e.reason}")
+
+        try:
+            desired = self.server_side_apply(document, dry_run=True)
+        except ApiException as e:
+            if e.status == 404 and live is None:
+                # Namespace ainda não existe: o objeto será criado junto com ele
+                return diff.diff_result(document, None, document)
+            return diff.diff_result(document, live, None, error=_api_error_message(e))
+
+        return diff.diff_result(document, live, desired)
+
+    def diff_documents(self, yaml_documents) -> list[dict]:
+        """
+        Compara os documentos renderizados com o estado atual do cluster sem alterar nada.
+
+        Para cada documento, o objeto atual é lido e um server-side apply com dryRun=All é
+        enviado; o resultado do dry-run (já com defaults e mutações de admission) é comparado
+        ao objeto atual. Os documentos são processados em paralelo no read_executor do cluster.
+
+        Returns:
+            Lista de resultados (ver app.k8s.diff.diff_result), na ordem dos documentos
+        """
+        documents = [
+            document for document in yaml_documents
+            if document and isinstance(document, dict)
+            and (document.get("metadata") or {}).get("name")
+            and (document.get("metadata") or {}).get("namespace")
+        ]
+        hpa_scale_targets = get_hpa_scale_targets(documents)
+        futures = [
+            metrics.submit_with_context(self.read_executor, self._diff_document, document, hpa_scale_targets)
+            for document in documents
+        ]
+        return [future.result() for future in futures]
+
+    def apply_or_delete_yaml_to_k8s(self, yaml_documents, operation="create", applied_hashes: dict = None,
+                                    prune: bool = True):
+        """
+        Aplica ou remove os documentos renderizados no cluster.
+
+        Args:
+            yaml_documents: Documentos renderizados dos templates
+            operation: create, update, upsert, apply (server-side apply) ou delete
+            applied_hashes: Para operation="apply", hashes já aplicados por (kind, namespace, name).
+                Documentos marcados com o mesmo hash (ver app.k8s.apply.stamp_manifest_hash) são pulados.
+            prune: Se False, não poda os objetos do componente fora do conjunto renderizado
+                (o chamador sabe que não há objetos a remover)
+
+        Returns:
+            Dict com o resultado e a duração de cada documento
+        """
+        # Documentos marcados com as labels do componente são podados por seletor após o apply;
+        # os demais mantêm a limpeza de recursos Gateway API órfãos por nome, antes de aplicar
+        prune_target = None
+        if operation in ("upsert", "apply"):
+            prune_target = self._get_prune_target(yaml_documents)
+            if prune_target is None:
+                self._cleanup_orphaned_gateway_resources_by_name(yaml_documents)
+
+        # Workloads escalados por HPA não devem ter spec.replicas enviado no apply
+        hpa_scale_targets = get_hpa_scale_targets(yaml_documents) if operation == "apply" else set()
+
+        # Garantir os namespaces uma única vez, antes de aplicar os documentos em paralelo
+        created_namespaces = set()
+        if operation != "delete":
+            for namespace in self._document_namespaces(yaml_documents):
+                if self.ensure_namespace_exists(namespace):
+                    created_namespaces.add(namespace)
+
+        # Pular documentos cujo hash não mudou desde o último apply. Em namespaces recém-criados
+        # os hashes registrados não valem mais (o namespace foi removido fora do Tron).
+        skipped_results = []
+        if operation == "apply" and applied_hashes:
+            documents_to_apply = []
+            for document in yaml_documents:
+                if document is None or not isinstance(document, dict):
+                    continue
+                key = apply.manifest_key(document)
+                document_hash = apply.get_manifest_hash(document)
+                if (
+                    document_hash
+                    and key[1] not in created_namespaces
+                    and applied_hashes.get(key) == document_hash
+                ):
+                    skipped_results.append({
+                        "kind": key[0],
+                        "name": key[2],
+                        "namespace": key[1],
+                        "status": "skipped",
+                        "duration_ms": 0,
+                    })
+                    continue
+                documents_to_apply.append(document)
+        else:
+            documents_to_apply = yaml_documents
+
+        # Aplicar por tiers de dependência (deletes em ordem inversa), em paralelo dentro de cada tier
+        tiers = apply.group_documents_by_tier(documents_to_apply, reverse=(operation == "delete"))
+        report = apply.run_in_tiers(
+            self.apply_executor,
+            tiers,
+            lambda document: self._apply_document(document, operation, hpa_scale_targets),
+            operation,
+        )
+        report["results"].extend(skipped_results)
+        print(
+            f"Kubernetes {operation}: {len(report['results']) - len(skipped_results)} documents applied, "
+            f"{len(skipped_results)} unchanged, in {report['duration_ms']}ms"
+        )
+
+        if prune_target is not None and prune:
+            try:
+                report["results"].extend(self.prune_component_resources(*prune_target, yaml_documents))
+            except Exception as e:
+                # Log mas não falha - o próximo apply tenta novamente
+                print(f"Warning: Could not prune orphaned resources: {e}")
+        return report
+
+    def _get_prune_target(self, yaml_documents) -> tuple[str, str] | None:
+        """
+        Retorna (namespace, component_uuid) se todos os documentos pertencem a um único
+        componente marcado com as labels do Tron; caso contrário, None.
+        """
+        targets = set()
+        for document in yaml_documents:
+            if not document or not isinstance(document, dict) or not document.get("metadata"):
+                continue
+            targets.add((document["metadata"].get("namespace"), apply.get_component_uuid(document)))
+
+        if len(targets) != 1:
+            return None
+        namespace, component_uuid = targets.pop()
+        if not namespace or not component_uuid:
+            return None
+        return namespace, component_uuid
+
+    def _cleanup_orphaned_gateway_resources_by_name(self, yaml_documents):
+        """Limpeza legada (documentos sem labels): identifica o componente pelo nome dos documentos."""
+        # Coletar informações dos documentos para identificar namespace e component_name
+        namespace = None
+        component_name = None
+
+        # Procurar primeiro por recursos Gateway API para obter o nome correto
+        for doc in yaml_documents:
+            if doc and isinstance(doc, dict):
+                kind = doc.get("kind")
+                api_version = doc.get("apiVersion", "")
+                metadata = doc.get("metadata", {})
+
+                # Se for um recurso Gateway API, usar esse nome
+                if kind in ["HTTPRoute", "TCPRoute", "UDPRoute"] and "gateway.networking.k8s.io" in api_version:
+                    component_name = metadata.get("name")
+                    namespace = metadata.get("namespace")
+                    if namespace and component_name:
+                        break
+
+        # Se não encontrou em recursos Gateway API, procurar em qualquer documento
+        if not (namespace and component_name):
             for doc in yaml_documents:
-                if doc and isinstance(doc, dict):
-                    kind = doc.get("kind")
-                    api_version = doc.get("apiVersion", "")
+                if doc and isinstance(doc, dict) and doc.get("metadata"):
                     metadata = doc.get("metadata", {})
+                    namespace = metadata.get("namespace")
+                    component_name = metadata.get("name")
+                    if namespace and component_name:
+                        break
 
-                    # Se for um recurso Gateway API, usar esse nome
-                    if kind in ["HTTPRoute", "TCPRoute", "UDPRoute"] and "gateway.networking.k8s.io" in api_version:
-                        component_name = metadata.get("name")
-                        namespace = metadata.get("namespace")
-                        if namespace and component_name:
-                            break
-
-            # Se não encontrou em recursos Gateway API, procurar em qualquer documento
-            if not (namespace and component_name):
-                for doc in yaml_documents:
-                    if doc and isinstance(doc, dict) and doc.get("metadata"):
-                        metadata = doc.get("metadata", {})
-                        namespace = metadata.get("namespace")
-                        component_name = metadata.get("name")
-                        if namespace and component_name:
-                            break
-
-            # Se encontrou namespace e component_name, limpar recursos órfãos
-            if namespace and component_name:
-                try:
-                    self.cleanup_orphaned_gateway_resources(namespace, component_name, yaml_documents)
-                except Exception as e:
-                    # Log mas não falha - não é crítico
-                    print(f"Warning: Could not cleanup orphaned Gateway resources: {e}")
+        # Se encontrou namespace e component_name, limpar recursos órfãos
+        if namespace and component_name:
+            try:
+                self.cleanup_orphaned_gateway_resources(namespace, component_name, yaml_documents)
+            except Exception as e:
+                # Log mas não falha - não é crítico
+                print(f"Warning: Could not cleanup orphaned Gateway resources: {e}")
 
+    def _document_namespaces(self, yaml_documents) -> list[str]:
+        """Retorna os namespaces distintos referenciados pelos documentos, na ordem em que aparecem."""
+        namespaces = []
         for document in yaml_documents:
-            # Pular documentos None ou inválidos (quando template não renderiza nada)
             if document is None or not isinstance(document, dict):
                 continue
-
-            kind = document.get("kind")
-            api_version = document.get("apiVersion")
             metadata = document.get("metadata")
-
-            # Verificar se metadata existe
             if not metadata or not isinstance(metadata, dict):
                 continue
-
-            name = metadata.get("name")
             namespace = metadata.get("namespace")
+            if namespace and namespace not in namespaces:
+                namespaces.append(namespace)
+        return namespaces
 
-            if not namespace:
-                raise ValueError("Namespace not specified in the YAML file")
+    def _apply_document(self, document, operation: str, hpa_scale_targets: set):
+        """Aplica (ou remove) um único documento no cluster."""
+        # Pular documentos None ou inválidos (quando template não renderiza nada)
+        if document is None or not isinstance(document, dict):
+            return
 
-            try:
-                self.ensure_namespace_exists(namespace)
-            except Exception as e:
-                raise e
+        kind = document.get("kind")
+        api_version = document.get("apiVersion")
+        metadata = document.get("metadata")
 
-            if not kind or not api_version:
-                raise ValueError("YAML must include 'kind' and 'apiVersion' fields.")
+        # Verificar se metadata existe
+        if not metadata or not isinstance(metadata, dict):
+            return
 
-            api_mapping = K8S_API_MAPPING.get(kind)
+        name = metadata.get("name")
+        namespace = metadata.get("namespace")
 
-            # Se o recurso não está no mapeamento padrão, usar API REST diretamente
-            # Isso é necessário para recursos customizados como Gateway API (HTTPRoute, TCPRoute, UDPRoute)
-            if not api_mapping:
-                # Extrair o grupo e versão da API do apiVersion
-                # Formato: grupo/versão (ex: gateway.networking.k8s.io/v1)
-                # ou apenas versão para APIs core (ex: v1)
-                api_parts = api_version.split('/')
-                if len(api_parts) == 2:
-                    api_group, api_version_part = api_parts
-                else:
-                    # API core (ex: v1)
-                    api_group = ""
-                    api_version_part = api_version
-
-                # Converter o kind para o nome do recurso no path da API
-                # Gateway API usa lowercase plural: HTTPRoute -> httproutes, TCPRoute -> tcproutes
-                def kind_to_resource_name(kind_str):
-                    """Converte um Kind para o nome do recurso no path da API"""
-                    # Converter para lowercase
-                    lower = kind_str.lower()
-                    # Adicionar 's' se não terminar com 's'
-                    if not lower.endswith('s'):
-                        return lower + 's'
-                    return lower
-
-                resource_name = kind_to_resource_name(kind)
-
-                # Determinar o path da API baseado no grupo
-                if api_group:
-                    # API customizada: /apis/{group}/{version}/namespaces/{namespace}/{resource}/{name}
-                    api_path_base = f"/apis/{api_group}/{api_version_part}/namespaces/{namespace}/{resource_name}"
-                else:
-                    # API core: /api/{version}/namespaces/{namespace}/{resource}/{name}
-                    api_path_base = f"/api/{api_version_part}/namespaces/{namespace}/{resource_name}"
+        if not namespace:
+            raise ValueError("Namespace not specified in the YAML file")
 
-                # Aplicar usando API REST diretamente
-                try:
-                    if operation == "create":
-                        # POST para criar
-                        self.api_client.call_api(
-                            api_path_base,
-                            'POST',
-                            body=document,
+        if not kind or not api_version:
+            raise ValueError("YAML must include 'kind' and 'apiVersion' fields.")
+
+        if operation == "apply":
+            # Server-side apply: uma requisição por documento, tanto para os kinds
+            # tipados quanto para recursos customizados (Gateway API)
+            document = strip_hpa_managed_fields(document, hpa_scale_targets)
+            try:
+                self.server_side_apply(document)
+            except ApiException as e:
+                if e.status == 404:
+                    # Namespace removido fora do Tron: verificar novamente no próximo apply
+                    self.forget_namespace(namespace)
+                raise HTTPException(
+                    status_code=e.status,
+                    detail=f"Failed to {operation} {kind} '{name}': {str(e)}"
+                )
+            return
+
+        api_mapping = K8S_API_MAPPING.get(kind)
+
+        # Se o recurso não está no mapeamento padrão, usar API REST diretamente
+        # Isso é necessário para recursos customizados como Gateway API (HTTPRoute, TCPRoute, UDPRoute)
+        if not api_mapping:
+            # Extrair o grupo e versão da API do apiVersion
+            # Formato: grupo/versão (ex: gateway.networking.k8s.io/v1)
+            # ou apenas versão para APIs core (ex: v1)
+            api_parts = api_version.split('/')
+            if len(api_parts) == 2:
+                api_group, api_version_part = api_parts
+            else:
+                # API core (ex: v1)
+                api_group = ""
+                api_version_part = api_version
+
+            # Converter o kind para o nome do recurso no path da API
+            # Gateway API usa lowercase plural: HTTPRoute -> httproutes, TCPRoute -> tcproutes
+            resource_name = kind_to_resource_name(kind)
+
+            # Determinar o path da API baseado no grupo
+            if api_group:
+                # API customizada: /apis/{group}/{version}/namespaces/{namespace}/{resource}/{name}
+                api_path_base = f"/apis/{api_group}/{api_version_part}/namespaces/{namespace}/{resource_name}"
+            else:
+                # API core: /api/{version}/namespaces/{namespace}/{resource}/{name}
+                api_path_base = f"/api/{api_version_part}/namespaces/{namespace}/{resource_name}"
+
+            # Aplicar usando API REST diretamente
+            try:
+                if operation == "create":
+                    # POST para criar
+                    self.api_client.call_api(
+                        api_path_base,
+                        'POST',
+                        body=document,
+                        auth_settings=['BearerToken'],
+                        response_type='object',
+                        _preload_content=True
+                    )
+                elif operation == "update":
+                    # PUT para atualizar - precisa obter resourceVersion primeiro
+                    try:
+                        # Ler o recurso existente para obter o resourceVersion
+                        existing_response = self.api_client.call_api(
+                            f"{api_path_base}/{name}",
+                            'GET',
                             auth_settings=['BearerToken'],
                             response_type='object',
                             _preload_content=True
                         )
-                    elif operation == "update":
-                        # PUT para atualizar - precisa obter resourceVersion primeiro
-                        try:
-                            # Ler o recurso existente para obter o resourceVersion
-                            existing_response = self.api_client.call_api(
-                                f"{api_path_base}/{name}",
-                                'GET',
-                                auth_settings=['BearerToken'],
-                                response_type='object',
-                                _preload_content=True
-                            )
-                            existing_resource = existing_response[0] if isinstance(existing_response, tuple) else existing_response
-
-                            # Incluir resourceVersion no documento se existir
-                            if existing_resource and 'metadata' in existing_resource:
-                                existing_metadata = existing_resource['metadata']
-                                if 'resourceVersion' in existing_metadata:
-                                    if 'metadata' not in document:
-                                        document['metadata'] = {}
-                                    document['metadata']['resourceVersion'] = existing_metadata['resourceVersion']
-                        except ApiException as read_e:
-                            if read_e.status != 404:
-                                # Se não conseguir ler e não for 404, relançar o erro
-                                raise read_e
+                        existing_resource = existing_response[0] if isinstance(existing_response, tuple) else existing_response
+
+                        # Incluir resourceVersion no documento se existir
+                        if existing_resource and 'metadata' in existing_resource:
+                            existing_metadata = existing_resource['metadata']
+                            if 'resourceVersion' in existing_metadata:
+                                if 'metadata' not in document:
+                                    document['metadata'] = {}
+                                document['metadata']['resourceVersion'] = existing_metadata['resourceVersion']
+                    except ApiException as read_e:
+                        if read_e.status != 404:
+                            # Se não conseguir ler e não for 404, relançar o erro
+                            raise read_e
+
+                    # PUT para atualizar
+                    self.api_client.call_api(
+                        f"{api_path_base}/{name}",
+                        'PUT',
+                        body=document,
+                        auth_settings=['BearerToken'],
+                        response_type='object',
+                        _preload_content=True
+                    )
+                elif operation == "upsert":
+                    # Tenta atualizar primeiro, se não existir, cria
+                    try:
+                        # Ler o recurso existente para obter o resourceVersion
+                        existing_response = self.api_client.call_api(
+                            f"{api_path_base}/{name}",
+                            'GET',
+                            auth_settings=['BearerToken'],
+                            response_type='object',
+                            _preload_content=True
+                        )
+                        existing_resource = existing_response[0] if isinstance(existing_response, tuple) else existing_response
+
+                        # Incluir resourceVersion no documento se existir
+                        if existing_resource and 'metadata' in existing_resource:
+                            existing_metadata = existing_resource['metadata']
+                            if 'resourceVersion' in existing_metadata:
+                                if 'metadata' not in document:
+                                    document['metadata'] = {}
+                                document['metadata']['resourceVersion'] = existing_metadata['resourceVersion']
 
                         # PUT para atualizar
                         self.api_client.call_api(
@@ -489,143 +1187,185 @@ class K8sClient:
                             response_type='object',
                             _preload_content=True
                         )
-                    elif operation == "upsert":
-                        # Tenta atualizar primeiro, se não existir, cria
-                        try:
-                            # Ler o recurso existente para obter o resourceVersion
-                            existing_response = self.api_client.call_api(
-                                f"{api_path_base}/{name}",
-                                'GET',
-                                auth_settings=['BearerToken'],
-                                response_type='object',
-                                _preload_content=True
-                            )
-                            existing_resource = existing_response[0] if isinstance(existing_response, tuple) else existing_response
-
-                            # Incluir resourceVersion no documento se existir
-                            if existing_resource and 'metadata' in existing_resource:
-                                existing_metadata = existing_resource['metadata']
-                                if 'resourceVersion' in existing_metadata:
-                                    if 'metadata' not in document:
-                                        document['metadata'] = {}
-                                    document['metadata']['resourceVersion'] = existing_metadata['resourceVersion']
-
-                            # PUT para atualizar
+                    except ApiException as e:
+                        if e.status == 404:
+                            # Recurso não existe, criar
                             self.api_client.call_api(
-                                f"{api_path_base}/{name}",
-                                'PUT',
+                                api_path_base,
+                                'POST',
                                 body=document,
                                 auth_settings=['BearerToken'],
                                 response_type='object',
                                 _preload_content=True
                             )
-                        except ApiException as e:
-                            if e.status == 404:
-                                # Recurso não existe, criar
-                                self.api_client.call_api(
-                                    api_path_base,
-                                    'POST',
-                                    body=document,
-                                    auth_settings=['BearerToken'],
-                                    response_type='object',
-                                    _preload_content=True
-                                )
-                            else:
-                                raise e
-                    elif operation == "delete":
-                        # DELETE para remover
-                        try:
-                            self.api_client.call_api(
-                                f"{api_path_base}/{name}",
-                                'DELETE',
-                                body=client.V1DeleteOptions(),
-                                auth_settings=['BearerToken'],
-                                response_type='object',
-                                _preload_content=True
-                            )
-                        except ApiException as e:
-                            if e.status == 404:
-                                # Recurso já não existe, isso é aceitável
-                                pass
-                            else:
-                                raise e
-                except ApiException as e:
-                    raise HTTPException(
-                        status_code=e.status,
-                        detail=f"Failed to {operation} {kind} '{name}': {str(e)}"
-                    )
-            else:
-                # Usar o mapeamento padrão para recursos conhecidos
-                api_class, create_method, delete_method, replace_method = api_mapping
-
-                api_instance = api_class(self.api_client)
-
-                if operation == "create":
-                    getattr(api_instance, create_method)(
-                        namespace=namespace, body=document
-                    )
-                elif operation == "update":
-                    getattr(api_instance, replace_method)(
-                        name=name, namespace=namespace, body=document
-                    )
-                elif operation == "upsert":
-                    # Tenta atualizar primeiro, se não existir, cria
-                    try:
-                        # Para Deployments, preservar o número de réplicas atual se não especificado
-                        if kind == "Deployment" and "spec" in document:
-                            try:
-                                read_method = getattr(api_instance, "read_namespaced_deployment", None)
-                                if read_method:
-                                    existing_deployment = read_method(name=name, namespace=namespace)
-
-                                    # Se o novo documento não especifica replicas, preservar o valor atual
-                                    # Isso evita que o Kubernetes resete para o valor padrão (1) ou conflite com HPA
-                                    if "replicas" not in document.get("spec", {}):
-                                        if hasattr(existing_deployment.spec, "replicas") and existing_deployment.spec.replicas is not None:
-                                            document["spec"]["replicas"] = existing_deployment.spec.replicas
-
-                                    # Preservar também resourceVersion e outras metadatas necessárias para evitar conflitos
-                                    # O resourceVersion é necessário para o replace funcionar corretamente
-                                    if hasattr(existing_deployment.metadata, "resource_version") and existing_deployment.metadata.resource_version:
-                                        if "metadata" not in document:
-                                            document["metadata"] = {}
-                                        document["metadata"]["resourceVersion"] = existing_deployment.metadata.resource_version
-
-                                        # Preservar também generation se existir
-                                        if hasattr(existing_deployment.metadata, "generation") and existing_deployment.metadata.generation:
-                                            document["metadata"]["generation"] = existing_deployment.metadata.generation
-                            except ApiException as read_e:
-                                # Se não conseguir ler (404 ou outro erro), continua normalmente
-                                # Isso significa que o deployment não existe ainda, então criaremos
-                                if read_e.status != 404:
-                                    # Se for outro erro, loga mas continua
-                                    print(f"Warning: Could not read existing deployment to preserve replicas: {read_e}")
-
-                        getattr(api_instance, replace_method)(
-                            name=name, namespace=namespace, body=document
-                        )
-                    except ApiException as e:
-                        if e.status == 404:
-                            # Recurso não existe, criar
-                            getattr(api_instance, create_method)(
-                                namespace=namespace, body=document
-                            )
                         else:
                             raise e
                 elif operation == "delete":
+                    # DELETE para remover
                     try:
-                        getattr(api_instance, delete_method)(
-                            name=name, namespace=namespace, body=client.V1DeleteOptions()
+                        self.api_client.call_api(
+                            f"{api_path_base}/{name}",
+                            'DELETE',
+                            body=client.V1DeleteOptions(),
+                            auth_settings=['BearerToken'],
+                            response_type='object',
+                            _preload_content=True
                         )
                     except ApiException as e:
                         if e.status == 404:
-                            # Recurso já não existe no Kubernetes, isso é aceitável
-                            # O objetivo é deletar e se já não existe, consideramos sucesso
+                            # Recurso já não existe, isso é aceitável
                             pass
                         else:
                             raise e
+            except ApiException as e:
+                raise HTTPException(
+                    status_code=e.status,
+                    detail=f"Failed to {operation} {kind} '{name}': {str(e)}"
+                )
+        else:
+            # Usar o mapeamento padrão para recursos conhecidos
+            api_class, create_method, delete_method, replace_method = api_mapping
+
+            api_instance = api_class(self.api_client)
+
+            if operation == "create":
+                getattr(api_instance, create_method)(
+                    namespace=namespace, body=document
+                )
+            elif operation == "update":
+                getattr(api_instance, replace_method)(
+                    name=name, namespace=namespace, body=document
+                )
+            elif operation == "upsert":
+                # Tenta atualizar primeiro, se não existir, cria
+                try:
+                    # Para Deployments, preservar o número de réplicas atual se não especificado
+                    if kind == "Deployment" and "spec" in document:
+                        try:
+                            read_method = getattr(api_instance, "read_namespaced_deployment", None)
+                            if read_method:
+                                existing_deployment = read_method(name=name, namespace=namespace)
+
+                                # Se o novo documento não especifica replicas, preservar o valor atual
+                                # Isso evita que o Kubernetes resete para o valor padrão (1) ou conflite com HPA
+                                if "replicas" not in document.get("spec", {}):
+                                    if hasattr(existing_deployment.spec, "replicas") and existing_deployment.spec.replicas is not None:
+                                        document["spec"]["replicas"] = existing_deployment.spec.replicas
+
+                                # Preservar também resourceVersion e outras metadatas necessárias para evitar conflitos
+                                # O resourceVersion é necessário para o replace funcionar corretamente
+                                if hasattr(existing_deployment.metadata, "resource_version") and existing_deployment.metadata.resource_version:
+                                    if "metadata" not in document:
+                                        document["metadata"] = {}
+                                    document["metadata"]["resourceVersion"] = existing_deployment.metadata.resource_version
+
+                                    # Preservar também generation se existir
+                                    if hasattr(existing_deployment.metadata, "generation") and existing_deployment.metadata.generation:
+                                        document["metadata"]["generation"] = existing_deployment.metadata.generation
+                        except ApiException as read_e:
+                            # Se não conseguir ler (404 ou outro erro), continua normalmente
+                            # Isso significa que o deployment não existe ainda, então criaremos
+                            if read_e.status != 404:
+                                # Se for outro erro, loga mas continua
+                                print(f"Warning: Could not read existing deployment to preserve replicas: {read_e}")
+
+                    getattr(api_instance, replace_method)(
+                        name=name, namespace=namespace, body=document
+                    )
+                except ApiException as e:
+                    if e.status == 404:
+                        # Recurso não existe, criar
+                        getattr(api_instance, create_method)(
+                            namespace=namespace, body=document
+                        )
+                    else:
+                        raise e
+            elif operation == "delete":
+                try:
+                    getattr(api_instance, delete_method)(
+                        name=name, namespace=namespace, body=client.V1DeleteOptions()
+                    )
+                except ApiException as e:
+                    if e.status == 404:
+                        # Recurso já não existe no Kubernetes, isso é aceitável
+                        # O objetivo é deletar e se já não existe, consideramos sucesso
+                        pass
+                    else:
+                        raise e
+
+    def list_raw_items(self, path: str, label_selector: str = None, field_selector: str = None,
+                       accept: str = 'application/json') -> list[dict]:
+        """
+        Lista todos os itens de uma coleção como JSON cru (dicts em camelCase), em páginas de
+        K8S_LIST_CHUNK_SIZE. A resposta é lida com _preload_content=False, sem desserializar
+        nos modelos do kubernetes-client.
+        """
+        query_params = [("labelSelector", label_selector), ("fieldSelector", field_selector)]
+        query_params = [(key, value) for key, value in query_params if value is not None]
+
+        items = []
+        continue_token = None
+        while True:
+            page_params = query_params + [("limit", K8S_LIST_CHUNK_SIZE)]
+            if continue_token:
+                page_params.append(("continue", continue_token))
+            response = self.api_client.call_api(
+                path,
+                'GET',
+                query_params=page_params,
+                header_params={'Accept': accept},
+                auth_settings=['BearerToken'],
+                _preload_content=False,
+            )[0]
+            try:
+                page = json.loads(response.data)
+            finally:
+                response.release_conn()
+
+            items.extend(page.get("items") or [])
+            continue_token = (page.get("metadata") or {}).get("continue")
+            if not continue_token:
+                return items
+
+    def list_object_names(self, api_version: str, kind: str, namespace: str, label_selector: str = None) -> list[str]:
+        """
+        Lista apenas os nomes dos objetos de um kind, pedindo ao API server somente os metadados
+        (PartialObjectMetadataList): specs e status não trafegam nem são decodificados.
+        """
+        items = self.list_raw_items(
+            resource_collection_path(api_version, kind, namespace),
+            label_selector=label_selector,
+            accept=PARTIAL_OBJECT_METADATA_ACCEPT,
+        )
+        return [(item.get("metadata") or {}).get("name") for item in items]
+
+    def list_pod_names(self, namespace: str, label_selector: str = None) -> list[str]:
+        """Lista os nomes dos pods de um namespace (somente metadados, ver list_object_names)."""
+        return self.list_object_names("v1", "Pod", namespace, label_selector=label_selector)
+
+    def get_pod_usage(self, namespace: str) -> dict:
+        """
+        Uso real de CPU e memória dos pods de um namespace, com uma única listagem de
+        PodMetrics (metrics.k8s.io) reaproveitada por K8S_POD_METRICS_TTL_SECONDS.
 
-        return f"Documents applied successfully"
+        Returns:
+            Dict nome do pod -> {"cpu_usage": cores, "memory_usage": MB}; vazio se o
+            metrics-server não estiver instalado ou disponível
+        """
+        pod_usage = self.pod_metrics_cache.get(namespace)
+        if pod_usage is not None:
+            return pod_usage
+
+        pod_usage = {}
+        if self.check_api_available(usage.METRICS_API_GROUP):
+            try:
+                pod_usage = usage.build_pod_usage(
+                    self.list_raw_items(usage.POD_METRICS_PATH.format(namespace=namespace))
+                )
+            except ApiException as e:
+                print(f"Warning: Could not list pod metrics in namespace '{namespace}': {e}")
+        self.pod_metrics_cache.set(namespace, pod_usage)
+        return pod_usage
 
     def list_pods(self, namespace: str, label_selector: str = None):
         """
@@ -639,165 +1379,34 @@ class K8sClient:
             Lista de pods com informações formatadas
         """
         try:
-            v1 = client.CoreV1Api(self.api_client)
-
-            if label_selector:
-                pods = v1.list_namespaced_pod(namespace=namespace, label_selector=label_selector).items
-            else:
-                pods = v1.list_namespaced_pod(namespace=namespace).items
-
-            # Formatar dados dos pods
-            formatted_pods = []
-            for pod in pods:
-                # Calcular CPU e Memory dos containers
-                cpu_requests = 0
-                cpu_limits = 0
-                memory_requests = 0
-                memory_limits = 0
-
-                for container in pod.spec.containers:
-                    if container.resources:
-                        # Acessar requests (é um dict no Kubernetes Python client)
-                        if container.resources.requests:
-                            requests = container.resources.requests
-                            if 'cpu' in requests:
-                                cpu_str = str(requests['cpu'])
-                                cpu_requests += self._parse_cpu(cpu_str)
-                            if 'memory' in requests:
-                                mem_str = str(requests['memory'])
-                                memory_requests += self._parse_memory(mem_str)
-
-                        # Acessar limits (é um dict no Kubernetes Python client)
-                        if container.resources.limits:
-                            limits = container.resources.limits
-                            if 'cpu' in limits:
-                                cpu_str = str(limits['cpu'])
-                                cpu_limits += self._parse_cpu(cpu_str)
-                            if 'memory' in limits:
-                                mem_str = str(limits['memory'])
-                                memory_limits += self._parse_memory(mem_str)
-
-                # Status do pod
-                status = "Unknown"
-                if pod.status.phase:
-                    status = pod.status.phase
-
-                # Restarts
-                restarts = 0
-                if pod.status.container_statuses:
-                    for container_status in pod.status.container_statuses:
-                        if container_status.restart_count:
-                            restarts += container_status.restart_count
-
-                # Age (tempo desde a criação)
-                age_seconds = 0
-                if pod.metadata.creation_timestamp:
-                    from datetime import datetime, timezone
-                    now = datetime.now(timezone.utc)
-                    age_seconds = int((now - pod.metadata.creation_timestamp).total_seconds())
-
-                # Host IP (IP do nó onde o pod está rodando)
-                host_ip = pod.status.host_ip if pod.status.host_ip else None
-
-                formatted_pods.append({
-                    "name": pod.metadata.name,
-                    "status": status,
-                    "restarts": restarts,
-                    "cpu_requests": cpu_requests,
-                    "cpu_limits": cpu_limits,
-                    "memory_requests": memory_requests,
-                    "memory_limits": memory_limits,
-                    "age_seconds": age_seconds,
-                    "host_ip": host_ip,
-                })
-
-            return formatted_pods
+            pods = self.list_raw_items(
+                f"/api/v1/namespaces/{namespace}/pods", label_selector=label_selector
+            )
+            return [formatters.format_pod(pod) for pod in pods]
         except ApiException as e:
             print(f"Erro ao listar pods: {e}")
             return []
 
-    def list_jobs(self, namespace: str, label_selector: str = None):
+    def list_jobs(self, namespace: str, label_selector: str = None, field_selector: str = None):
         """
-        Lista Jobs de um namespace, opcionalmente filtrados por label selector.
+        Lista Jobs de um namespace, opcionalmente filtrados por label/field selector.
         Usado para listar Jobs criados por CronJobs.
 
         Args:
             namespace: Nome do namespace
             label_selector: Seletor de labels (ex: "app=myapp")
+            field_selector: Seletor de campos (ex: "status.successful=1")
 
         Returns:
             Lista de jobs com informações formatadas
         """
         try:
-            batch_v1 = client.BatchV1Api(self.api_client)
-
-            if label_selector:
-                jobs = batch_v1.list_namespaced_job(namespace=namespace, label_selector=label_selector).items
-            else:
-                jobs = batch_v1.list_namespaced_job(namespace=namespace).items
-
-            # Formatar dados dos jobs
-            formatted_jobs = []
-            for job in jobs:
-                # Status do job
-                status = "Unknown"
-                if job.status.succeeded:
-                    status = "Succeeded"
-                elif job.status.failed:
-                    status = "Failed"
-                elif job.status.active:
-                    status = "Active"
-                elif job.status.conditions:
-                    # Verificar condições para status mais específico
-                    for condition in job.status.conditions:
-                        if condition.type == "Complete" and condition.status == "True":
-                            status = "Succeeded"
-                            break
-                        elif condition.type == "Failed" and condition.status == "True":
-                            status = "Failed"
-                            break
-
-                # Contagem de sucessos e falhas
-                succeeded = job.status.succeeded if job.status.succeeded else 0
-                failed = job.status.failed if job.status.failed else 0
-                active = job.status.active if job.status.active else 0
-
-                # Start time
-                start_time = None
-                if job.status.start_time:
-                    start_time = job.status.start_time.isoformat()
-
-                # Completion time
-                completion_time = None
-                if job.status.completion_time:
-                    completion_time = job.status.completion_time.isoformat()
-
-                # Age (tempo desde a criação)
-                age_seconds = 0
-                if job.metadata.creation_timestamp:
-                    from datetime import datetime, timezone
-                    now = datetime.now(timezone.utc)
-                    age_seconds = int((now - job.metadata.creation_timestamp).total_seconds())
-
-                # Duração (se completado)
-                duration_seconds = None
-                if start_time and completion_time:
-                    from datetime import datetime
-                    start = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                    completion = datetime.fromisoformat(completion_time.replace('Z', '+00:00'))
-                    duration_seconds = int((completion - start).total_seconds())
-
-                formatted_jobs.append({
-                    "name": job.metadata.name,
-                    "status": status,
-                    "succeeded": succeeded,
-                    "failed": failed,
-                    "active": active,
-                    "start_time": start_time,
-                    "completion_time": completion_time,
-                    "age_seconds": age_seconds,
-                    "duration_seconds": duration_seconds,
-                })
+            jobs = self.list_raw_items(
+                f"/apis/batch/v1/namespaces/{namespace}/jobs",
+                label_selector=label_selector,
+                field_selector=field_selector,
+            )
+            formatted_jobs = [formatters.format_job(job) for job in jobs]
 
             # Ordenar por criação (mais recente primeiro)
             formatted_jobs.sort(key=lambda x: x["age_seconds"], reverse=False)
@@ -839,70 +1448,25 @@ class K8sClient:
                 detail=f"Error deleting job '{job_name}': {str(e)}"
             )
 
-    def _parse_cpu(self, cpu_str: str) -> float:
-        """Converte string de CPU (ex: '500m', '1', '0.5') para float."""
-        if not cpu_str:
-            return 0.0
-        cpu_str = cpu_str.strip()
-        if cpu_str.endswith('m'):
-            return float(cpu_str[:-1]) / 1000
-        return float(cpu_str)
-
-    def list_events(self, namespace: str, field_selector: str = None):
+    def list_events(self, namespace: str, field_selector: str = None, label_selector: str = None):
         """
-        Lista eventos de um namespace, opcionalmente filtrados por field selector.
+        Lista eventos de um namespace, opcionalmente filtrados por field/label selector.
 
         Args:
             namespace: Nome do namespace
             field_selector: Filtro opcional (ex: "involvedObject.name=pod-name")
+            label_selector: Seletor de labels opcional
 
         Returns:
             Lista de eventos formatados
         """
         try:
-            v1 = client.CoreV1Api(self.api_client)
-
-            if field_selector:
-                events = v1.list_namespaced_event(
-                    namespace=namespace,
-                    field_selector=field_selector
-                ).items
-            else:
-                events = v1.list_namespaced_event(namespace=namespace).items
-
-            # Formatar dados dos eventos
-            formatted_events = []
-            for event in events:
-                # Calcular age (tempo desde a criação)
-                age_seconds = 0
-                if event.first_timestamp:
-                    from datetime import datetime, timezone
-                    now = datetime.now(timezone.utc)
-                    age_seconds = int((now - event.first_timestamp).total_seconds())
-
-                # Contagem de ocorrências
-                count = event.count if event.count else 1
-
-                formatted_events.append({
-                    "name": event.metadata.name,
-                    "namespace": event.metadata.namespace,
-                    "type": event.type,  # Normal, Warning
-                    "reason": event.reason or "Unknown",
-                    "message": event.message or "",
-                    "involved_object": {
-                        "kind": event.involved_object.kind if event.involved_object else None,
-                        "name": event.involved_object.name if event.involved_object else None,
-                        "namespace": event.involved_object.namespace if event.involved_object else None,
-                    },
-                    "source": {
-                        "component": event.source.component if event.source else None,
-                        "host": event.source.host if event.source else None,
-                    },
-                    "first_timestamp": event.first_timestamp.isoformat() if event.first_timestamp else None,
-                    "last_timestamp": event.last_timestamp.isoformat() if event.last_timestamp else None,
-                    "count": count,
-                    "age_seconds": age_seconds,
-                })
+            events = self.list_raw_items(
+                f"/api/v1/namespaces/{namespace}/events",
+                field_selector=field_selector,
+                label_selector=label_selector,
+            )
+            formatted_events = [formatters.format_event(event) for event in events]
 
             # Ordenar por timestamp (mais recente primeiro)
             formatted_events.sort(key=lambda x: x["age_seconds"], reverse=False)
@@ -912,16 +1476,31 @@ class K8sClient:
             print(f"Erro ao listar eventos: {e}")
             return []
 
-    def check_api_available(self, api_group: str) -> bool:
+    def check_api_available(self, api_group: str, refresh: bool = False) -> bool:
         """
         Verifica se uma API group está disponível no cluster Kubernetes.
+        O resultado fica no cache de descoberta do cliente (inclusive respostas 404).
 
         Args:
             api_group: Nome do API group (ex: 'gateway.networking.k8s.io')
+            refresh: Se True, ignora o cache e consulta o API server
 
         Returns:
             True se a API está disponível, False caso contrário
         """
+        return self.discovery.get(
+            ("api_group", api_group),
+            lambda: self._probe_api_group(api_group),
+            refresh=refresh,
+        )
+
+    def _probe_api_group(self, api_group: str) -> tuple[bool, str]:
+        """
+        Consulta /apis/{api_group} no API server.
+
+        Returns:
+            Tupla (disponível, status de descoberta)
+        """
         try:
             # Usar a API REST diretamente para verificar se o grupo existe
             # Fazendo uma requisição GET para /apis/{api_group}
@@ -941,67 +1520,97 @@ class K8sClient:
 
                 # Se a requisição foi bem-sucedida (status 200), o grupo existe
                 if status == 200:
-                    print(f"API group {api_group} encontrado via API REST")
-                    return True
+                    return True, discovery.FOUND
                 else:
                     print(f"API group {api_group} retornou status {status}")
-                    return False
+                    return False, discovery.ERROR
 
             except ApiException as api_err:
                 # Se der erro 404, o grupo não está disponível
                 if api_err.status == 404:
                     print(f"API group {api_group} não encontrado (404)")
-                    return False
+                    return False, discovery.NOT_FOUND
                 else:
                     print(f"Erro ao verificar API group {api_group}: {api_err}")
-                    return False
+                    return False, discovery.ERROR
 
-        except ApiException as e:
-            print(f"Erro ao verificar API group {api_group}: {e}")
-            return False
         except Exception as e:
             print(f"Erro inesperado ao verificar API group {api_group}: {e}")
             import traceback
             traceback.print_exc()
-            return False
+            return False, discovery.ERROR
 
-    def get_gateway_api_resources(self) -> list[str]:
+    def get_gateway_api_resources(self, refresh: bool = False) -> list[str]:
         """
         Lista os recursos Gateway API disponíveis no cluster usando a API de descoberta.
         Equivalente ao comando 'kubectl api-resources --api-group=gateway.networking.k8s.io'
+        O resultado fica no cache de descoberta do cliente.
+
+        Args:
+            refresh: Se True, ignora o cache e consulta o API server
 
         Returns:
             Lista de recursos disponíveis (ex: ['HTTPRoute', 'TCPRoute', 'UDPRoute'])
         """
-        available_resources = []
+        return list(self.discovery.get(
+            ("api_group_kinds", "gateway.networking.k8s.io"),
+            lambda: self._discover_group_kinds("gateway.networking.k8s.io"),
+            refresh=refresh,
+        ))
 
+    def _discover_group_kinds(self, api_group: str) -> tuple[list[str], str]:
+        """
+        Descobre os kinds servidos por um API group percorrendo todas as versões
+        anunciadas em /apis/{api_group}.
+
+        Returns:
+            Tupla (lista ordenada de kinds, status de descoberta)
+        """
         try:
-            # Usar a API de descoberta para listar recursos do grupo gateway.networking.k8s.io
-            # Isso é equivalente ao comando kubectl api-resources --api-group=gateway.networking.k8s.io
-            discovery_api = client.DiscoveryV1Api(self.api_client)
+            group_response = self.api_client.call_api(
+                f"/apis/{api_group}",
+                'GET',
+                auth_settings=['BearerToken'],
+                response_type='object',
+                _preload_content=True
+            )
+            group_data = group_response[0] if isinstance(group_response, tuple) else group_response
 
-            # Obter todos os recursos da API
-            api_resources = discovery_api.get_api_resources(group="gateway.networking.k8s.io")
+            available_resources = set()
+            for version in (group_data or {}).get('versions', []):
+                group_version = version.get('groupVersion')
+                if not group_version:
+                    continue
 
-            # Filtrar apenas os recursos do grupo gateway.networking.k8s.io
-            for resource in api_resources.resources:
-                # Adicionar o kind do recurso (ex: HTTPRoute, TCPRoute, UDPRoute)
-                if resource.kind:
-                    available_resources.append(resource.kind)
+                version_response = self.api_client.call_api(
+                    f"/apis/{group_version}",
+                    'GET',
+                    auth_settings=['BearerToken'],
+                    response_type='object',
+                    _preload_content=True
+                )
+                version_data = version_response[0] if isinstance(version_response, tuple) else version_response
 
-            # Remover duplicatas e ordenar
-            available_resources = sorted(list(set(available_resources)))
+                for resource in (version_data or {}).get('resources', []):
+                    # Ignorar subrecursos (ex: httproutes/status)
+                    if '/' in resource.get('name', ''):
+                        continue
+                    if resource.get('kind'):
+                        available_resources.add(resource['kind'])
+
+            return sorted(available_resources), discovery.FOUND
 
         except ApiException as e:
+            if e.status == 404:
+                # API group não instalado no cluster
+                return [], discovery.NOT_FOUND
             # Se der erro, tentar método alternativo verificando versões conhecidas
             print(f"Warning: Error getting Gateway API resources via discovery: {e}")
-            available_resources = self._fallback_get_gateway_resources()
+            return self._fallback_get_gateway_resources(), discovery.ERROR
         except Exception as e:
             # Erro inesperado, tentar método alternativo
             print(f"Warning: Unexpected error getting Gateway API resources: {e}")
-            available_resources = self._fallback_get_gateway_resources()
-
-        return available_resources
+            return self._fallback_get_gateway_resources(), discovery.ERROR
 
     def _fallback_get_gateway_resources(self) -> list[str]:
         """
@@ -1166,30 +1775,3 @@ class K8sClient:
         except Exception as e:
             print(f"Error getting Gateway reference: {e}")
             return None
-
-    def _parse_memory(self, memory_str: str) -> int:
-        """Converte string de memória (ex: '512Mi', '1Gi', '1000M') para MB."""
-        if not memory_str:
-            return 0
-        memory_str = memory_str.strip()
-
-        # Remover sufixos e converter
-        if memory_str.endswith('Ki'):
-            return int(memory_str[:-2]) // 1024
-        elif memory_str.endswith('Mi'):
-            return int(memory_str[:-2])
-        elif memory_str.endswith('Gi'):
-            return int(memory_str[:-2]) * 1024
-        elif memory_str.endswith('Ti'):
-            return int(memory_str[:-2]) * 1024 * 1024
-        elif memory_str.endswith('K'):
-            return int(memory_str[:-1]) // 1000
-        elif memory_str.endswith('M'):
-            return int(memory_str[:-1])
-        elif memory_str.endswith('G'):
-            return int(memory_str[:-1]) * 1000
-        elif memory_str.endswith('T'):
-            return int(memory_str[:-1]) * 1000 * 1000
-        else:
-            # Assumir bytes
-            return int(memory_str) // (1024 * 1024)
@@ -0,0 +1,129 @@
+from app.k8s.apply import MANIFEST_HASH_ANNOTATION
+
+
+# Campos preenchidos pelo servidor que mudam a cada escrita e não interessam no diff
+IGNORED_METADATA_FIELDS = (
+    "managedFields",
+    "resourceVersion",
+    "generation",
+    "creationTimestamp",
+    "uid",
+    "selfLink",
+)
+IGNORED_ANNOTATIONS = (
+    MANIFEST_HASH_ANNOTATION,
+    "deployment.kubernetes.io/revision",
+    "kubectl.kubernetes.io/last-applied-configuration",
+)
+
+# Kinds cujo conteúdo não deve ser exposto no diff
+MASKED_KINDS = ("Secret",)
+MASKED_VALUE = "***"
+
+
+def normalize_object(obj: dict | None) -> dict | None:
+    """Remove status e metadados voláteis de um objeto antes da comparação."""
+    if obj is None:
+        return None
+
+    metadata = {k: v for k, v in (obj.get("metadata") or {}).items() if k not in IGNORED_METADATA_FIELDS}
+    annotations = {
+        k: v for k, v in (metadata.get("annotations") or {}).items() if k not in IGNORED_ANNOTATIONS
+    }
+    if annotations:
+        metadata["annotations"] = annotations
+    else:
+        metadata.pop("annotations", None)
+
+    return {
+        **{k: v for k, v in obj.items() if k not in ("status", "metadata")},
+        "metadata": metadata,
+    }
+
+
+def _join(path: str, key) -> str:
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    return f"{path}.{key}" if path else str(key)
+
+
+def diff_objects(before, after, path: str = "") -> list[dict]:
+    """
+    Compara dois objetos (JSON) e retorna as diferenças campo a campo.
+
+    Dicts são comparados por chave e listas do mesmo tamanho item a item; listas de
+    tamanhos diferentes são reportadas como uma substituição inteira.
+
+    Returns:
+        Lista de {"path", "op" (add, remove, replace), "before", "after"}
+    """
+    if before == after:
+        return []
+
+    if isinstance(before, dict) and isinstance(after, dict):
+        changes = []
+        for key in sorted(set(before) | set(after), key=str):
+            child_path = _join(path, key)
+            if key not in before:
+                changes.append({"path": child_path, "op": "add", "before": None, "after": after[key]})
+            elif key not in after:
+                changes.append({"path": child_path, "op": "remove", "before": before[key], "after": None})
+            else:
+                changes.extend(diff_objects(before[key], after[key], child_path))
+        return changes
+
+    if isinstance(before, list) and isinstance(after, list) and len(before) == len(after):
+        changes = []
+        for index, (before_item, after_item) in enumerate(zip(before, after)):
+            changes.extend(diff_objects(before_item, after_item, _join(path, index)))
+        return changes
+
+    return [{"path": path, "op": "replace", "before": before, "after": after}]
+
+
+def mask_changes(kind: str, changes: list[dict]) -> list[dict]:
+    """Oculta os valores de objetos sensíveis (Secrets), mantendo apenas os paths."""
+    if kind not in MASKED_KINDS:
+        return changes
+    return [
+        {
+            **change,
+            "before": MASKED_VALUE if change["before"] is not None else None,
+            "after": MASKED_VALUE if change["after"] is not None else None,
+        }
+        for change in changes
+    ]
+
+
+def diff_result(document: dict, live: dict | None, desired: dict | None, error: str = None) -> dict:
+    """
+    Monta o resultado do diff de um objeto.
+
+    Args:
+        document: Manifesto renderizado
+        live: Objeto atual no cluster (None se não existir)
+        desired: Objeto resultante do dry-run (ou o próprio manifesto se o dry-run não foi possível)
+        error: Mensagem de erro do dry-run, se houver
+    """
+    metadata = document.get("metadata") or {}
+    result = {
+        "kind": document.get("kind"),
+        "name": metadata.get("name"),
+        "namespace": metadata.get("namespace"),
+    }
+
+    if error is not None:
+        return {**result, "action": "error", "changes": [], "error": error}
+
+    live = normalize_object(live)
+    desired = normalize_object(desired)
+    changes = mask_changes(result["kind"], diff_objects(live or {}, desired or {}))
+
+    if live is None:
+        action = "create"
+    elif changes:
+        action = "update"
+    else:
+        action = "unchanged"
+
+    return {**result, "action": action, "changes": changes}
@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+
+
+K8S_DISCOVERY_TTL_SECONDS = float(os.getenv("K8S_DISCOVERY_TTL_SECONDS", "300"))
+K8S_DISCOVERY_NEGATIVE_TTL_SECONDS = float(os.getenv("K8S_DISCOVERY_NEGATIVE_TTL_SECONDS", "60"))
+
+# Status retornado pelos loaders de descoberta
+FOUND = "found"
+NOT_FOUND = "not_found"
+ERROR = "error"
+
+
+class DiscoveryCache:
+    """
+    Cache com TTL para dados de descoberta da API de um cluster (API groups, kinds).
+
+    Os loaders retornam uma tupla (valor, status):
+      - FOUND: valor cacheado por `ttl` segundos
+      - NOT_FOUND: resposta 404 definitiva, cacheada por `negative_ttl` segundos
+      - ERROR: falha transitória, não é cacheada
+    """
+
+    def __init__(
+        self,
+        ttl: float = K8S_DISCOVERY_TTL_SECONDS,
+        negative_ttl: float = K8S_DISCOVERY_NEGATIVE_TTL_SECONDS,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, loader, refresh: bool = False):
+        """
+        Retorna o valor cacheado para `key` ou executa o loader.
+
+        Args:
+            key: Chave do dado de descoberta (ex: ("api_group", "gateway.networking.k8s.io"))
+            loader: Função sem argumentos que retorna (valor, status)
+            refresh: Se True, ignora o valor cacheado
+        """
+        now = time.monotonic()
+        if not refresh:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+
+        value, status = loader()
+
+        if status == FOUND:
+            expires_at = time.monotonic() + self.ttl
+        elif status == NOT_FOUND:
+            expires_at = time.monotonic() + self.negative_ttl
+        else:
+            return value
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+        return value
+
+    def invalidate(self, key=None):
+        """Remove uma chave específica ou todo o cache."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "ttl_seconds": self.ttl,
+                "negative_ttl_seconds": self.negative_ttl,
+            }
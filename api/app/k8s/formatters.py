@@ -0,0 +1,171 @@
+from datetime import datetime, timezone
+
+
+# Formatação dos objetos Kubernetes a partir do JSON cru retornado pelo API server
+# (camelCase), no mesmo formato retornado por K8sClient.list_pods/list_jobs/list_events.
+
+
+def parse_cpu(cpu_str: str) -> float:
+    """Converte string de CPU (ex: '500m', '1', '0.5') para float."""
+    if not cpu_str:
+        return 0.0
+    cpu_str = cpu_str.strip()
+    if cpu_str.endswith('m'):
+        return float(cpu_str[:-1]) / 1000
+    return float(cpu_str)
+
+
+def parse_memory(memory_str: str) -> int:
+    """Converte string de memória (ex: '512Mi', '1Gi', '1000M') para MB."""
+    if not memory_str:
+        return 0
+    memory_str = memory_str.strip()
+
+    # Remover sufixos e converter
+    if memory_str.endswith('Ki'):
+        return int(memory_str[:-2]) // 1024
+    elif memory_str.endswith('Mi'):
+        return int(memory_str[:-2])
+    elif memory_str.endswith('Gi'):
+        return int(memory_str[:-2]) * 1024
+    elif memory_str.endswith('Ti'):
+        return int(memory_str[:-2]) * 1024 * 1024
+    elif memory_str.endswith('K'):
+        return int(memory_str[:-1]) // 1000
+    elif memory_str.endswith('M'):
+        return int(memory_str[:-1])
+    elif memory_str.endswith('G'):
+        return int(memory_str[:-1]) * 1000
+    elif memory_str.endswith('T'):
+        return int(memory_str[:-1]) * 1000 * 1000
+    else:
+        # Assumir bytes
+        return int(memory_str) // (1024 * 1024)
+
+
+def parse_timestamp(value: str | None) -> datetime | None:
+    """Converte um timestamp RFC3339 do Kubernetes (ex: '2024-01-01T10:00:00Z') para datetime."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _age_seconds(timestamp: datetime | None) -> int:
+    if not timestamp:
+        return 0
+    return int((datetime.now(timezone.utc) - timestamp).total_seconds())
+
+
+def format_pod(pod: dict) -> dict:
+    metadata = pod.get("metadata") or {}
+    spec = pod.get("spec") or {}
+    status = pod.get("status") or {}
+
+    # Calcular CPU e Memory dos containers
+    cpu_requests = 0
+    cpu_limits = 0
+    memory_requests = 0
+    memory_limits = 0
+
+    for container in spec.get("containers") or []:
+        resources = container.get("resources") or {}
+        requests = resources.get("requests") or {}
+        limits = resources.get("limits") or {}
+        if 'cpu' in requests:
+            cpu_requests += parse_cpu(str(requests['cpu']))
+        if 'memory' in requests:
+            memory_requests += parse_memory(str(requests['memory']))
+        if 'cpu' in limits:
+            cpu_limits += parse_cpu(str(limits['cpu']))
+        if 'memory' in limits:
+            memory_limits += parse_memory(str(limits['memory']))
+
+    # Restarts
+    restarts = 0
+    for container_status in status.get("containerStatuses") or []:
+        restarts += container_status.get("restartCount") or 0
+
+    return {
+        "name": metadata.get("name"),
+        "status": status.get("phase") or "Unknown",
+        "restarts": restarts,
+        "cpu_requests": cpu_requests,
+        "cpu_limits": cpu_limits,
+        "memory_requests": memory_requests,
+        "memory_limits": memory_limits,
+        "age_seconds": _age_seconds(parse_timestamp(metadata.get("creationTimestamp"))),
+        "host_ip": status.get("hostIP") or None,
+    }
+
+
+def format_job(job: dict) -> dict:
+    metadata = job.get("metadata") or {}
+    status = job.get("status") or {}
+
+    # Status do job
+    job_status = "Unknown"
+    if status.get("succeeded"):
+        job_status = "Succeeded"
+    elif status.get("failed"):
+        job_status = "Failed"
+    elif status.get("active"):
+        job_status = "Active"
+    else:
+        # Verificar condições para status mais específico
+        for condition in status.get("conditions") or []:
+            if condition.get("type") == "Complete" and condition.get("status") == "True":
+                job_status = "Succeeded"
+                break
+            elif condition.get("type") == "Failed" and condition.get("status") == "True":
+                job_status = "Failed"
+                break
+
+    start = parse_timestamp(status.get("startTime"))
+    completion = parse_timestamp(status.get("completionTime"))
+
+    # Duração (se completado)
+    duration_seconds = None
+    if start and completion:
+        duration_seconds = int((completion - start).total_seconds())
+
+    return {
+        "name": metadata.get("name"),
+        "status": job_status,
+        "succeeded": status.get("succeeded") or 0,
+        "failed": status.get("failed") or 0,
+        "active": status.get("active") or 0,
+        "start_time": start.isoformat() if start else None,
+        "completion_time": completion.isoformat() if completion else None,
+        "age_seconds": _age_seconds(parse_timestamp(metadata.get("creationTimestamp"))),
+        "duration_seconds": duration_seconds,
+    }
+
+
+def format_event(event: dict) -> dict:
+    metadata = event.get("metadata") or {}
+    involved_object = event.get("involvedObject") or {}
+    source = event.get("source") or {}
+
+    first_timestamp = parse_timestamp(event.get("firstTimestamp"))
+    last_timestamp = parse_timestamp(event.get("lastTimestamp"))
+
+    return {
+        "name": metadata.get("name"),
+        "namespace": metadata.get("namespace"),
+        "type": event.get("type"),  # Normal, Warning
+        "reason": event.get("reason") or "Unknown",
+        "message": event.get("message") or "",
+        "involved_object": {
+            "kind": involved_object.get("kind"),
+            "name": involved_object.get("name"),
+            "namespace": involved_object.get("namespace"),
+        },
+        "source": {
+            "component": source.get("component"),
+            "host": source.get("host"),
+        },
+        "first_timestamp": first_timestamp.isoformat() if first_timestamp else None,
+        "last_timestamp": last_timestamp.isoformat() if last_timestamp else None,
+        "count": event.get("count") or 1,
+        "age_seconds": _age_seconds(first_timestamp),
+    }
@@ -0,0 +1,89 @@
+import threading
+import time
+
+
+class GatewayReferenceCache:
+    """
+    Cache da referência do Gateway (namespace/name) de um cluster.
+
+    A busca no cluster (K8sClient.get_gateway_reference) percorre várias versões
+    e namespaces, então ela roda sempre em background: na carga inicial, no
+    cadastro do cluster e periodicamente. Os caminhos de deploy apenas leem o
+    valor cacheado.
+    """
+
+    # Usado nas mensagens de log e no nome da thread de busca
+    description = "Gateway reference"
+
+    def __init__(self):
+        self._value = None
+        self._loaded = False
+        self._refreshed_at = None
+        self._inflight = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def refreshed_at(self):
+        return self._refreshed_at
+
+    def get(self, loader, wait_timeout: float = 0) -> dict | None:
+        """
+        Retorna a referência cacheada.
+
+        Se o cache ainda estiver frio (ex: logo após o start do processo), agenda a busca
+        em background e aguarda no máximo `wait_timeout` segundos pelo resultado.
+        """
+        with self._lock:
+            if self._loaded:
+                return self._value
+            inflight = self._start_refresh_locked(loader)
+
+        if wait_timeout > 0:
+            inflight.wait(wait_timeout)
+
+        with self._lock:
+            return self._value if self._loaded else None
+
+    def refresh(self, loader) -> dict | None:
+        """Executa a busca de forma síncrona (usado pelas tarefas em background)."""
+        value = loader()
+        self._store(value)
+        return value
+
+    def refresh_async(self, loader):
+        """Agenda uma busca em background, reaproveitando uma busca já em andamento."""
+        with self._lock:
+            return self._start_refresh_locked(loader)
+
+    def set(self, value: dict | None):
+        self._store(value)
+
+    def _store(self, value):
+        with self._lock:
+            self._value = value
+            self._loaded = True
+            self._refreshed_at = time.time()
+
+    def _start_refresh_locked(self, loader) -> threading.Event:
+        if self._inflight is not None:
+            return self._inflight
+
+        inflight = threading.Event()
+        self._inflight = inflight
+
+        def run():
+            try:
+                self._store(loader())
+            except Exception as e:
+                print(f"Warning: Error refreshing {self.description}: {e}")
+            finally:
+                with self._lock:
+                    self._inflight = None
+                inflight.set()
+
+        threading.Thread(target=run, name=f"{self.description.lower().replace(' ', '-')}-refresh", daemon=True).start()
+        return inflight
@@ -0,0 +1,320 @@
+import json
+import os
+import socket
+import threading
+import time
+
+from kubernetes.client.rest import ApiException
+from kubernetes.watch.watch import iter_resp_lines
+
+
+K8S_INFORMERS_ENABLED = os.getenv("K8S_INFORMERS_ENABLED", "false").lower() == "true"
+# Informers sem leitura por esse tempo são encerrados (o namespace deixa de ser observado)
+K8S_INFORMER_IDLE_SECONDS = float(os.getenv("K8S_INFORMER_IDLE_SECONDS", "600"))
+K8S_INFORMER_WATCH_TIMEOUT_SECONDS = int(os.getenv("K8S_INFORMER_WATCH_TIMEOUT_SECONDS", "300"))
+
+
+def _label(name: str):
+    return lambda obj: ((obj.get("metadata") or {}).get("labels") or {}).get(name)
+
+
+def _involved_object_name(obj):
+    return (obj.get("involvedObject") or {}).get("name")
+
+
+# Recursos observáveis: path da coleção (por namespace) e índices mantidos no store
+INFORMER_RESOURCES = {
+    "pods": {
+        "path": "/api/v1/namespaces/{namespace}/pods",
+        "indexes": {"app": _label("app"), "job-name": _label("job-name")},
+    },
+    "jobs": {
+        "path": "/apis/batch/v1/namespaces/{namespace}/jobs",
+        "indexes": {"app": _label("app")},
+    },
+    "events": {
+        "path": "/api/v1/namespaces/{namespace}/events",
+        "indexes": {"involved_object": _involved_object_name},
+    },
+}
+
+
+class IndexedStore:
+    """
+    Store em memória dos objetos (JSON cru) de um recurso em um namespace, com índices
+    secundários. Os objetos são guardados sem managedFields para economizar memória.
+    """
+
+    def __init__(self, indexes: dict):
+        self._index_funcs = indexes
+        self._objects = {}
+        self._indexes = {name: {} for name in indexes}
+        self._lock = threading.Lock()
+
+    def replace(self, objects: list[dict]):
+        with self._lock:
+            self._objects = {}
+            self._indexes = {name: {} for name in self._index_funcs}
+            for obj in objects:
+                self._add_locked(obj)
+
+    def upsert(self, obj: dict):
+        with self._lock:
+            self._remove_locked(self._key(obj))
+            self._add_locked(obj)
+
+    def delete(self, obj: dict):
+        with self._lock:
+            self._remove_locked(self._key(obj))
+
+    def list_objects(self) -> list[dict]:
+        with self._lock:
+            return list(self._objects.values())
+
+    def by_index(self, index_name: str, value) -> list[dict]:
+        with self._lock:
+            keys = self._indexes[index_name].get(value, set())
+            return [self._objects[key] for key in keys]
+
+    def __len__(self):
+        return len(self._objects)
+
+    def _key(self, obj: dict):
+        return (obj.get("metadata") or {}).get("name")
+
+    def _add_locked(self, obj: dict):
+        metadata = obj.get("metadata") or {}
+        if "managedFields" in metadata:
+            obj = {**obj, "metadata": {k: v for k, v in metadata.items() if k != "managedFields"}}
+
+        key = self._key(obj)
+        self._objects[key] = obj
+        for name, func in self._index_funcs.items():
+            value = func(obj)
+            if value is not None:
+                self._indexes[name].setdefault(value, set()).add(key)
+
+    def _remove_locked(self, key):
+        obj = self._objects.pop(key, None)
+        if obj is None:
+            return
+        for name, func in self._index_funcs.items():
+            value = func(obj)
+            keys = self._indexes[name].get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._indexes[name][value]
+
+
+class Informer:
+    """
+    LIST + WATCH de um recurso em um namespace, mantendo um IndexedStore atualizado.
+
+    O watch é retomado a partir do último resourceVersion visto (inclusive bookmarks);
+    em caso de 410 Gone, um novo LIST é feito. Em qualquer outra falha o informer deixa de
+    estar sincronizado (os leitores voltam a consultar a API) até um novo LIST terminar.
+    Roda em uma thread daemon e se encerra sozinho quando fica sem leituras por
+    K8S_INFORMER_IDLE_SECONDS.
+    """
+
+    def __init__(self, k8s_client, resource: str, namespace: str, list_chunk_size: int = None):
+        config = INFORMER_RESOURCES[resource]
+        self.k8s_client = k8s_client
+        self.list_chunk_size = list_chunk_size
+        self.resource = resource
+        self.namespace = namespace
+        self.path = config["path"].format(namespace=namespace)
+        self.store = IndexedStore(config["indexes"])
+        self.resource_version = None
+        self.last_read_at = time.monotonic()
+        self._synced = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        # Resposta do watch em andamento, fechada por stop() para não esperar o timeout do watch
+        self._response = None
+
+    @property
+    def synced(self) -> bool:
+        return self._synced.is_set()
+
+    @property
+    def alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name=f"informer-{self.resource}-{self.namespace}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        response = self._response
+        sock = getattr(getattr(response, "connection", None), "sock", None)
+        if sock is not None:
+            try:
+                # Desbloqueia a leitura do watch na thread do informer
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def wait_for_sync(self, timeout: float) -> bool:
+        return self._synced.wait(timeout)
+
+    def touch(self):
+        self.last_read_at = time.monotonic()
+
+    def _idle(self) -> bool:
+        return time.monotonic() - self.last_read_at > K8S_INFORMER_IDLE_SECONDS
+
+    def _run(self):
+        backoff = 1
+        while not self._stop_event.is_set() and not self._idle():
+            try:
+                if self.resource_version is None:
+                    self._list()
+                self._watch()
+                backoff = 1
+            except Exception as e:
+                if isinstance(e, ApiException) and e.status == 410:
+                    # resourceVersion expirado: refazer o LIST
+                    self.resource_version = None
+                    continue
+                if self._stop_event.is_set():
+                    break
+                print(f"Warning: Informer {self.resource}/{self.namespace} failed: {e}")
+                # Store possivelmente desatualizado: leitores consultam a API até o próximo LIST
+                self._synced.clear()
+                self.resource_version = None
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 60)
+
+        self._synced.clear()
+
+    def _call(self, query_params: list, timeout=None):
+        return self.k8s_client.api_client.call_api(
+            self.path,
+            'GET',
+            query_params=query_params,
+            header_params={'Accept': 'application/json'},
+            auth_settings=['BearerToken'],
+            _preload_content=False,
+            _request_timeout=timeout,
+        )[0]
+
+    def _list(self):
+        """LIST completo em páginas de `list_chunk_size` (limit/continue), todas do mesmo snapshot."""
+        items = []
+        continue_token = None
+        while True:
+            query_params = []
+            if self.list_chunk_size:
+                query_params.append(("limit", self.list_chunk_size))
+            if continue_token:
+                query_params.append(("continue", continue_token))
+            response = self._call(query_params)
+            try:
+                page = json.loads(response.data)
+            finally:
+                response.release_conn()
+
+            items.extend(page.get("items") or [])
+            continue_token = (page.get("metadata") or {}).get("continue")
+            if not continue_token:
+                break
+
+        self.store.replace(items)
+        self.resource_version = (page.get("metadata") or {}).get("resourceVersion")
+        self._synced.set()
+
+    def _watch(self):
+        response = self._call(
+            [
+                ("watch", "true"),
+                ("allowWatchBookmarks", "true"),
+                ("resourceVersion", self.resource_version),
+                ("timeoutSeconds", K8S_INFORMER_WATCH_TIMEOUT_SECONDS),
+            ],
+            timeout=K8S_INFORMER_WATCH_TIMEOUT_SECONDS + 30,
+        )
+        self._response = response
+        try:
+            if self._stop_event.is_set():
+                return
+            for line in iter_resp_lines(response):
+                if self._stop_event.is_set():
+                    return
+                event = json.loads(line)
+                event_type = event.get("type")
+                obj = event.get("object") or {}
+
+                if event_type == "ERROR":
+                    raise ApiException(status=obj.get("code") or 500, reason=obj.get("message"))
+
+                resource_version = (obj.get("metadata") or {}).get("resourceVersion")
+                if resource_version:
+                    self.resource_version = resource_version
+
+                if event_type in ("ADDED", "MODIFIED"):
+                    self.store.upsert(obj)
+                elif event_type == "DELETED":
+                    self.store.delete(obj)
+        finally:
+            self._response = None
+            response.release_conn()
+
+
+class InformerManager:
+    """
+    Informers de um cluster, criados sob demanda por (recurso, namespace).
+    Desligado por padrão (K8S_INFORMERS_ENABLED).
+    """
+
+    def __init__(self, k8s_client, enabled: bool = K8S_INFORMERS_ENABLED, list_chunk_size: int = None):
+        self.k8s_client = k8s_client
+        self.enabled = enabled
+        self.list_chunk_size = list_chunk_size
+        self._informers = {}
+        self._lock = threading.Lock()
+
+    def get_store(self, resource: str, namespace: str, wait_timeout: float = 0) -> IndexedStore | None:
+        """
+        Retorna o store sincronizado do recurso no namespace, iniciando o informer se necessário.
+
+        Retorna None se os informers estiverem desligados ou se o LIST inicial ainda não
+        terminou em `wait_timeout` segundos; nesse caso o chamador deve consultar a API.
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            informer = self._informers.get((resource, namespace))
+            if informer is None or not informer.alive:
+                informer = Informer(self.k8s_client, resource, namespace, list_chunk_size=self.list_chunk_size)
+                self._informers[(resource, namespace)] = informer
+                informer.start()
+
+        informer.touch()
+        if informer.synced or (wait_timeout > 0 and informer.wait_for_sync(wait_timeout)):
+            return informer.store
+        return None
+
+    def stop(self):
+        with self._lock:
+            for informer in self._informers.values():
+                informer.stop()
+            self._informers.clear()
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "resource": resource,
+                    "namespace": namespace,
+                    "synced": informer.synced,
+                    "objects": len(informer.store),
+                    "resource_version": informer.resource_version,
+                }
+                for (resource, namespace), informer in self._informers.items()
+            ]
@@ -0,0 +1,219 @@
+import os
+import sys
+import threading
+from contextvars import ContextVar, copy_context
+from urllib.parse import urlparse
+
+
+K8S_METRICS_ENABLED = os.getenv("K8S_METRICS_ENABLED", "true").lower() == "true"
+# Headers X-K8s-* com o resumo das chamadas ao Kubernetes feitas por cada requisição HTTP
+K8S_DEBUG_HEADERS = os.getenv("K8S_DEBUG_HEADERS", "false").lower() == "true"
+
+# Limites (em segundos) dos buckets do histograma de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Arquivos cujos frames não identificam o chamador (o próprio cliente e a instrumentação)
+_INSTRUMENTATION_FILES = (
+    os.path.join("app", "k8s", "client.py"),
+    os.path.join("app", "k8s", "async_client.py"),
+    os.path.join("app", "k8s", "metrics.py"),
+    os.path.join("app", "k8s", "apply.py"),
+)
+_SERVICES_DIR = os.path.join("app", "services") + os.sep
+_APP_DIR = "app" + os.sep
+_MAX_FRAME_DEPTH = 64
+
+# Operação do chamador propagada para threads de workers (ver submit_with_context)
+_operation = ContextVar("k8s_operation", default=None)
+# Resumo das chamadas da requisição HTTP corrente (ver start_request_stats)
+_request_stats = ContextVar("k8s_request_stats", default=None)
+
+
+def resource_from_path(path: str) -> str:
+    """
+    Extrai o recurso (e o subrecurso) do path de uma chamada à API.
+
+    Ex: /api/v1/namespaces/app/pods/web-1/log -> pods/log
+        /apis/apps/v1/namespaces/app/deployments/web -> deployments
+        /apis/gateway.networking.k8s.io -> discovery
+    """
+    parts = [part for part in urlparse(path).path.split("/") if part]
+    if parts[:1] == ["api"]:
+        parts = parts[2:]
+    elif parts[:1] == ["apis"]:
+        parts = parts[3:]
+    else:
+        return parts[0] if parts else "unknown"
+
+    if not parts:
+        return "discovery"
+    if parts[0] == "namespaces" and len(parts) > 2:
+        parts = parts[2:]
+    if len(parts) > 2:
+        return f"{parts[0]}/{parts[2]}"
+    return parts[0]
+
+
+def calling_operation() -> str:
+    """
+    Identifica o método que originou a chamada: o primeiro frame em app/services
+    (ex: WebappService.get_webapp_pods_async) ou, na falta dele, o primeiro frame da aplicação
+    fora do cliente (ex: Informer._list). Em threads de workers, usa a operação de quem
+    submeteu a tarefa.
+    """
+    fallback = None
+    frame = sys._getframe(1)
+    depth = 0
+    while frame is not None and depth < _MAX_FRAME_DEPTH:
+        filename = frame.f_code.co_filename
+        if _SERVICES_DIR in filename:
+            return getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        if (
+            fallback is None
+            and _APP_DIR in filename
+            and not filename.endswith(_INSTRUMENTATION_FILES)
+        ):
+            fallback = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        frame = frame.f_back
+        depth += 1
+    return _operation.get() or fallback or "unknown"
+
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """
+    executor.submit que preserva os contextvars do chamador (operação e resumo da
+    requisição HTTP), para que as chamadas feitas pelos workers sejam atribuídas a ele.
+    """
+    context = copy_context()
+    context.run(_operation.set, calling_operation())
+    return executor.submit(context.run, fn, *args, **kwargs)
+
+
+def start_request_stats() -> dict:
+    """Inicia o resumo das chamadas ao Kubernetes da requisição HTTP corrente."""
+    stats = {"calls": 0, "duration_ms": 0.0, "errors": 0, "lock": threading.Lock()}
+    _request_stats.set(stats)
+    return stats
+
+
+def debug_headers(stats: dict) -> dict:
+    return {
+        "X-K8s-Calls": str(stats["calls"]),
+        "X-K8s-Errors": str(stats["errors"]),
+        "X-K8s-Time-Ms": f"{stats['duration_ms']:.2f}",
+    }
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class ApiCallMetrics:
+    """
+    Métricas das chamadas ao API server, por (cluster, verbo, recurso, operação):
+    histograma de latência, contagem por status HTTP, bytes enviados/recebidos e retries.
+    Exportadas no formato texto do Prometheus (ver render).
+    """
+
+    LABELS = ("cluster", "verb", "resource", "operation")
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+        self._status_counts = {}
+
+    def observe(self, cluster: str, verb: str, resource: str, operation: str, status,
+                duration: float, bytes_out: int = 0, bytes_in: int = 0, retries: int = 0):
+        key = (cluster, verb, resource, operation)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {
+                    "buckets": [0] * len(self.buckets),
+                    "count": 0,
+                    "sum": 0.0,
+                    "bytes_out": 0,
+                    "bytes_in": 0,
+                    "retries": 0,
+                }
+                self._series[key] = series
+
+            for index, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    series["buckets"][index] += 1
+            series["count"] += 1
+            series["sum"] += duration
+            series["bytes_out"] += bytes_out
+            series["bytes_in"] += bytes_in
+            series["retries"] += retries
+
+            status_key = key + (str(status),)
+            self._status_counts[status_key] = self._status_counts.get(status_key, 0) + 1
+
+        stats = _request_stats.get()
+        if stats is not None:
+            with stats["lock"]:
+                stats["calls"] += 1
+                stats["duration_ms"] += duration * 1000
+                if not isinstance(status, int) or status >= 400:
+                    stats["errors"] += 1
+
+    def record(self, cluster: str, method: str, path: str, status, duration: float,
+               bytes_out: int = 0, bytes_in: int = 0, retries: int = 0):
+        """Registra uma chamada, identificando o recurso pelo path e a operação pela pilha."""
+        if not K8S_METRICS_ENABLED:
+            return
+        self.observe(
+            cluster, method.upper(), resource_from_path(path), calling_operation(), status,
+            duration, bytes_out=bytes_out, bytes_in=bytes_in, retries=retries,
+        )
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self._status_counts.clear()
+
+    def render(self) -> str:
+        """Exporta as métricas no formato texto do Prometheus (text/plain; version=0.0.4)."""
+        with self._lock:
+            series = {key: {**value, "buckets": list(value["buckets"])} for key, value in self._series.items()}
+            status_counts = dict(self._status_counts)
+
+        lines = [
+            "# HELP tron_k8s_api_request_duration_seconds Latency of Kubernetes API calls.",
+            "# TYPE tron_k8s_api_request_duration_seconds histogram",
+        ]
+        for key, value in sorted(series.items()):
+            labels = _labels(self.LABELS, key)
+            for bound, count in zip(self.buckets, value["buckets"]):
+                lines.append(f'tron_k8s_api_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'tron_k8s_api_request_duration_seconds_bucket{{{labels},le="+Inf"}} {value["count"]}')
+            lines.append(f"tron_k8s_api_request_duration_seconds_sum{{{labels}}} {value['sum']}")
+            lines.append(f"tron_k8s_api_request_duration_seconds_count{{{labels}}} {value['count']}")
+
+        lines += [
+            "# HELP tron_k8s_api_requests_total Kubernetes API calls by HTTP status code.",
+            "# TYPE tron_k8s_api_requests_total counter",
+        ]
+        for key, count in sorted(status_counts.items()):
+            lines.append(f"tron_k8s_api_requests_total{{{_labels(self.LABELS + ('code',), key)}}} {count}")
+
+        counters = (
+            ("tron_k8s_api_request_bytes_total", "Bytes sent to the Kubernetes API.", "bytes_out"),
+            ("tron_k8s_api_response_bytes_total", "Bytes received from the Kubernetes API.", "bytes_in"),
+            ("tron_k8s_api_retries_total", "Retries performed by the HTTP client.", "retries"),
+        )
+        for name, description, field in counters:
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{{{_labels(self.LABELS, key)}}} {value[field]}")
+
+        return "\n".join(lines) + "\n"
+
+
+api_metrics = ApiCallMetrics()
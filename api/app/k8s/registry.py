@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+
+from app.k8s.async_client import AsyncK8sClient
+from app.k8s.client import K8sClient
+
+
+K8S_CONNECTION_POOL_MAXSIZE = int(os.getenv("K8S_CONNECTION_POOL_MAXSIZE", "10"))
+# Clientes substituídos só são fechados após esse tempo, para que as chamadas em andamento
+# (ex: tarefas já submetidas aos executores) terminem com o cliente antigo
+K8S_CLIENT_RETIRE_GRACE_SECONDS = float(os.getenv("K8S_CLIENT_RETIRE_GRACE_SECONDS", "300"))
+
+
+def credentials_fingerprint(api_address: str, token: str) -> str:
+    """
+    Gera um fingerprint estável para o par (endereço da API, token).
+    O token nunca é armazenado no registry, apenas o seu hash.
+    """
+    digest = hashlib.sha256(f"{api_address}\n{token}".encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+def _close_async_client(async_client: AsyncK8sClient):
+    """Agenda o fechamento das conexões de um cliente assíncrono descartado."""
+    try:
+        asyncio.get_running_loop().create_task(async_client.aclose())
+    except RuntimeError:
+        # Fora do event loop: as conexões são liberadas quando o cliente for coletado
+        pass
+
+
+def _pop_expired(retired: list) -> list:
+    """Remove de `retired` e retorna os clientes cujo período de carência terminou."""
+    now = time.monotonic()
+    expired = [client for deadline, client in retired if deadline <= now]
+    retired[:] = [(deadline, client) for deadline, client in retired if deadline > now]
+    return expired
+
+
+class K8sClientRegistry:
+    """
+    Registry de clientes Kubernetes compartilhados pelo processo.
+
+    Mantém um K8sClient de longa duração por cluster (chave: cluster id), cada um com
+    seu próprio pool de conexões keep-alive. Quando o endereço ou o token do cluster
+    mudam, o fingerprint deixa de bater e o cliente é recriado. O mesmo vale para os
+    clientes assíncronos (AsyncK8sClient) usados pelos endpoints async.
+
+    Um cliente substituído (ou invalidado) pode ainda estar em uso por outras threads, então
+    ele é aposentado: seus informers param na hora, mas o fechamento (que encerra os
+    executores) só acontece após K8S_CLIENT_RETIRE_GRACE_SECONDS, na próxima consulta
+    ao registry.
+    """
+
+    def __init__(self, connection_pool_maxsize: int = K8S_CONNECTION_POOL_MAXSIZE,
+                 retire_grace_seconds: float = K8S_CLIENT_RETIRE_GRACE_SECONDS):
+        self.connection_pool_maxsize = connection_pool_maxsize
+        self.retire_grace_seconds = retire_grace_seconds
+        self._clients = {}
+        self._async_clients = {}
+        # Listas de (prazo, cliente) aguardando o fim do período de carência
+        self._retired = []
+        self._retired_async = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _retire(self, k8s_client: K8sClient):
+        """Aposenta um cliente síncrono. Deve ser chamado com o lock."""
+        k8s_client.informers.stop()
+        self._retired.append((time.monotonic() + self.retire_grace_seconds, k8s_client))
+
+    def _retire_async(self, async_client: AsyncK8sClient):
+        """Aposenta um cliente assíncrono. Deve ser chamado com o lock."""
+        self._retired_async.append((time.monotonic() + self.retire_grace_seconds, async_client))
+
+    def _get_client(self, cluster, fingerprint: str) -> tuple[K8sClient, bool]:
+        """
+        Retorna o cliente síncrono do cluster e se ele já estava no pool, criando-o
+        (ou recriando-o, se o fingerprint mudou) quando necessário. Deve ser chamado com o lock.
+        """
+        entry = self._clients.get(cluster.id)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1], True
+
+        if entry is not None:
+            self._retire(entry[1])
+        k8s_client = K8sClient(
+            url=cluster.api_address,
+            token=cluster.token,
+            connection_pool_maxsize=self.connection_pool_maxsize,
+            cluster_name=cluster.name,
+        )
+        self._clients[cluster.id] = (fingerprint, k8s_client)
+        return k8s_client, False
+
+    def get(self, cluster) -> K8sClient:
+        """
+        Retorna o cliente do cluster, criando-o se ainda não existir no pool.
+
+        Args:
+            cluster: Objeto Cluster do banco de dados (usa id, api_address e token)
+        """
+        fingerprint = credentials_fingerprint(cluster.api_address, cluster.token)
+
+        with self._lock:
+            k8s_client, hit = self._get_client(cluster, fingerprint)
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            expired = _pop_expired(self._retired)
+
+        for retired_client in expired:
+            retired_client.close()
+        return k8s_client
+
+    def get_async(self, cluster) -> AsyncK8sClient:
+        """
+        Retorna o cliente assíncrono do cluster, criando-o se ainda não existir no pool.
+        Deve ser chamado a partir do event loop da aplicação.
+        """
+        fingerprint = credentials_fingerprint(cluster.api_address, cluster.token)
+
+        with self._lock:
+            expired = _pop_expired(self._retired)
+            expired_async = _pop_expired(self._retired_async)
+            # O circuit breaker e o cache de métricas dos pods são os do cliente síncrono do
+            # cluster; hits e misses contam apenas a consulta ao cliente assíncrono
+            k8s_client, _ = self._get_client(cluster, fingerprint)
+
+            entry = self._async_clients.get(cluster.id)
+            if entry is not None and entry[0] == fingerprint:
+                self.hits += 1
+                async_client = entry[1]
+            else:
+                self.misses += 1
+                if entry is not None:
+                    self._retire_async(entry[1])
+                async_client = AsyncK8sClient(
+                    url=cluster.api_address,
+                    token=cluster.token,
+                    breaker=k8s_client.breaker,
+                    cluster_name=cluster.name,
+                    pod_metrics_cache=k8s_client.pod_metrics_cache,
+                )
+                self._async_clients[cluster.id] = (fingerprint, async_client)
+
+        for retired_client in expired:
+            retired_client.close()
+        for retired_async_client in expired_async:
+            _close_async_client(retired_async_client)
+        return async_client
+
+    def invalidate(self, cluster_id: int):
+        """Remove o cliente de um cluster do pool (ex: após troca de endereço/token)."""
+        with self._lock:
+            entry = self._clients.pop(cluster_id, None)
+            if entry is not None:
+                self.invalidations += 1
+                self._retire(entry[1])
+            async_entry = self._async_clients.pop(cluster_id, None)
+            if async_entry is not None:
+                self._retire_async(async_entry[1])
+
+    def clear(self):
+        """Remove todos os clientes do pool, fechando-os imediatamente (inclusive os aposentados)."""
+        with self._lock:
+            self.invalidations += len(self._clients)
+            k8s_clients = [entry[1] for entry in self._clients.values()]
+            k8s_clients += [k8s_client for _, k8s_client in self._retired]
+            async_clients = [entry[1] for entry in self._async_clients.values()]
+            async_clients += [async_client for _, async_client in self._retired_async]
+            self._clients.clear()
+            self._async_clients.clear()
+            self._retired.clear()
+            self._retired_async.clear()
+
+        for k8s_client in k8s_clients:
+            k8s_client.close()
+        for async_client in async_clients:
+            _close_async_client(async_client)
+
+    def clients(self) -> list[tuple[int, K8sClient]]:
+        """Retorna uma cópia da lista (cluster_id, cliente) atualmente no pool."""
+        with self._lock:
+            return [(cluster_id, entry[1]) for cluster_id, entry in self._clients.items()]
+
+    def stats(self) -> dict:
+        """Retorna os contadores do pool de clientes."""
+        with self._lock:
+            return {
+                "size": len(self._clients),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "retired": len(self._retired),
+                "connection_pool_maxsize": self.connection_pool_maxsize,
+                "clusters": [
+                    {"cluster_id": cluster_id, "fingerprint": entry[0], "breaker": entry[1].breaker.snapshot()}
+                    for cluster_id, entry in self._clients.items()
+                ],
+            }
+
+
+registry = K8sClientRegistry()
+
+
+def get_k8s_client(cluster) -> K8sClient:
+    """Atalho para obter o cliente compartilhado de um cluster."""
+    return registry.get(cluster)
+
+
+def get_async_k8s_client(cluster) -> AsyncK8sClient:
+    """Atalho para obter o cliente assíncrono compartilhado de um cluster."""
+    return registry.get_async(cluster)
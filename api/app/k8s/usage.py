@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+
+from kubernetes.utils import parse_quantity
+
+
+# Tempo em que a listagem de PodMetrics de um namespace é reaproveitada
+K8S_POD_METRICS_TTL_SECONDS = float(os.getenv("K8S_POD_METRICS_TTL_SECONDS", "15"))
+
+METRICS_API_GROUP = "metrics.k8s.io"
+POD_METRICS_PATH = "/apis/metrics.k8s.io/v1beta1/namespaces/{namespace}/pods"
+
+USAGE_FIELDS = ("cpu_usage", "memory_usage")
+REQUEST_FIELDS = ("cpu_requests", "cpu_limits", "memory_requests", "memory_limits")
+
+
+def build_pod_usage(pod_metrics: list[dict]) -> dict:
+    """
+    Soma o uso dos containers de cada PodMetrics (metrics.k8s.io).
+
+    Returns:
+        Dict nome do pod -> {"cpu_usage": cores, "memory_usage": MB}
+    """
+    pod_usage = {}
+    for item in pod_metrics:
+        name = (item.get("metadata") or {}).get("name")
+        if not name:
+            continue
+        cpu = 0
+        memory = 0
+        for container in item.get("containers") or []:
+            usage = container.get("usage") or {}
+            if usage.get("cpu"):
+                cpu += parse_quantity(usage["cpu"])
+            if usage.get("memory"):
+                memory += parse_quantity(usage["memory"])
+        pod_usage[name] = {
+            "cpu_usage": round(float(cpu), 4),
+            "memory_usage": int(memory) // (1024 * 1024),
+        }
+    return pod_usage
+
+
+def merge_pod_usage(pods: list[dict], pod_usage: dict) -> list[dict]:
+    """Acrescenta cpu_usage/memory_usage aos pods formatados (None se não houver métrica)."""
+    for pod in pods:
+        usage = pod_usage.get(pod["name"]) or {}
+        for field in USAGE_FIELDS:
+            pod[field] = usage.get(field)
+    return pods
+
+
+def aggregate_usage(pods: list[dict]) -> dict:
+    """
+    Soma requests, limits e uso real de um conjunto de pods formatados.
+    O uso fica None quando nenhum dos pods tem métrica.
+    """
+    totals = {"pods": len(pods)}
+    for field in REQUEST_FIELDS:
+        totals[field] = sum(pod.get(field) or 0 for pod in pods)
+    totals["cpu_requests"] = round(totals["cpu_requests"], 4)
+    totals["cpu_limits"] = round(totals["cpu_limits"], 4)
+
+    for field in USAGE_FIELDS:
+        values = [pod[field] for pod in pods if pod.get(field) is not None]
+        totals[field] = sum(values) if values else None
+    if totals["cpu_usage"] is not None:
+        totals["cpu_usage"] = round(totals["cpu_usage"], 4)
+    return totals
+
+
+class PodMetricsCache:
+    """
+    Uso dos pods por namespace, reaproveitado por K8S_POD_METRICS_TTL_SECONDS.
+    Compartilhado entre o K8sClient e o AsyncK8sClient do cluster.
+    """
+
+    def __init__(self, ttl: float = K8S_POD_METRICS_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(namespace)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def set(self, namespace: str, pod_usage: dict):
+        with self._lock:
+            self._entries[namespace] = (time.monotonic(), pod_usage)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
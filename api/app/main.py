@@ -4,6 +4,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import *
 from .database import Base, engine
+from .k8s.background import PeriodicTask
+from .k8s.capacity import K8S_CAPACITY_REFRESH_SECONDS
+from .k8s.metrics import K8S_DEBUG_HEADERS, debug_headers, start_request_stats
+from .services.cluster import (
+    CLUSTER_STATUS_PROBE_SECONDS,
+    GATEWAY_REFERENCE_REFRESH_SECONDS,
+    refresh_cluster_capacities,
+    refresh_cluster_statuses,
+    refresh_gateway_references,
+)
+from .services.kubernetes.application_component_manager import prewarm_template_caches, shutdown_render_pool
 
 # Import all models to ensure they are registered with SQLAlchemy
 import app.models.cluster
@@ -17,6 +28,9 @@ import app.models.application
 import app.models.application_components
 import app.models.user
 import app.models.token
+import app.models.applied_manifest
+import app.models.cluster_status
+import app.models.cache_version
 
 Base.metadata.create_all(bind=engine)
 
@@ -43,14 +57,30 @@ CORS_ALLOW_HEADERS = os.getenv(
 ).split(",")
 CORS_ALLOW_HEADERS = [header.strip() for header in CORS_ALLOW_HEADERS if header.strip()]
 
+# Headers de resposta legíveis pelo frontend (ex: token da próxima página)
+CORS_EXPOSE_HEADERS = os.getenv("CORS_EXPOSE_HEADERS", "X-Continue-Token").split(",")
+CORS_EXPOSE_HEADERS = [header.strip() for header in CORS_EXPOSE_HEADERS if header.strip()]
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
     allow_credentials=CORS_ALLOW_CREDENTIALS,
     allow_methods=CORS_ALLOW_METHODS,
     allow_headers=CORS_ALLOW_HEADERS,
+    expose_headers=CORS_EXPOSE_HEADERS,
 )
 
+# Headers X-K8s-* por requisição (desligado por padrão, ver K8S_DEBUG_HEADERS)
+if K8S_DEBUG_HEADERS:
+    @app.middleware("http")
+    async def k8s_debug_headers(request, call_next):
+        """Adiciona à resposta o resumo das chamadas ao Kubernetes feitas pela requisição."""
+        stats = start_request_stats()
+        response = await call_next(request)
+        response.headers.update(debug_headers(stats))
+        return response
+
+
 ROUTERS_PATH = "./app/routers"
 
 
@@ -68,6 +98,44 @@ def include_all_routers(app: FastAPI):
 
 include_all_routers(app)
 
+# Mantém a referência do Gateway de cada cluster aquecida fora do caminho de deploy
+gateway_reference_task = PeriodicTask(
+    name="gateway-reference-refresh",
+    interval=GATEWAY_REFERENCE_REFRESH_SECONDS,
+    target=refresh_gateway_references,
+)
+
+cluster_capacity_task = PeriodicTask(
+    name="cluster-capacity-refresh",
+    interval=K8S_CAPACITY_REFRESH_SECONDS,
+    target=refresh_cluster_capacities,
+)
+
+# Verificação de saúde dos clusters lida por GET /clusters/
+cluster_status_task = PeriodicTask(
+    name="cluster-status-probe",
+    interval=CLUSTER_STATUS_PROBE_SECONDS,
+    target=refresh_cluster_statuses,
+)
+
+
+@app.on_event("startup")
+def start_background_tasks():
+    if os.getenv("ENV") != "test":
+        # Antes de aceitar tráfego: compila os templates (ou lê o bytecode já gravado em disco)
+        prewarm_template_caches()
+        gateway_reference_task.start()
+        cluster_capacity_task.start()
+        cluster_status_task.start()
+
+
+@app.on_event("shutdown")
+def stop_background_tasks():
+    gateway_reference_task.stop()
+    cluster_capacity_task.stop()
+    cluster_status_task.stop()
+    shutdown_render_pool()
+
 # Fix ReDoc CDN URL - use stable version instead of @next
 from fastapi.openapi.docs import get_redoc_html
 
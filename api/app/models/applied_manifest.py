@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class AppliedManifest(Base):
+    """Hash do último manifesto aplicado com sucesso para cada objeto de um cluster."""
+
+    __tablename__ = "applied_manifests"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cluster_id = Column(Integer, ForeignKey("clusters.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String, nullable=False)
+    namespace = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    manifest_hash = Column(String, nullable=False)
+    # Componente dono do objeto (label tron.io/component-uuid), usado para decidir se o prune é necessário
+    component_uuid = Column(String, nullable=True, index=True)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('cluster_id', 'kind', 'namespace', 'name', name='uix_applied_manifest_object'),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class CacheVersion(Base):
+    """
+    Contador de versão de um cache em memória compartilhado entre os workers.
+    Toda escrita nos dados cacheados incrementa a versão na mesma transação; cada worker
+    compara a versão do banco com a da sua cópia antes de usá-la.
+    """
+
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -14,6 +14,10 @@ class Cluster(Base):
     api_address = Column(String, unique=True, nullable=False)
     token = Column(String, nullable=False)
 
+    # Referência fixa do Gateway (opcional). Quando vazia, o Gateway é descoberto no cluster
+    gateway_namespace = Column(String, nullable=True)
+    gateway_name = Column(String, nullable=True)
+
     environment_id = Column(Integer, ForeignKey("environments.id"), nullable=False)
     environment = relationship("Environment", back_populates="clusters")
 
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, JSON, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ClusterStatus(Base):
+    """Resultado da última verificação de saúde de um cluster (gravado pelo prober em background)."""
+
+    __tablename__ = "cluster_statuses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cluster_id = Column(Integer, ForeignKey("clusters.id", ondelete="CASCADE"), nullable=False, unique=True)
+
+    reachable = Column(Boolean, nullable=False, default=False)
+    latency_ms = Column(Float, nullable=True)
+    server_version = Column(String, nullable=True)
+    # Mensagem de validação da conexão ({"status": "ok"|"error", "message": ...})
+    detail = Column(JSON, nullable=False)
+    gateway_api_enabled = Column(Boolean, nullable=False, default=False)
+    gateway_resources = Column(JSON, nullable=False)
+    probed_at = Column(DateTime, nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
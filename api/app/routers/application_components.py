@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.database import get_db
+from app.services.component_diff import ComponentDiffService
+import app.schemas.application_components as ApplicationComponentSchemas
+from app.models.application_components import WebappType
+from app.models.user import UserRole, User
+from app.dependencies.auth import require_role
+
+router = APIRouter(prefix="/application_components", tags=["application_components"])
+
+
+@router.post("/{component_type}/{uuid}/diff", response_model=ApplicationComponentSchemas.ComponentDiff)
+async def diff_application_component(
+    component_type: WebappType,
+    uuid: UUID,
+    request: ApplicationComponentSchemas.ComponentDiffRequest = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    request = request or ApplicationComponentSchemas.ComponentDiffRequest()
+    return await run_in_threadpool(
+        ComponentDiffService.diff_component,
+        db,
+        component_type,
+        uuid,
+        settings=request.settings,
+        url=request.url,
+    )
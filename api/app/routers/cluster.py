@@ -33,10 +33,18 @@ def update_cluster(
 def list_clusters(
     skip: int = 0,
     limit: int = 100,
+    refresh: bool = False,
     db: Session = Depends(database.get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return ClusterService.get_clusters(db, skip=skip, limit=limit)
+    return ClusterService.get_clusters(db, skip=skip, limit=limit, refresh=refresh)
+
+
+@router.get("/clusters/client-pool/stats", response_model=schemas.K8sClientPoolStats)
+def get_client_pool_stats(
+    current_user = Depends(require_role([UserRole.ADMIN])),
+):
+    return ClusterService.get_client_pool_stats()
 
 
 @router.get("/clusters/{uuid}", response_model=schemas.ClusterCompletedResponse)
@@ -51,6 +59,15 @@ def get_cluster(
     return db_cluster
 
 
+@router.post("/clusters/{uuid}/discovery/refresh", response_model=schemas.ClusterDiscovery)
+def refresh_cluster_discovery(
+    uuid: UUID,
+    db: Session = Depends(database.get_db),
+    current_user = Depends(require_role([UserRole.ADMIN])),
+):
+    return ClusterService.refresh_cluster_discovery(db, uuid)
+
+
 @router.delete("/clusters/{uuid}", response_model=dict)
 def delete_cluster(
     uuid: UUID,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 
@@ -7,6 +7,7 @@ from app.services.cron import CronService
 import app.schemas.cron as CronSchemas
 from app.models.user import UserRole, User
 from app.dependencies.auth import require_role, get_current_user
+from app.dependencies.pagination import CONTINUE_TOKEN_HEADER
 
 router = APIRouter(prefix="/application_components/cron", tags=["cron"])
 
@@ -59,16 +60,31 @@ def delete_cron(
 
 
 @router.get("/{uuid}/jobs", response_model=list[CronSchemas.CronJob])
-def get_cron_jobs(
+async def get_cron_jobs(
     uuid: UUID,
+    response: Response,
+    limit: int = Query(None, ge=1, le=1000),
+    continue_token: str = None,
+    label_selector: str = None,
+    field_selector: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return CronService.get_cron_jobs(db=db, uuid=uuid)
+    jobs, next_token = await CronService.get_cron_jobs_async(
+        db=db,
+        uuid=uuid,
+        limit=limit,
+        continue_token=continue_token,
+        label_selector=label_selector,
+        field_selector=field_selector,
+    )
+    if next_token:
+        response.headers[CONTINUE_TOKEN_HEADER] = next_token
+    return jobs
 
 
 @router.get("/{uuid}/jobs/{job_name}/logs", response_model=CronSchemas.CronJobLogs)
-def get_cron_job_logs(
+async def get_cron_job_logs(
     uuid: UUID,
     job_name: str,
     container_name: str = None,
@@ -76,7 +92,7 @@ def get_cron_job_logs(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return CronService.get_cron_job_logs(
+    return await CronService.get_cron_job_logs_async(
         db=db,
         uuid=uuid,
         job_name=job_name,
@@ -86,11 +102,11 @@ def get_cron_job_logs(
 
 
 @router.delete("/{uuid}/jobs/{job_name}")
-def delete_cron_job(
+async def delete_cron_job(
     uuid: UUID,
     job_name: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
-    return CronService.delete_cron_job(db=db, uuid=uuid, job_name=job_name)
+    return await CronService.delete_cron_job_async(db=db, uuid=uuid, job_name=job_name)
 
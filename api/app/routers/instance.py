@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import List
@@ -7,6 +7,7 @@ from app.services.instance import InstanceService
 from app.schemas import instance as InstanceSchemas
 from app.models.user import UserRole, User
 from app.dependencies.auth import require_role, get_current_user
+from app.dependencies.pagination import CONTINUE_TOKEN_HEADER
 
 router = APIRouter()
 
@@ -62,12 +63,36 @@ def delete_instance(
 
 
 @router.get("/instances/{uuid}/events", response_model=List[InstanceSchemas.KubernetesEvent])
-def get_instance_events(
+async def get_instance_events(
     uuid: UUID,
+    response: Response,
+    limit: int = Query(None, ge=1, le=1000),
+    continue_token: str = None,
+    field_selector: str = None,
+    label_selector: str = None,
     db: Session = Depends(database.get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return InstanceService.get_instance_events(db, uuid)
+    events, next_token = await InstanceService.get_instance_events_async(
+        db,
+        uuid,
+        limit=limit,
+        continue_token=continue_token,
+        field_selector=field_selector,
+        label_selector=label_selector,
+    )
+    if next_token:
+        response.headers[CONTINUE_TOKEN_HEADER] = next_token
+    return events
+
+
+@router.get("/instances/{uuid}/usage", response_model=InstanceSchemas.InstanceResourceUsage)
+async def get_instance_usage(
+    uuid: UUID,
+    db: Session = Depends(database.get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await InstanceService.get_instance_usage_async(db, uuid)
 
 
 @router.post("/instances/{uuid}/sync", response_model=dict)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.k8s.metrics import api_metrics
+from app.services.kubernetes.manifest_cache import manifest_cache
+from app.services.kubernetes.template_cache import template_cache
+from app.models.user import UserRole
+from app.dependencies.auth import require_role
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(
+    current_user = Depends(require_role([UserRole.ADMIN])),
+):
+    """
+    Métricas das chamadas ao API server dos clusters no formato texto do Prometheus
+    (latência, status, bytes e retries por cluster, verbo, recurso e operação) e dos
+    caches de templates compilados e de manifestos renderizados.
+    """
+    return PlainTextResponse(
+        api_metrics.render() + template_cache.render() + manifest_cache.render(),
+        media_type="text/plain; version=0.0.4",
+    )
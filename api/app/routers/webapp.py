@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from uuid import UUID
 
@@ -6,7 +7,8 @@ from app.database import get_db
 from app.services.webapp import WebappService
 import app.schemas.webapp as WebappSchemas
 from app.models.user import UserRole, User
-from app.dependencies.auth import require_role, get_current_user
+from app.dependencies.auth import authenticate_websocket, require_role, get_current_user
+from app.services.kubernetes.pod_exec import WS_CLOSE_POLICY_VIOLATION
 
 router = APIRouter(prefix="/application_components/webapp", tags=["webapp"])
 
@@ -59,26 +61,26 @@ def delete_webapp(
 
 
 @router.get("/{uuid}/pods", response_model=list[WebappSchemas.Pod])
-def get_webapp_pods(
+async def get_webapp_pods(
     uuid: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return WebappService.get_webapp_pods(db=db, uuid=uuid)
+    return await WebappService.get_webapp_pods_async(db=db, uuid=uuid)
 
 
 @router.delete("/{uuid}/pods/{pod_name}")
-def delete_webapp_pod(
+async def delete_webapp_pod(
     uuid: UUID,
     pod_name: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
-    return WebappService.delete_webapp_pod(db=db, uuid=uuid, pod_name=pod_name)
+    return await WebappService.delete_webapp_pod_async(db=db, uuid=uuid, pod_name=pod_name)
 
 
 @router.get("/{uuid}/pods/{pod_name}/logs", response_model=WebappSchemas.PodLogs)
-def get_webapp_pod_logs(
+async def get_webapp_pod_logs(
     uuid: UUID,
     pod_name: str,
     container_name: str = None,
@@ -86,7 +88,7 @@ def get_webapp_pod_logs(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return WebappService.get_webapp_pod_logs(
+    return await WebappService.get_webapp_pod_logs_async(
         db=db,
         uuid=uuid,
         pod_name=pod_name,
@@ -95,15 +97,43 @@ def get_webapp_pod_logs(
     )
 
 
+@router.get("/{uuid}/pods/{pod_name}/logs/stream")
+async def stream_webapp_pod_logs(
+    uuid: UUID,
+    pod_name: str,
+    container_name: str = None,
+    follow: bool = False,
+    since_seconds: int = Query(None, ge=1),
+    timestamps: bool = False,
+    limit_bytes: int = Query(None, ge=1),
+    tail_lines: int = Query(None, ge=0),
+    format: str = Query("text", pattern="^(text|sse)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await WebappService.stream_webapp_pod_logs(
+        db=db,
+        uuid=uuid,
+        pod_name=pod_name,
+        container_name=container_name,
+        follow=follow,
+        since_seconds=since_seconds,
+        timestamps=timestamps,
+        limit_bytes=limit_bytes,
+        tail_lines=tail_lines,
+        sse=format == "sse",
+    )
+
+
 @router.post("/{uuid}/pods/{pod_name}/exec", response_model=WebappSchemas.PodCommandResponse)
-def exec_webapp_pod_command(
+async def exec_webapp_pod_command(
     uuid: UUID,
     pod_name: str,
     request: WebappSchemas.PodCommandRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
-    return WebappService.exec_webapp_pod_command(
+    return await WebappService.exec_webapp_pod_command_async(
         db=db,
         uuid=uuid,
         pod_name=pod_name,
@@ -111,3 +141,31 @@ def exec_webapp_pod_command(
         container_name=request.container_name
     )
 
+
+@router.websocket("/{uuid}/pods/{pod_name}/exec/ws")
+async def exec_webapp_pod_session(
+    websocket: WebSocket,
+    uuid: UUID,
+    pod_name: str,
+    command: list[str] = Query(["/bin/sh"]),
+    container_name: str = None,
+    tty: bool = True,
+):
+    """
+    Credenciais via headers ou subprotocolos (Sec-WebSocket-Protocol: tron.exec, bearer.<jwt>),
+    nunca na URL. Nenhuma sessão do banco fica aberta durante o exec.
+    """
+    try:
+        await run_in_threadpool(authenticate_websocket, websocket, [UserRole.ADMIN])
+    except HTTPException as e:
+        await websocket.close(code=WS_CLOSE_POLICY_VIOLATION, reason=str(e.detail))
+        return
+
+    await WebappService.exec_webapp_pod_session(
+        websocket=websocket,
+        uuid=uuid,
+        pod_name=pod_name,
+        command=command,
+        container_name=container_name,
+        tty=tty
+    )
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.database import get_db
 from app.services.worker import WorkerService
 import app.schemas.worker as WorkerSchemas
+import app.schemas.webapp as WebappSchemas
 from app.models.user import UserRole, User
-from app.dependencies.auth import require_role, get_current_user
+from app.dependencies.auth import authenticate_websocket, require_role, get_current_user
+from app.services.kubernetes.pod_exec import WS_CLOSE_POLICY_VIOLATION
 
 router = APIRouter(prefix="/application_components/worker", tags=["worker"])
 
@@ -57,3 +60,40 @@ def delete_worker(
 ):
     return WorkerService.delete_worker(db=db, uuid=uuid)
 
+
+@router.get("/{uuid}/pods", response_model=list[WebappSchemas.Pod])
+async def get_worker_pods(
+    uuid: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await WorkerService.get_worker_pods_async(db=db, uuid=uuid)
+
+
+@router.websocket("/{uuid}/pods/{pod_name}/exec/ws")
+async def exec_worker_pod_session(
+    websocket: WebSocket,
+    uuid: UUID,
+    pod_name: str,
+    command: list[str] = Query(["/bin/sh"]),
+    container_name: str = None,
+    tty: bool = True,
+):
+    """
+    Credenciais via headers ou subprotocolos (Sec-WebSocket-Protocol: tron.exec, bearer.<jwt>),
+    nunca na URL. Nenhuma sessão do banco fica aberta durante o exec.
+    """
+    try:
+        await run_in_threadpool(authenticate_websocket, websocket, [UserRole.ADMIN])
+    except HTTPException as e:
+        await websocket.close(code=WS_CLOSE_POLICY_VIOLATION, reason=str(e.detail))
+        return
+
+    await WorkerService.exec_worker_pod_session(
+        websocket=websocket,
+        uuid=uuid,
+        pod_name=pod_name,
+        command=command,
+        container_name=container_name,
+        tty=tty
+    )
@@ -155,3 +155,33 @@ class ApplicationComponentReducedResponse(ApplicationComponent):
         from_attributes=True,
     )
 
+
+
+class ComponentDiffRequest(BaseModel):
+    # Settings/URL propostos; quando omitidos, é usado o estado salvo do componente
+    settings: Dict[str, Any] | None = None
+    url: str | None = None
+
+
+class ObjectChange(BaseModel):
+    path: str
+    op: str
+    before: Any = None
+    after: Any = None
+
+
+class ObjectDiff(BaseModel):
+    kind: str
+    name: str
+    namespace: str | None = None
+    action: str  # create, update, unchanged, error
+    changes: list[ObjectChange] = []
+    error: str | None = None
+
+
+class ComponentDiff(BaseModel):
+    component_uuid: UUID
+    component_type: WebappType
+    cluster: str
+    objects: list[ObjectDiff]
+    duration_ms: float
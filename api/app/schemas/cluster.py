@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from uuid import UUID
@@ -10,8 +11,15 @@ class ClusterBase(BaseModel):
     api_address: str
     token: str
 
+class GatewayApiReference(BaseModel):
+    namespace: str = ""
+    name: str = ""
+
+
 class ClusterCreate(ClusterBase):
     environment_uuid: UUID
+    # Referência fixa do Gateway; quando omitida, o Gateway é descoberto no cluster
+    gateway_reference: Optional[GatewayApiReference] = None
 
 class ClusterResponse(ClusterBase):
     uuid: UUID
@@ -21,11 +29,6 @@ class ClusterResponse(ClusterBase):
     )
 
 
-class GatewayApiReference(BaseModel):
-    namespace: str = ""
-    name: str = ""
-
-
 class GatewayApi(BaseModel):
     enabled: bool = False
     resources: list[str] = []
@@ -34,6 +37,25 @@ class GatewayApi(BaseModel):
 class GatewayFeatures(BaseModel):
     api: GatewayApi
     reference: GatewayApiReference
+    pinned: bool = False
+
+
+class CircuitBreakerState(BaseModel):
+    state: str  # closed, open, half_open
+    consecutive_failures: int = 0
+    retry_in_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class ClusterHealth(BaseModel):
+    reachable: bool
+    latency_ms: Optional[float] = None
+    server_version: Optional[str] = None
+    probed_at: datetime
+
+    model_config = ConfigDict(
+        from_attributes=True,
+    )
 
 
 class ClusterResponseWithValidation(BaseModel):
@@ -42,27 +64,79 @@ class ClusterResponseWithValidation(BaseModel):
     api_address: str
     environment: Environment
     detail: dict
+    # Último resultado do prober em background (None se o cluster ainda não foi verificado)
+    status: Optional[ClusterHealth] = None
     gateway: GatewayFeatures
+    breaker: Optional[CircuitBreakerState] = None
 
     model_config = ConfigDict(
         from_attributes=True,
     )
 
 
+class CapacityResources(BaseModel):
+    cpu: float
+    memory_mb: int
+    pods: int
+
+
+class ClusterCapacity(BaseModel):
+    nodes: int
+    ready_nodes: int
+    capacity: CapacityResources
+    allocatable: CapacityResources
+    refreshed_at: float
+
+
 class ClusterCompletedResponse(BaseModel):
     uuid: UUID
     name: str
     api_address: str
     available_cpu: Optional[int]
     available_memory: Optional[int]
+    # CPU (cores) e memória (MB) alocáveis dos nodes Ready
+    allocatable_cpu: Optional[float] = None
+    allocatable_memory_mb: Optional[int] = None
+    capacity: Optional[ClusterCapacity] = None
     environment: Environment
     gateway: GatewayFeatures
+    breaker: Optional[CircuitBreakerState] = None
 
     model_config = ConfigDict(
         from_attributes=True,
     )
 
 
+class DiscoveryCacheStats(BaseModel):
+    entries: int
+    hits: int
+    misses: int
+    ttl_seconds: float
+    negative_ttl_seconds: float
+
+
+class ClusterDiscovery(BaseModel):
+    uuid: UUID
+    gateway: GatewayApi
+    cache: DiscoveryCacheStats
+
+
+class K8sClientPoolEntry(BaseModel):
+    cluster_id: int
+    fingerprint: str
+    breaker: Optional[CircuitBreakerState] = None
+
+
+class K8sClientPoolStats(BaseModel):
+    size: int
+    hits: int
+    misses: int
+    invalidations: int
+    retired: int = 0
+    connection_pool_maxsize: int
+    clusters: list[K8sClientPoolEntry] = []
+
+
 class Cluster(ClusterBase):
     uuid: UUID
 
@@ -125,3 +125,24 @@ class KubernetesEvent(BaseModel):
     last_timestamp: str | None = None
     count: int
     age_seconds: int
+
+
+class ResourceUsage(BaseModel):
+    pods: int
+    cpu_requests: float
+    cpu_limits: float
+    memory_requests: int  # em MB
+    memory_limits: int  # em MB
+    # Uso real (metrics-server); None quando nenhum pod tem métrica
+    cpu_usage: float | None = None
+    memory_usage: int | None = None  # em MB
+
+
+class ComponentResourceUsage(ResourceUsage):
+    name: str
+
+
+class InstanceResourceUsage(BaseModel):
+    components: list[ComponentResourceUsage]
+    total: ResourceUsage
+    metrics_available: bool
@@ -245,6 +245,9 @@ class Pod(BaseModel):
     memory_limits: int  # em MB
     age_seconds: int
     host_ip: str | None = None
+    # Uso real (metrics-server); None quando o metrics-server não está disponível
+    cpu_usage: float | None = None
+    memory_usage: int | None = None  # em MB
 
 
 class PodLogs(BaseModel):
@@ -0,0 +1,148 @@
+from app.database import SessionLocal
+from app.k8s.apply import get_component_uuid, get_manifest_hash, manifest_key, stamp_manifest_hash
+
+import app.models.applied_manifest as AppliedManifestModel
+
+
+def _load_applied_hashes(db, cluster_id: int, keys: list[tuple]) -> dict:
+    namespaces = {key[1] for key in keys}
+    rows = (
+        db.query(AppliedManifestModel.AppliedManifest)
+        .filter(
+            AppliedManifestModel.AppliedManifest.cluster_id == cluster_id,
+            AppliedManifestModel.AppliedManifest.namespace.in_(namespaces),
+        )
+        .all()
+    )
+    wanted = set(keys)
+    return {
+        (row.kind, row.namespace, row.name): row
+        for row in rows
+        if (row.kind, row.namespace, row.name) in wanted
+    }
+
+
+def _load_component_keys(db, cluster_id: int, component_uuid: str) -> set[tuple]:
+    """Objetos (kind, namespace, name) registrados para um componente no cluster."""
+    rows = (
+        db.query(
+            AppliedManifestModel.AppliedManifest.kind,
+            AppliedManifestModel.AppliedManifest.namespace,
+            AppliedManifestModel.AppliedManifest.name,
+        )
+        .filter(
+            AppliedManifestModel.AppliedManifest.cluster_id == cluster_id,
+            AppliedManifestModel.AppliedManifest.component_uuid == component_uuid,
+        )
+        .all()
+    )
+    return {tuple(row) for row in rows}
+
+
+def apply_manifests(cluster, k8s_client, yaml_documents, operation: str = "apply", skip_unchanged: bool = True):
+    """
+    Aplica os documentos renderizados no cluster pulando os que não mudaram.
+
+    Cada documento recebe a annotation tron.io/manifest-hash. Para operation="apply",
+    documentos com o mesmo hash do último apply bem-sucedido não são enviados ao cluster.
+    Os namespaces dos documentos são garantidos pelo próprio apply: um namespace recriado
+    invalida os hashes registrados dos seus documentos. O prune dos objetos do componente só
+    é feito quando o conjunto renderizado difere do registrado para o componente.
+    Os hashes são lidos e registrados em sessões próprias e curtas, independentes da transação
+    do chamador (só refletem o que já foi aplicado no cluster) e fechadas durante o apply.
+
+    Args:
+        cluster: Objeto Cluster do banco de dados
+        k8s_client: Cliente Kubernetes do cluster
+        yaml_documents: Documentos renderizados dos templates
+        operation: Operação repassada para K8sClient.apply_or_delete_yaml_to_k8s
+        skip_unchanged: Se False, todos os documentos são reenviados (ex: sync, que corrige
+            objetos alterados ou removidos fora do Tron)
+    """
+    documents = [
+        document for document in yaml_documents
+        if document and isinstance(document, dict) and document.get("metadata")
+    ]
+    if operation != "delete":
+        documents = [stamp_manifest_hash(document) for document in documents]
+
+    keys = [manifest_key(document) for document in documents]
+    component_uuids = {manifest_key(document): get_component_uuid(document) for document in documents}
+
+    # Sessões curtas: nenhuma conexão do pool fica presa enquanto o cluster responde
+    applied_hashes = None
+    prune = True
+    if operation == "apply" and skip_unchanged and keys:
+        db = SessionLocal()
+        try:
+            applied_hashes = {
+                key: row.manifest_hash for key, row in _load_applied_hashes(db, cluster.id, keys).items()
+            }
+            # Mesmo conjunto de objetos do último apply: não há o que podar (um prune que
+            # falhou mantém o registro do objeto, e o conjunto continua diferente)
+            component_uuid = set(component_uuids.values())
+            if len(component_uuid) == 1 and None not in component_uuid:
+                prune = _load_component_keys(db, cluster.id, component_uuid.pop()) != set(keys)
+        except Exception as e:
+            print(f"Warning: Could not load applied manifest hashes: {e}")
+            prune = True
+        finally:
+            db.close()
+
+    report = k8s_client.apply_or_delete_yaml_to_k8s(
+        documents, operation=operation, applied_hashes=applied_hashes, prune=prune
+    )
+
+    db = SessionLocal()
+    try:
+        if operation == "delete":
+            for row in (_load_applied_hashes(db, cluster.id, keys) if keys else {}).values():
+                db.delete(row)
+        else:
+            hashes = {manifest_key(document): get_manifest_hash(document) for document in documents}
+            pruned_keys = [
+                (result["kind"], result["namespace"], result["name"])
+                for result in report["results"]
+                if result["status"] == "pruned"
+            ]
+            if pruned_keys:
+                for row in _load_applied_hashes(db, cluster.id, pruned_keys).values():
+                    db.delete(row)
+
+            recorded_keys = [
+                (result["kind"], result["namespace"], result["name"])
+                for result in report["results"]
+                if result["status"] in ("ok", "skipped")
+            ]
+            applied_rows = _load_applied_hashes(db, cluster.id, recorded_keys) if recorded_keys else {}
+            for result in report["results"]:
+                key = (result["kind"], result["namespace"], result["name"])
+                row = applied_rows.get(key)
+                if result["status"] == "skipped":
+                    # Registros anteriores à coluna component_uuid são completados aqui
+                    if row is not None and row.component_uuid != component_uuids.get(key):
+                        row.component_uuid = component_uuids.get(key)
+                    continue
+                if result["status"] != "ok":
+                    continue
+                if row is None:
+                    db.add(AppliedManifestModel.AppliedManifest(
+                        cluster_id=cluster.id,
+                        kind=key[0],
+                        namespace=key[1],
+                        name=key[2],
+                        manifest_hash=hashes[key],
+                        component_uuid=component_uuids.get(key),
+                    ))
+                else:
+                    row.manifest_hash = hashes[key]
+                    row.component_uuid = component_uuids.get(key)
+        db.commit()
+    except Exception as e:
+        # Sem o registro o próximo apply apenas reenvia os documentos
+        print(f"Warning: Could not record applied manifest hashes: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+    return report
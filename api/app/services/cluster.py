@@ -1,20 +1,52 @@
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 from fastapi import HTTPException
+from app.database import SessionLocal
+from app.k8s.capacity import K8S_CAPACITY_COLD_WAIT_SECONDS
 from app.k8s.client import K8sClient
+from app.k8s.metrics import submit_with_context
+from app.k8s.registry import get_k8s_client, registry
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from uuid import uuid4
 from uuid import UUID
 
 import app.models.cluster as ClusterModel
+import app.models.cluster_status as ClusterStatusModel
 import app.models.environment as EnvironmentModel
 import app.schemas.cluster as ClusterSchema
 
 
+GATEWAY_REFERENCE_COLD_WAIT_SECONDS = float(os.getenv("GATEWAY_REFERENCE_COLD_WAIT_SECONDS", "5"))
+GATEWAY_REFERENCE_REFRESH_SECONDS = float(os.getenv("GATEWAY_REFERENCE_REFRESH_SECONDS", "300"))
+CLUSTER_PROBE_MAX_WORKERS = int(os.getenv("CLUSTER_PROBE_MAX_WORKERS", "8"))
+CLUSTER_STATUS_PROBE_SECONDS = float(os.getenv("CLUSTER_STATUS_PROBE_SECONDS", "60"))
+
+# Detalhe retornado para clusters que o prober ainda não verificou
+NOT_PROBED_DETAIL = {"status": "unknown", "message": "not probed yet"}
+
+
+def get_pinned_gateway_reference(cluster) -> dict | None:
+    """Retorna a referência do Gateway fixada no cadastro do cluster, se houver."""
+    if cluster.gateway_namespace and cluster.gateway_name:
+        return {
+            "namespace": cluster.gateway_namespace,
+            "name": cluster.gateway_name,
+        }
+    return None
+
+
 def get_gateway_reference_from_cluster(cluster) -> dict:
     """
     Obtém as informações de referência do gateway de um cluster.
-    Busca dinamicamente o Gateway no cluster Kubernetes.
+    Usa a referência fixada no cluster ou o valor cacheado pela busca em background;
+    a busca no cluster nunca é feita de forma síncrona no caminho de deploy.
 
     Args:
         cluster: Objeto Cluster do banco de dados
@@ -22,9 +54,16 @@ def get_gateway_reference_from_cluster(cluster) -> dict:
     Returns:
         Dict com namespace e name do gateway, ou valores vazios se não encontrar
     """
+    pinned_reference = get_pinned_gateway_reference(cluster)
+    if pinned_reference:
+        return pinned_reference
+
     try:
-        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-        gateway_ref = k8s_client.get_gateway_reference()
+        k8s_client = get_k8s_client(cluster)
+        gateway_ref = k8s_client.gateway_reference_cache.get(
+            k8s_client.get_gateway_reference,
+            wait_timeout=GATEWAY_REFERENCE_COLD_WAIT_SECONDS,
+        )
 
         if gateway_ref:
             return gateway_ref
@@ -38,11 +77,116 @@ def get_gateway_reference_from_cluster(cluster) -> dict:
     }
 
 
+def refresh_gateway_references():
+    """
+    Atualiza a referência do Gateway cacheada de todos os clusters sem referência fixada.
+    Executada periodicamente em background (ver app.main).
+    """
+    db = SessionLocal()
+    try:
+        clusters = db.query(ClusterModel.Cluster).all()
+        for cluster in clusters:
+            if get_pinned_gateway_reference(cluster):
+                continue
+            try:
+                k8s_client = get_k8s_client(cluster)
+                k8s_client.gateway_reference_cache.refresh(k8s_client.get_gateway_reference)
+            except Exception as e:
+                print(f"Warning: Error refreshing Gateway reference of cluster '{cluster.name}': {e}")
+    finally:
+        db.close()
+
+
+def refresh_cluster_capacities():
+    """
+    Atualiza o snapshot de capacidade (nodes) de todos os clusters.
+    Executada periodicamente em background (ver app.main).
+    """
+    db = SessionLocal()
+    try:
+        clusters = db.query(ClusterModel.Cluster).all()
+        for cluster in clusters:
+            try:
+                k8s_client = get_k8s_client(cluster)
+                k8s_client.capacity_cache.refresh(k8s_client.get_capacity_snapshot)
+            except Exception as e:
+                print(f"Warning: Error refreshing capacity of cluster '{cluster.name}': {e}")
+    finally:
+        db.close()
+
+
+def probe_clusters(clusters) -> list[dict]:
+    """
+    Verifica os clusters em paralelo (ver ClusterService._probe_cluster): um API server fora
+    do ar custa no máximo um timeout (ou nada, com o circuito aberto) em vez de somar ao
+    tempo dos demais.
+    """
+    if not clusters:
+        return []
+    k8s_clients = [get_k8s_client(cluster) for cluster in clusters]
+    with ThreadPoolExecutor(
+        max_workers=min(len(clusters), CLUSTER_PROBE_MAX_WORKERS), thread_name_prefix="cluster-probe"
+    ) as executor:
+        futures = [
+            submit_with_context(executor, ClusterService._probe_cluster, k8s_client) for k8s_client in k8s_clients
+        ]
+        return [future.result() for future in futures]
+
+
+def save_cluster_statuses(db: Session, clusters, probes: list[dict]):
+    """
+    Grava (upsert) o resultado das verificações na tabela cluster_statuses. Não faz commit.
+    Usa INSERT ... ON CONFLICT (cluster_id): o prober periódico, o refresh do GET /clusters/
+    e os outros workers podem gravar o mesmo cluster ao mesmo tempo.
+    """
+    table = ClusterStatusModel.ClusterStatus.__table__
+    insert = sqlite_insert if db.get_bind().dialect.name == "sqlite" else postgresql_insert
+    for cluster, probe in zip(clusters, probes):
+        statement = insert(table).values(cluster_id=cluster.id, **probe)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table.c.cluster_id],
+                set_={**{field: statement.excluded[field] for field in probe}, "updated_at": func.now()},
+            )
+        )
+
+
+def load_cluster_statuses(db: Session, clusters) -> dict:
+    """Retorna as linhas de cluster_statuses dos clusters, por cluster_id."""
+    cluster_ids = [cluster.id for cluster in clusters]
+    if not cluster_ids:
+        return {}
+    rows = (
+        db.query(ClusterStatusModel.ClusterStatus)
+        .filter(ClusterStatusModel.ClusterStatus.cluster_id.in_(cluster_ids))
+        .all()
+    )
+    return {row.cluster_id: row for row in rows}
+
+
+def refresh_cluster_statuses():
+    """
+    Verifica todos os clusters e grava o resultado em cluster_statuses.
+    Executada periodicamente em background (ver app.main); GET /clusters/ lê apenas esse snapshot.
+    """
+    db = SessionLocal()
+    try:
+        clusters = db.query(ClusterModel.Cluster).all()
+        save_cluster_statuses(db, clusters, probe_clusters(clusters))
+        db.commit()
+    except Exception as e:
+        print(f"Warning: Error refreshing cluster statuses: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
 class ClusterService:
     def upsert_cluster(
         db: Session, cluster: ClusterSchema.ClusterCreate, cluster_uuid: UUID = None
     ):
 
+        # Cliente avulso só para validar as credenciais (não entra no registry)
         k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
 
         try:
@@ -60,6 +204,8 @@ class ClusterService:
         except Exception as e:
             error_message = str(e)
             raise HTTPException(status_code=400, detail=f"Connection validation failed: {error_message}")
+        finally:
+            k8s_client.close()
 
         if cluster_uuid:
             db_cluster = (
@@ -68,15 +214,26 @@ class ClusterService:
                 .first()
             )
             if db_cluster:
+                credentials_changed = (
+                    db_cluster.api_address != cluster.api_address
+                    or db_cluster.token != cluster.token
+                )
                 db_cluster.name = cluster.name
                 db_cluster.api_address = cluster.api_address
                 db_cluster.token = cluster.token
+                if "gateway_reference" in cluster.model_fields_set:
+                    ClusterService._pin_gateway_reference(db_cluster, cluster.gateway_reference)
                 try:
                     db.commit()
                 except Exception as e:
                     error_msg = str(e) if hasattr(e, '__str__') else f"{e}"
                     raise HTTPException(status_code=400, detail=error_msg)
                 db.refresh(db_cluster)
+
+                # Descartar o cliente em pool com as credenciais antigas
+                if credentials_changed:
+                    registry.invalidate(db_cluster.id)
+                ClusterService._warm_gateway_reference(db_cluster)
                 return db_cluster
 
         environment = (
@@ -95,6 +252,7 @@ class ClusterService:
             token=cluster.token,
             environment_id=environment.id,
         )
+        ClusterService._pin_gateway_reference(new_cluster, cluster.gateway_reference)
 
         db.add(new_cluster)
 
@@ -106,8 +264,52 @@ class ClusterService:
 
         db.refresh(new_cluster)
 
+        ClusterService._warm_gateway_reference(new_cluster)
+
         return new_cluster
 
+    def _pin_gateway_reference(db_cluster, gateway_reference):
+        """Grava (ou remove, se vazio) a referência do Gateway fixada no cluster."""
+        if gateway_reference and gateway_reference.namespace and gateway_reference.name:
+            db_cluster.gateway_namespace = gateway_reference.namespace
+            db_cluster.gateway_name = gateway_reference.name
+        else:
+            db_cluster.gateway_namespace = None
+            db_cluster.gateway_name = None
+
+    def _warm_gateway_reference(db_cluster):
+        """Agenda a busca da referência do Gateway logo após o cadastro do cluster."""
+        if get_pinned_gateway_reference(db_cluster):
+            return
+        try:
+            k8s_client = get_k8s_client(db_cluster)
+            k8s_client.gateway_reference_cache.refresh_async(k8s_client.get_gateway_reference)
+        except Exception as e:
+            print(f"Warning: Could not schedule Gateway reference lookup: {e}")
+
+    def _gateway_features(db_cluster, k8s_client, gateway_api_available: bool, gateway_resources: list) -> dict:
+        """Monta o bloco 'gateway' das respostas de cluster a partir dos caches."""
+        gateway_reference = {
+            "namespace": "",
+            "name": "",
+        }
+        pinned_reference = get_pinned_gateway_reference(db_cluster)
+        if pinned_reference:
+            gateway_reference = pinned_reference
+        elif gateway_api_available:
+            gateway_ref = k8s_client.gateway_reference_cache.get(k8s_client.get_gateway_reference)
+            if gateway_ref:
+                gateway_reference = gateway_ref
+
+        return {
+            "api": {
+                "enabled": gateway_api_available,
+                "resources": gateway_resources,
+            },
+            "reference": gateway_reference,
+            "pinned": pinned_reference is not None,
+        }
+
     def get_cluster(db: Session, uuid: int):
 
         db_cluster = (
@@ -119,25 +321,21 @@ class ClusterService:
         if db_cluster is None:
             raise HTTPException(status_code=404, detail="Cluster not found")
 
-        k8s_client = K8sClient(url=db_cluster.api_address, token=db_cluster.token)
+        k8s_client = get_k8s_client(db_cluster)
 
-        available_cpu = k8s_client.get_available_cpu() or 0
-        available_memory = k8s_client.get_available_memory() or 0
+        capacity = k8s_client.get_cached_capacity(wait_timeout=K8S_CAPACITY_COLD_WAIT_SECONDS)
+        # available_* mantêm o significado histórico; allocatable_* são os totais dos nodes Ready
+        available_cpu = capacity["available"]["cpu"] if capacity else 0
+        available_memory = capacity["available"]["memory"] if capacity else 0
+        allocatable_cpu = capacity["allocatable"]["cpu"] if capacity else None
+        allocatable_memory_mb = capacity["allocatable"]["memory_mb"] if capacity else None
 
         # Verificar Gateway API e recursos disponíveis
         gateway_api_available = k8s_client.check_api_available("gateway.networking.k8s.io")
         gateway_resources = []
-        gateway_reference = {
-            "namespace": "",
-            "name": "",
-        }
 
         if gateway_api_available:
             gateway_resources = k8s_client.get_gateway_api_resources()
-            # Buscar referência do Gateway no cluster
-            gateway_ref = k8s_client.get_gateway_reference()
-            if gateway_ref:
-                gateway_reference = gateway_ref
 
         serialized_data = {
             "uuid": db_cluster.uuid,
@@ -145,57 +343,97 @@ class ClusterService:
             "api_address": db_cluster.api_address,
             "available_cpu": available_cpu,
             "available_memory": available_memory,
+            "allocatable_cpu": allocatable_cpu,
+            "allocatable_memory_mb": allocatable_memory_mb,
+            "capacity": capacity,
+            "breaker": k8s_client.breaker.snapshot(),
             "environment": db_cluster.environment,
-            "gateway": {
-                "api": {
-                    "enabled": gateway_api_available,
-                    "resources": gateway_resources,
-                },
-                "reference": gateway_reference,
-            },
+            "gateway": ClusterService._gateway_features(
+                db_cluster, k8s_client, gateway_api_available, gateway_resources
+            ),
         }
 
         return ClusterSchema.ClusterCompletedResponse.model_validate(serialized_data)
 
-    def get_clusters(db: Session, skip: int = 0, limit: int = 100):
+    def _probe_cluster(k8s_client) -> dict:
+        """
+        Valida a conexão, a versão e a Gateway API de um cluster (executado em paralelo por probe_clusters).
+        Não acessa o banco: roda fora da thread da sessão.
+
+        Returns:
+            Dict com os campos de ClusterStatus
+        """
+        started_at = time.monotonic()
+        try:
+            success, connection_message = k8s_client.validate_connection()
+        except Exception as e:
+            success, connection_message = False, {"status": "error", "message": str(e)}
+        latency_ms = round((time.monotonic() - started_at) * 1000, 2)
+
+        # Verificar a versão e a API Gateway apenas se a conexão for bem-sucedida
+        server_version = None
+        gateway_api_available = False
+        gateway_resources = []
+
+        if success:
+            try:
+                server_version = k8s_client.get_server_version()
+            except Exception as e:
+                print(f"Warning: Could not get API server version: {e}")
+            gateway_api_available = k8s_client.check_api_available("gateway.networking.k8s.io")
+            if gateway_api_available:
+                gateway_resources = k8s_client.get_gateway_api_resources()
+
+        return {
+            "reachable": success,
+            "latency_ms": latency_ms,
+            "server_version": server_version,
+            "detail": connection_message,
+            "gateway_api_enabled": gateway_api_available,
+            "gateway_resources": gateway_resources,
+            "probed_at": datetime.utcnow(),
+        }
+
+    def get_clusters(db: Session, skip: int = 0, limit: int = 100, refresh: bool = False):
+        """
+        Lista os clusters com o último status gravado pelo prober em background.
+        Com refresh=True, os clusters da página são verificados agora (em paralelo) e o
+        resultado é gravado antes de responder.
+        """
         clusters = db.query(ClusterModel.Cluster).offset(skip).limit(limit).all()
 
         serialized_data = []
+        if not clusters:
+            return serialized_data
+
+        if refresh:
+            save_cluster_statuses(db, clusters, probe_clusters(clusters))
+            try:
+                db.commit()
+            except Exception as e:
+                # A resposta usa o que estiver salvo
+                print(f"Warning: Could not record cluster statuses: {e}")
+                db.rollback()
+        statuses = load_cluster_statuses(db, clusters)
 
         for cluster in clusters:
-            k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-            success, connection_message = k8s_client.validate_connection()
-
-            # Verificar se a API Gateway está disponível apenas se a conexão for bem-sucedida
-            gateway_api_available = False
-            gateway_resources = []
-            gateway_reference = {
-                "namespace": "",
-                "name": "",
-            }
-
-            if success:
-                gateway_api_available = k8s_client.check_api_available("gateway.networking.k8s.io")
-                if gateway_api_available:
-                    gateway_resources = k8s_client.get_gateway_api_resources()
-                    # Buscar referência do Gateway no cluster
-                    gateway_ref = k8s_client.get_gateway_reference()
-                    if gateway_ref:
-                        gateway_reference = gateway_ref
+            k8s_client = get_k8s_client(cluster)
+            status = statuses.get(cluster.id)
 
             cluster_data = {
                 "uuid": cluster.uuid,
                 "name": cluster.name,
                 "api_address": cluster.api_address,
                 "environment": cluster.environment,
-                "detail": connection_message,
-                "gateway": {
-                    "api": {
-                        "enabled": gateway_api_available,
-                        "resources": gateway_resources,
-                    },
-                    "reference": gateway_reference,
-                },
+                "detail": status.detail if status else NOT_PROBED_DETAIL,
+                "status": status,
+                "gateway": ClusterService._gateway_features(
+                    cluster,
+                    k8s_client,
+                    status.gateway_api_enabled if status else False,
+                    status.gateway_resources if status else [],
+                ),
+                "breaker": k8s_client.breaker.snapshot(),
             }
 
             cluster_response = (
@@ -215,7 +453,52 @@ class ClusterService:
         if not db_cluster:
             raise HTTPException(status_code=404, detail="Cluster not found")
 
+        cluster_id = db_cluster.id
         db.delete(db_cluster)
         db.commit()
 
+        registry.invalidate(cluster_id)
+
         return {"detail": "Cluster deleted successfully"}
+
+    def refresh_cluster_discovery(db: Session, uuid: UUID):
+        """
+        Descarta o cache de descoberta do cluster e consulta novamente o API server.
+        Útil logo após a instalação de CRDs (ex: Gateway API) no cluster.
+        """
+        db_cluster = (
+            db.query(ClusterModel.Cluster)
+            .filter(ClusterModel.Cluster.uuid == uuid)
+            .first()
+        )
+
+        if db_cluster is None:
+            raise HTTPException(status_code=404, detail="Cluster not found")
+
+        k8s_client = get_k8s_client(db_cluster)
+        k8s_client.discovery.invalidate()
+
+        gateway_api_available = k8s_client.check_api_available("gateway.networking.k8s.io", refresh=True)
+        gateway_resources = []
+        if gateway_api_available:
+            gateway_resources = k8s_client.get_gateway_api_resources(refresh=True)
+
+        # Manter o status gravado pelo prober coerente com a nova descoberta
+        status = load_cluster_statuses(db, [db_cluster]).get(db_cluster.id)
+        if status is not None:
+            status.gateway_api_enabled = gateway_api_available
+            status.gateway_resources = gateway_resources
+            db.commit()
+
+        return ClusterSchema.ClusterDiscovery.model_validate({
+            "uuid": db_cluster.uuid,
+            "gateway": {
+                "enabled": gateway_api_available,
+                "resources": gateway_resources,
+            },
+            "cache": k8s_client.discovery.stats(),
+        })
+
+    def get_client_pool_stats():
+        """Retorna os contadores do pool de clientes Kubernetes do processo."""
+        return ClusterSchema.K8sClientPoolStats.model_validate(registry.stats())
@@ -2,6 +2,8 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
+from app.k8s.registry import get_k8s_client
+
 import app.models.cluster as ClusterModel
 import app.models.cluster_instance as ClusterInstanceModel
 
@@ -15,7 +17,8 @@ class ClusterSelectionService:
     def get_cluster_with_least_load(db: Session, environment_id: int):
         """
         Encontra o cluster de menor carga no environment especificado.
-        A carga é medida pela quantidade de ClusterInstance que cada cluster possui.
+        A carga é medida pela quantidade de ClusterInstance que cada cluster possui;
+        o snapshot de capacidade cacheado desempata e descarta clusters sem nodes Ready.
 
         Args:
             db: Sessão do banco de dados
@@ -27,28 +30,12 @@ class ClusterSelectionService:
         Raises:
             HTTPException: Se não houver clusters disponíveis no environment
         """
-        # Buscar todos os clusters do environment
-        clusters = (
-            db.query(ClusterModel.Cluster)
-            .filter(ClusterModel.Cluster.environment_id == environment_id)
-            .all()
-        )
+        cluster_loads = ClusterSelectionService.get_cluster_loads(db, environment_id)
 
-        if not clusters:
+        if not cluster_loads:
             return None
 
-        # Calcular a carga de cada cluster (quantidade de ClusterInstance)
-        cluster_loads = []
-        for cluster in clusters:
-            instance_count = (
-                db.query(func.count(ClusterInstanceModel.ClusterInstance.id))
-                .filter(ClusterInstanceModel.ClusterInstance.cluster_id == cluster.id)
-                .scalar()
-            )
-            cluster_loads.append((cluster, instance_count or 0))
-
         # Retornar o cluster com menor carga
-        cluster_loads.sort(key=lambda x: x[1])
         return cluster_loads[0][0]
 
     @staticmethod
@@ -98,6 +85,7 @@ class ClusterSelectionService:
         )
 
         cluster_loads = []
+        capacities = {}
         for cluster in clusters:
             instance_count = (
                 db.query(func.count(ClusterInstanceModel.ClusterInstance.id))
@@ -105,7 +93,32 @@ class ClusterSelectionService:
                 .scalar()
             )
             cluster_loads.append((cluster, instance_count or 0))
-
-        cluster_loads.sort(key=lambda x: x[1])
+            capacities[cluster.id] = ClusterSelectionService._get_cached_capacity(cluster)
+
+        # Clusters sabidamente sem nodes Ready só são usados se não houver outra opção
+        schedulable = [
+            (cluster, load) for cluster, load in cluster_loads
+            if capacities[cluster.id] is None or capacities[cluster.id]["ready_nodes"] > 0
+        ]
+        if schedulable:
+            cluster_loads = schedulable
+
+        # Menor carga primeiro; em caso de empate, o cluster com mais CPU alocável
+        cluster_loads.sort(key=lambda x: (
+            x[1],
+            -(capacities[x[0].id]["allocatable"]["cpu"] if capacities[x[0].id] else 0),
+        ))
         return cluster_loads
 
+    @staticmethod
+    def _get_cached_capacity(cluster):
+        """
+        Snapshot de capacidade cacheado do cluster, sem chamar o API server.
+        Retorna None se o snapshot ainda não foi carregado (a busca é agendada em background).
+        """
+        try:
+            return get_k8s_client(cluster).get_cached_capacity()
+        except Exception as e:
+            print(f"Warning: Could not read capacity of cluster '{cluster.name}': {e}")
+            return None
+
@@ -0,0 +1,118 @@
+import time
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, joinedload
+from uuid import UUID
+
+import app.models.application_components as ApplicationComponentModel
+import app.models.cluster_instance as ClusterInstanceModel
+import app.models.instance as InstanceModel
+import app.models.settings as SettingsModel
+from app.helpers.serializers import serialize_application_component, serialize_settings
+from app.k8s.registry import get_k8s_client
+from app.schemas.cron import CronSettings
+from app.schemas.webapp import WebappSettings
+from app.schemas.worker import WorkerSettings
+from app.services.cluster import get_gateway_reference_from_cluster
+from app.services.kubernetes.application_component_manager import (
+    KubernetesApplicationComponentManager,
+)
+
+
+# Schema usado para validar os settings propostos de cada tipo de componente
+COMPONENT_SETTINGS_SCHEMAS = {
+    ApplicationComponentModel.WebappType.webapp: WebappSettings,
+    ApplicationComponentModel.WebappType.worker: WorkerSettings,
+    ApplicationComponentModel.WebappType.cron: CronSettings,
+}
+
+
+class ComponentDiffService:
+    @staticmethod
+    def diff_component(
+        db: Session,
+        component_type: ApplicationComponentModel.WebappType,
+        uuid: UUID,
+        settings: dict = None,
+        url: str = None,
+    ) -> dict:
+        """
+        Mostra o que um upsert do componente mudaria no cluster, sem aplicar nada.
+
+        Os templates são renderizados como no deploy (opcionalmente com settings/URL
+        propostos) e cada objeto é comparado com o estado atual via server-side apply
+        em dry-run.
+        """
+        started_at = time.monotonic()
+
+        db_component = (
+            db.query(ApplicationComponentModel.ApplicationComponent)
+            .options(
+                joinedload(ApplicationComponentModel.ApplicationComponent.instance)
+                .joinedload(InstanceModel.Instance.application),
+                joinedload(ApplicationComponentModel.ApplicationComponent.instance)
+                .joinedload(InstanceModel.Instance.environment),
+            )
+            .filter(ApplicationComponentModel.ApplicationComponent.uuid == uuid)
+            .first()
+        )
+
+        if db_component is None:
+            raise HTTPException(status_code=404, detail="Component not found")
+        if db_component.type != component_type:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Component is not a {component_type.value}"
+            )
+
+        cluster_instance = (
+            db.query(ClusterInstanceModel.ClusterInstance)
+            .options(joinedload(ClusterInstanceModel.ClusterInstance.cluster))
+            .filter(ClusterInstanceModel.ClusterInstance.application_component_id == db_component.id)
+            .first()
+        )
+        if not cluster_instance:
+            raise HTTPException(
+                status_code=404,
+                detail="Component is not deployed to any cluster"
+            )
+        cluster = cluster_instance.cluster
+
+        if settings is not None:
+            try:
+                settings = COMPONENT_SETTINGS_SCHEMAS[component_type].model_validate(settings).model_dump()
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+        environment_settings = (
+            db.query(SettingsModel.Settings)
+            .filter(SettingsModel.Settings.environment_id == db_component.instance.environment_id)
+            .all()
+        )
+
+        application_component_serialized = serialize_application_component(
+            db_component, settings_override=settings, url_override=url
+        )
+
+        try:
+            kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
+                application_component_serialized,
+                component_type.value,
+                serialize_settings(environment_settings),
+                db=db,
+                gateway_reference=get_gateway_reference_from_cluster(cluster),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Failed to render templates: {str(e)}")
+
+        k8s_client = get_k8s_client(cluster)
+        objects = k8s_client.diff_documents(kubernetes_payload)
+
+        return {
+            "component_uuid": db_component.uuid,
+            "component_type": component_type,
+            "cluster": cluster.name,
+            "objects": objects,
+            "duration_ms": round((time.monotonic() - started_at) * 1000, 2),
+        }
@@ -2,6 +2,7 @@ from fastapi import HTTPException
 import app.models.component_template_config as ComponentTemplateConfigModel
 import app.models.template as TemplateModel
 import app.schemas.component_template_config as ComponentTemplateConfigSchema
+from app.services.template_set_cache import bump_template_set_version, template_set_cache
 from sqlalchemy.orm import Session
 from uuid import uuid4
 from uuid import UUID
@@ -31,6 +32,7 @@ class ComponentTemplateConfigService:
             if db_config:
                 db_config.render_order = config.render_order
                 db_config.enabled = str(config.enabled).lower()
+                bump_template_set_version(db)
                 db.commit()
                 db.refresh(db_config)
                 # Carregar template para serialização
@@ -61,6 +63,7 @@ class ComponentTemplateConfigService:
             enabled=str(config.enabled).lower(),
         )
         db.add(new_config)
+        bump_template_set_version(db)
 
         try:
             db.commit()
@@ -92,6 +95,7 @@ class ComponentTemplateConfigService:
             db_config.render_order = config_update.render_order
         if config_update.enabled is not None:
             db_config.enabled = str(config_update.enabled).lower()
+        bump_template_set_version(db)
 
         try:
             db.commit()
@@ -132,7 +136,16 @@ class ComponentTemplateConfigService:
 
     @staticmethod
     def get_templates_for_component(db: Session, component_type: str):
-        """Retorna templates ordenados por render_order para um tipo de componente"""
+        """
+        Retorna templates ordenados por render_order para um tipo de componente.
+        O conjunto vem do cache em memória enquanto a versão em cache_versions não mudar.
+        """
+        return template_set_cache.get(
+            db, component_type, ComponentTemplateConfigService._load_templates_for_component
+        )
+
+    @staticmethod
+    def _load_templates_for_component(db: Session, component_type: str):
         configs = (
             db.query(ComponentTemplateConfigModel.ComponentTemplateConfig)
             .join(TemplateModel.Template)
@@ -156,6 +169,7 @@ class ComponentTemplateConfigService:
 
         try:
             db.delete(db_config)
+            bump_template_set_version(db)
             db.commit()
         except Exception as e:
             db.rollback()
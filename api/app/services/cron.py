@@ -1,4 +1,5 @@
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
 from uuid import uuid4
 from uuid import UUID
@@ -8,8 +9,12 @@ import app.models.instance as InstanceModel
 import app.models.cluster_instance as ClusterInstanceModel
 import app.models.settings as SettingsModel
 import app.schemas.cron as CronSchema
+from app.database import close_after
 from app.helpers.serializers import serialize_application_component, serialize_settings
-from app.k8s.client import K8sClient
+from app.k8s import formatters
+from app.k8s.client import K8S_LIST_CHUNK_SIZE
+from app.k8s.registry import get_async_k8s_client, get_k8s_client
+from app.services.applied_manifest import apply_manifests
 from app.services.kubernetes.application_component_manager import (
     KubernetesApplicationComponentManager,
 )
@@ -17,6 +22,10 @@ from app.services.cluster_selection import ClusterSelectionService
 from app.services.cluster import get_gateway_reference_from_cluster
 
 
+# Prefixo dos tokens de continuação das páginas buscadas pelo nome do cron (fallback sem label)
+NAME_FALLBACK_CONTINUE_PREFIX = "name:"
+
+
 class CronService:
     @staticmethod
     def upsert_cron(
@@ -107,7 +116,7 @@ class CronService:
             # Se o componente foi desativado (enabled mudou de True para False), remover do Kubernetes
             if enabled_changed and was_enabled and not will_be_enabled:
                 try:
-                    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                    k8s_client = get_k8s_client(cluster)
                     application_name = application_component_serialized.get("application_name")
                     if application_name:
                         k8s_client.ensure_namespace_exists(application_name)
@@ -117,8 +126,8 @@ class CronService:
                         application_component_serialized, component_type, settings_serialized, db=db,
                         gateway_reference=gateway_reference
                     )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="delete"
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="delete"
                     )
 
                     db.commit()
@@ -136,18 +145,15 @@ class CronService:
             # Se o componente foi reativado (enabled mudou de False para True), reaplicar no Kubernetes
             elif enabled_changed and not was_enabled and will_be_enabled:
                 try:
-                    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-                    application_name = application_component_serialized.get("application_name")
-                    if application_name:
-                        k8s_client.ensure_namespace_exists(application_name)
+                    k8s_client = get_k8s_client(cluster)
 
                     gateway_reference = get_gateway_reference_from_cluster(cluster)
                     kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                         application_component_serialized, component_type, settings_serialized, db=db,
                         gateway_reference=gateway_reference
                     )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="upsert"
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="apply"
                     )
 
                     db.commit()
@@ -164,20 +170,15 @@ class CronService:
             # Se não houve mudança no enabled ou se está habilitado, aplicar normalmente
             elif not enabled_changed or db_cron.enabled:
                 try:
-                    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-
-                    # Verificar e criar namespace com o nome da aplicação se não existir
-                    application_name = application_component_serialized.get("application_name")
-                    if application_name:
-                        k8s_client.ensure_namespace_exists(application_name)
+                    k8s_client = get_k8s_client(cluster)
 
                     gateway_reference = get_gateway_reference_from_cluster(cluster)
                     kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                         application_component_serialized, component_type, settings_serialized, db=db,
                         gateway_reference=gateway_reference
                     )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="upsert"
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="apply"
                     )
 
                     db.commit()
@@ -287,7 +288,7 @@ class CronService:
 
             # Aplicar recursos no Kubernetes
             try:
-                k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                k8s_client = get_k8s_client(cluster)
 
                 # Verificar e criar namespace com o nome da aplicação se não existir
                 application_name = application_component_serialized.get("application_name")
@@ -297,8 +298,8 @@ class CronService:
                 kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                     application_component_serialized, component_type, settings_serialized, db=db
                 )
-                k8s_client.apply_or_delete_yaml_to_k8s(
-                    kubernetes_payload, operation="create"
+                apply_manifests(
+                    cluster, k8s_client, kubernetes_payload, operation="create"
                 )
 
                 # Commit do cluster_instance e do componente
@@ -354,9 +355,12 @@ class CronService:
         return [CronSchema.Cron.model_validate(cron) for cron in db_crons]
 
     @staticmethod
-    def get_cron_jobs(db: Session, uuid: UUID):
+    def _get_cron_deployment(db: Session, uuid: UUID):
         """
-        Lista os Jobs executados por um CronJob específico.
+        Busca o cluster onde o cron está implantado.
+
+        Returns:
+            Tupla (cluster, nome da aplicação/namespace, nome do componente)
         """
         # Buscar o componente com relacionamentos
         db_cron = (
@@ -392,93 +396,127 @@ class CronService:
                 detail="Cron is not deployed to any cluster"
             )
 
-        cluster = cluster_instance.cluster
-        application_name = db_cron.instance.application.name
-        component_name = db_cron.name
-
-        # Criar cliente Kubernetes
-        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+        return cluster_instance.cluster, db_cron.instance.application.name, db_cron.name
 
-        # Listar jobs usando label selector baseado no nome do componente
-        # Jobs criados por CronJobs têm labels que incluem o nome do CronJob
-        label_selector = f"app={component_name}"
-        jobs = k8s_client.list_jobs(namespace=application_name, label_selector=label_selector)
+    @staticmethod
+    def _get_cron_jobs_from_informer(cluster, application_name: str, component_name: str):
+        """
+        Lê os Jobs do cron do cache do informer, sem chamar o API server.
+        Retorna None se os informers estiverem desligados ou ainda não sincronizados.
+        """
+        store = get_k8s_client(cluster).informers.get_store("jobs", application_name)
+        if store is None:
+            return None
 
-        # Se não encontrar com esse seletor, tentar sem seletor e filtrar depois
+        jobs = store.by_index("app", component_name)
         if not jobs:
-            all_jobs = k8s_client.list_jobs(namespace=application_name)
-            jobs = [job for job in all_jobs if component_name in job['name']]
+            jobs = [job for job in store.list_objects() if component_name in job["metadata"]["name"]]
 
-        return jobs
+        formatted_jobs = [formatters.format_job(job) for job in jobs]
+        formatted_jobs.sort(key=lambda x: x["age_seconds"], reverse=False)
+        return formatted_jobs
 
     @staticmethod
-    def get_cron_job_logs(db: Session, uuid: UUID, job_name: str, container_name: str = None, tail_lines: int = 100):
+    async def get_cron_jobs_async(
+        db: Session,
+        uuid: UUID,
+        limit: int = None,
+        continue_token: str = None,
+        label_selector: str = None,
+        field_selector: str = None,
+    ):
         """
-        Obtém os logs dos pods criados por um Job específico de um CronJob.
+        Lista os Jobs executados por um CronJob específico.
+
+        Com `limit`, retorna apenas uma página (limit/continue do Kubernetes). O
+        `label_selector` informado é combinado com o seletor do cron (app=<componente>).
+        Se nenhum Job tiver essa label, os Jobs são buscados pelo nome do cron, com ou sem
+        paginação; nesse caso as páginas podem vir com menos de `limit` jobs.
+
+        Returns:
+            Tupla (jobs, token da próxima página ou None)
         """
-        # Buscar o componente com relacionamentos
-        db_cron = (
-            db.query(ApplicationComponentModel.ApplicationComponent)
-            .options(
-                joinedload(ApplicationComponentModel.ApplicationComponent.instance)
-                .joinedload(InstanceModel.Instance.application),
-                joinedload(ApplicationComponentModel.ApplicationComponent.instances)
-                .joinedload(ClusterInstanceModel.ClusterInstance.cluster)
-            )
-            .filter(ApplicationComponentModel.ApplicationComponent.uuid == uuid)
-            .first()
+        cluster, application_name, component_name = await run_in_threadpool(
+            close_after, db, CronService._get_cron_deployment, uuid
         )
 
-        if db_cron is None:
-            raise HTTPException(status_code=404, detail="Cron not found")
-        if db_cron.type != ApplicationComponentModel.WebappType.cron:
-            raise HTTPException(
-                status_code=400,
-                detail="Component is not a cron"
+        paginated = limit is not None or continue_token is not None
+        if not paginated and not label_selector and not field_selector:
+            cached_jobs = CronService._get_cron_jobs_from_informer(cluster, application_name, component_name)
+            if cached_jobs is not None:
+                return cached_jobs, None
+
+        k8s_client = get_async_k8s_client(cluster)
+
+        selector = f"app={component_name}"
+        if label_selector:
+            selector = f"{selector},{label_selector}"
+
+        if paginated:
+            by_name = continue_token is not None and continue_token.startswith(NAME_FALLBACK_CONTINUE_PREFIX)
+            if not by_name:
+                jobs, next_token = await k8s_client.list_jobs_page(
+                    namespace=application_name,
+                    limit=limit or K8S_LIST_CHUNK_SIZE,
+                    continue_token=continue_token,
+                    label_selector=selector,
+                    field_selector=field_selector,
+                )
+                if jobs or next_token or continue_token or label_selector:
+                    return jobs, next_token
+
+            # Nenhum Job com a label do cron: paginar todos os Jobs e filtrar pelo nome
+            all_jobs, next_token = await k8s_client.list_jobs_page(
+                namespace=application_name,
+                limit=limit or K8S_LIST_CHUNK_SIZE,
+                continue_token=continue_token[len(NAME_FALLBACK_CONTINUE_PREFIX):] if by_name else None,
+                field_selector=field_selector,
             )
+            jobs = [job for job in all_jobs if component_name in job['name']]
+            return jobs, f"{NAME_FALLBACK_CONTINUE_PREFIX}{next_token}" if next_token else None
 
-        # Buscar cluster_instance relacionado
-        cluster_instance = (
-            db.query(ClusterInstanceModel.ClusterInstance)
-            .filter(ClusterInstanceModel.ClusterInstance.application_component_id == db_cron.id)
-            .first()
+        jobs = await k8s_client.list_jobs(
+            namespace=application_name, label_selector=selector, field_selector=field_selector
         )
 
-        if not cluster_instance:
-            raise HTTPException(
-                status_code=404,
-                detail="Cron is not deployed to any cluster"
-            )
+        # Se não encontrar com esse seletor, tentar sem seletor e filtrar depois
+        if not jobs and not label_selector:
+            all_jobs = await k8s_client.list_jobs(namespace=application_name, field_selector=field_selector)
+            jobs = [job for job in all_jobs if component_name in job['name']]
 
-        cluster = cluster_instance.cluster
-        application_name = db_cron.instance.application.name
+        return jobs, None
 
-        # Criar cliente Kubernetes
-        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+    @staticmethod
+    async def get_cron_job_logs_async(db: Session, uuid: UUID, job_name: str, container_name: str = None, tail_lines: int = 100):
+        """
+        Obtém os logs dos pods criados por um Job específico de um CronJob.
+        """
+        cluster, application_name, _ = await run_in_threadpool(
+            close_after, db, CronService._get_cron_deployment, uuid
+        )
+        k8s_client = get_async_k8s_client(cluster)
 
-        # Buscar pods do Job usando label selector job-name
         # Jobs criam pods com label job-name=<job-name>
-        label_selector = f"job-name={job_name}"
-        pods = k8s_client.list_pods(namespace=application_name, label_selector=label_selector)
+        pod_names = await k8s_client.list_pod_names(namespace=application_name, label_selector=f"job-name={job_name}")
 
-        if not pods:
+        if not pod_names:
             raise HTTPException(
                 status_code=404,
                 detail=f"No pods found for job {job_name}"
             )
 
-        # Pegar o primeiro pod (geralmente Jobs criam apenas um pod)
-        pod_name = pods[0]['name']
+        pod_name = pod_names[0]
 
-        # Obter logs do pod
         try:
-            logs = k8s_client.get_pod_logs(
+            logs = await k8s_client.get_pod_logs(
                 namespace=application_name,
                 pod_name=pod_name,
                 container_name=container_name,
                 tail_lines=tail_lines
             )
             return {"logs": logs, "pod_name": pod_name, "job_name": job_name, "container_name": container_name}
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=500,
@@ -486,52 +524,16 @@ class CronService:
             )
 
     @staticmethod
-    def delete_cron_job(db: Session, uuid: UUID, job_name: str):
+    async def delete_cron_job_async(db: Session, uuid: UUID, job_name: str):
         """
         Deleta um Job específico criado por um CronJob no Kubernetes.
         """
-        # Buscar o componente com relacionamentos
-        db_cron = (
-            db.query(ApplicationComponentModel.ApplicationComponent)
-            .options(
-                joinedload(ApplicationComponentModel.ApplicationComponent.instance)
-                .joinedload(InstanceModel.Instance.application),
-                joinedload(ApplicationComponentModel.ApplicationComponent.instances)
-                .joinedload(ClusterInstanceModel.ClusterInstance.cluster)
-            )
-            .filter(ApplicationComponentModel.ApplicationComponent.uuid == uuid)
-            .first()
+        cluster, application_name, _ = await run_in_threadpool(
+            close_after, db, CronService._get_cron_deployment, uuid
         )
+        k8s_client = get_async_k8s_client(cluster)
 
-        if db_cron is None:
-            raise HTTPException(status_code=404, detail="Cron not found")
-        if db_cron.type != ApplicationComponentModel.WebappType.cron:
-            raise HTTPException(
-                status_code=400,
-                detail="Component is not a cron"
-            )
-
-        # Buscar cluster_instance relacionado
-        cluster_instance = (
-            db.query(ClusterInstanceModel.ClusterInstance)
-            .filter(ClusterInstanceModel.ClusterInstance.application_component_id == db_cron.id)
-            .first()
-        )
-
-        if not cluster_instance:
-            raise HTTPException(
-                status_code=404,
-                detail="Cron is not deployed to any cluster"
-            )
-
-        cluster = cluster_instance.cluster
-        application_name = db_cron.instance.application.name
-
-        # Criar cliente Kubernetes
-        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-
-        # Deletar o job
-        k8s_client.delete_job(namespace=application_name, job_name=job_name)
+        await k8s_client.delete_job(namespace=application_name, job_name=job_name)
 
         return {"detail": f"Job '{job_name}' deleted successfully"}
 
@@ -585,14 +587,14 @@ class CronService:
                 component_type = db_cron.type.value if hasattr(db_cron.type, 'value') else str(db_cron.type)
 
                 # Gerar payload do Kubernetes
-                k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                k8s_client = get_k8s_client(cluster)
                 kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                     application_component_serialized, component_type, settings_serialized, db=db
                 )
 
                 # Deletar recursos no Kubernetes
-                k8s_client.apply_or_delete_yaml_to_k8s(
-                    kubernetes_payload, operation="delete"
+                apply_manifests(
+                    cluster, k8s_client, kubernetes_payload, operation="delete"
                 )
             except Exception as e:
                 # Se falhar ao deletar no Kubernetes, ainda deletamos o componente e cluster_instance do banco
@@ -1,4 +1,5 @@
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import delete
 from uuid import uuid4, UUID
@@ -11,8 +12,13 @@ import app.models.application_components as ApplicationComponentModel
 import app.models.cluster_instance as ClusterInstanceModel
 import app.models.settings as SettingsModel
 import app.schemas.instance as InstanceSchema
-from app.k8s.client import K8sClient
+from app.k8s import formatters
+from app.k8s.client import K8S_LIST_CHUNK_SIZE
+from app.k8s.registry import get_async_k8s_client, get_k8s_client
+from app.services.applied_manifest import apply_manifests
 from app.services.kubernetes.application_component_manager import KubernetesApplicationComponentManager
+from app.services.kubernetes.component_pods import get_namespace_usage_async
+from app.database import close_after
 from app.helpers.serializers import serialize_application_component, serialize_settings
 from app.services.cluster import get_gateway_reference_from_cluster
 
@@ -138,35 +144,30 @@ class InstanceService:
         )
         settings_serialized = serialize_settings(settings)
 
+        # Renderiza de uma vez os componentes implantados quando algum deles precisa ir ao Kubernetes
+        rendered_components = []
+        if enabled_changed or ((image_changed or version_changed) and db_instance.enabled):
+            rendered_components = InstanceService._render_instance_components(
+                db, components, settings_serialized
+            )
+
         # Se a instância foi desativada (enabled mudou de True para False), remover componentes do Kubernetes
         if enabled_changed and was_enabled and not will_be_enabled:
-            for component in components:
+            for component, cluster_instance, kubernetes_payload in rendered_components:
                 try:
-                    # Buscar cluster_instance associado
-                    cluster_instance = (
-                        db.query(ClusterInstanceModel.ClusterInstance)
-                        .filter(ClusterInstanceModel.ClusterInstance.application_component_id == component.id)
-                        .first()
-                    )
-
                     if cluster_instance:
+                        if isinstance(kubernetes_payload, Exception):
+                            raise kubernetes_payload
                         cluster = cluster_instance.cluster
-                        application_component_serialized = serialize_application_component(component)
-                        component_type = component.type.value if hasattr(component.type, 'value') else str(component.type)
 
                         # Deletar recursos do Kubernetes (mas manter no banco)
-                        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-                        application_name = application_component_serialized.get("application_name")
+                        k8s_client = get_k8s_client(cluster)
+                        application_name = component.instance.application.name
                         if application_name:
                             k8s_client.ensure_namespace_exists(application_name)
 
-                        gateway_reference = get_gateway_reference_from_cluster(cluster)
-                        kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
-                            application_component_serialized, component_type, settings_serialized, db=db,
-                            gateway_reference=gateway_reference
-                        )
-                        k8s_client.apply_or_delete_yaml_to_k8s(
-                            kubernetes_payload, operation="delete"
+                        apply_manifests(
+                            cluster, k8s_client, kubernetes_payload, operation="delete"
                         )
                 except Exception as e:
                     # Log do erro mas continua com outros componentes
@@ -174,33 +175,18 @@ class InstanceService:
 
         # Se a instância foi reativada (enabled mudou de False para True), reaplicar componentes no Kubernetes
         elif enabled_changed and not was_enabled and will_be_enabled:
-            for component in components:
+            for component, cluster_instance, kubernetes_payload in rendered_components:
                 try:
-                    # Buscar cluster_instance associado
-                    cluster_instance = (
-                        db.query(ClusterInstanceModel.ClusterInstance)
-                        .filter(ClusterInstanceModel.ClusterInstance.application_component_id == component.id)
-                        .first()
-                    )
-
                     if cluster_instance:
+                        if isinstance(kubernetes_payload, Exception):
+                            raise kubernetes_payload
                         cluster = cluster_instance.cluster
-                        application_component_serialized = serialize_application_component(component)
-                        component_type = component.type.value if hasattr(component.type, 'value') else str(component.type)
 
                         # Reaplicar recursos no Kubernetes
-                        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-                        application_name = application_component_serialized.get("application_name")
-                        if application_name:
-                            k8s_client.ensure_namespace_exists(application_name)
+                        k8s_client = get_k8s_client(cluster)
 
-                        gateway_reference = get_gateway_reference_from_cluster(cluster)
-                        kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
-                            application_component_serialized, component_type, settings_serialized, db=db,
-                            gateway_reference=gateway_reference
-                        )
-                        k8s_client.apply_or_delete_yaml_to_k8s(
-                            kubernetes_payload, operation="upsert"
+                        apply_manifests(
+                            cluster, k8s_client, kubernetes_payload, operation="apply"
                         )
                 except Exception as e:
                     # Log do erro mas continua com outros componentes
@@ -210,35 +196,18 @@ class InstanceService:
         # (só se a instância estiver habilitada)
         if (image_changed or version_changed) and db_instance.enabled:
             # Reaplicar cada componente no Kubernetes
-            for component in components:
+            for component, cluster_instance, kubernetes_payload in rendered_components:
                 try:
-                    # Buscar cluster_instance associado
-                    cluster_instance = (
-                        db.query(ClusterInstanceModel.ClusterInstance)
-                        .filter(ClusterInstanceModel.ClusterInstance.application_component_id == component.id)
-                        .first()
-                    )
-
                     if cluster_instance:
+                        if isinstance(kubernetes_payload, Exception):
+                            raise kubernetes_payload
                         cluster = cluster_instance.cluster
-                        application_component_serialized = serialize_application_component(component)
-                        component_type = component.type.value if hasattr(component.type, 'value') else str(component.type)
 
                         # Reaplicar recursos no Kubernetes com a nova imagem/versão
-                        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                        k8s_client = get_k8s_client(cluster)
 
-                        # Verificar e criar namespace com o nome da aplicação se não existir
-                        application_name = application_component_serialized.get("application_name")
-                        if application_name:
-                            k8s_client.ensure_namespace_exists(application_name)
-
-                        gateway_reference = get_gateway_reference_from_cluster(cluster)
-                        kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
-                            application_component_serialized, component_type, settings_serialized, db=db,
-                            gateway_reference=gateway_reference
-                        )
-                        k8s_client.apply_or_delete_yaml_to_k8s(
-                            kubernetes_payload, operation="upsert"
+                        apply_manifests(
+                            cluster, k8s_client, kubernetes_payload, operation="apply"
                         )
                 except Exception as e:
                     # Log do erro mas continua com a atualização da instância e outros componentes
@@ -275,10 +244,12 @@ class InstanceService:
         )
 
     @staticmethod
-    def get_instance_events(db: Session, uuid: UUID):
+    def _get_instance_deployment(db: Session, uuid: UUID):
         """
-        Busca os eventos do Kubernetes relacionados a uma instância.
-        Os eventos são buscados do namespace da aplicação.
+        Busca o cluster onde os componentes da instância estão implantados.
+
+        Returns:
+            Tupla (cluster, nome da aplicação/namespace)
         """
         # Buscar a instância com relacionamentos
         db_instance = (
@@ -315,16 +286,140 @@ class InstanceService:
                 detail="Instance components are not deployed to any cluster"
             )
 
-        cluster = cluster_instance.cluster
-        application_name = db_instance.application.name
+        return cluster_instance.cluster, db_instance.application.name
 
-        # Criar cliente Kubernetes
-        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+    @staticmethod
+    def _get_events_from_informer(cluster, application_name: str):
+        """
+        Lê os eventos do namespace do cache do informer, sem chamar o API server.
+        Retorna None se os informers estiverem desligados ou ainda não sincronizados.
+        """
+        store = get_k8s_client(cluster).informers.get_store("events", application_name)
+        if store is None:
+            return None
+
+        formatted_events = [formatters.format_event(event) for event in store.list_objects()]
+        # Ordenar por timestamp (mais recente primeiro)
+        formatted_events.sort(key=lambda x: x["age_seconds"], reverse=False)
+        return formatted_events
+
+    @staticmethod
+    async def get_instance_events_async(
+        db: Session,
+        uuid: UUID,
+        limit: int = None,
+        continue_token: str = None,
+        field_selector: str = None,
+        label_selector: str = None,
+    ):
+        """
+        Busca os eventos do Kubernetes do namespace da aplicação de uma instância.
+
+        Com `limit`, retorna apenas uma página (limit/continue do Kubernetes); os filtros são
+        aplicados pelo API server.
+
+        Returns:
+            Tupla (eventos, token da próxima página ou None)
+        """
+        cluster, application_name = await run_in_threadpool(
+            close_after, db, InstanceService._get_instance_deployment, uuid
+        )
+
+        paginated = limit is not None or continue_token is not None
+        if not paginated and not field_selector and not label_selector:
+            cached_events = InstanceService._get_events_from_informer(cluster, application_name)
+            if cached_events is not None:
+                return cached_events, None
+
+        k8s_client = get_async_k8s_client(cluster)
+
+        if paginated:
+            return await k8s_client.list_events_page(
+                namespace=application_name,
+                limit=limit or K8S_LIST_CHUNK_SIZE,
+                continue_token=continue_token,
+                field_selector=field_selector,
+                label_selector=label_selector,
+            )
+
+        events = await k8s_client.list_events(
+            namespace=application_name, field_selector=field_selector, label_selector=label_selector
+        )
+        return events, None
+
+    @staticmethod
+    def _get_instance_component_names(db: Session, uuid: UUID) -> list[str]:
+        rows = (
+            db.query(ApplicationComponentModel.ApplicationComponent.name)
+            .join(InstanceModel.Instance)
+            .filter(InstanceModel.Instance.uuid == uuid)
+            .order_by(ApplicationComponentModel.ApplicationComponent.name)
+            .all()
+        )
+        return [row.name for row in rows]
+
+    @staticmethod
+    def _get_instance_usage_target(db: Session, uuid: UUID):
+        cluster, application_name = InstanceService._get_instance_deployment(db, uuid)
+        return cluster, application_name, InstanceService._get_instance_component_names(db, uuid)
+
+    @staticmethod
+    async def get_instance_usage_async(db: Session, uuid: UUID):
+        """
+        Requests, limits e uso real de CPU/memória dos pods da instância, por componente e no total.
+        """
+        cluster, application_name, component_names = await run_in_threadpool(
+            close_after, db, InstanceService._get_instance_usage_target, uuid
+        )
+        return await get_namespace_usage_async(cluster, application_name, component_names)
+
+    @staticmethod
+    def _render_instance_components(db: Session, components: list, settings_serialized: dict) -> list:
+        """
+        Renderiza os componentes implantados da instância em lote (um render_components por
+        cluster), com o conjunto de templates e os settings do ambiente carregados uma vez.
 
-        # Listar eventos do namespace da aplicação
-        events = k8s_client.list_events(namespace=application_name)
+        Returns:
+            Lista (componente, cluster_instance, documentos) na ordem de `components`.
+            cluster_instance é None para componentes não implantados; no lugar dos
+            documentos vem a exceção do componente cuja renderização falhou
+        """
+        cluster_instances = {}
+        component_ids = [component.id for component in components]
+        if component_ids:
+            rows = (
+                db.query(ClusterInstanceModel.ClusterInstance)
+                .filter(ClusterInstanceModel.ClusterInstance.application_component_id.in_(component_ids))
+                .order_by(ClusterInstanceModel.ClusterInstance.id)
+                .all()
+            )
+            for cluster_instance in rows:
+                cluster_instances.setdefault(cluster_instance.application_component_id, cluster_instance)
 
-        return events
+        components_by_cluster = {}
+        for component in components:
+            cluster_instance = cluster_instances.get(component.id)
+            if cluster_instance:
+                components_by_cluster.setdefault(cluster_instance.cluster_id, []).append(component)
+
+        rendered = {}
+        for cluster_components in components_by_cluster.values():
+            cluster = cluster_instances[cluster_components[0].id].cluster
+            try:
+                rendered.update(KubernetesApplicationComponentManager.render_components(
+                    [serialize_application_component(component) for component in cluster_components],
+                    settings_serialized,
+                    db=db,
+                    gateway_reference=get_gateway_reference_from_cluster(cluster),
+                ))
+            except Exception as e:
+                for component in cluster_components:
+                    rendered[str(component.uuid)] = e
+
+        return [
+            (component, cluster_instances.get(component.id), rendered.get(str(component.uuid)))
+            for component in components
+        ]
 
     @staticmethod
     def sync_instance(db: Session, uuid: UUID):
@@ -382,27 +477,25 @@ class InstanceService:
             )
 
         cluster = cluster_instance.cluster
-        application_name = db_instance.application.name
 
         # Criar cliente Kubernetes
-        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-
-        # Verificar e criar namespace com o nome da aplicação se não existir
-        k8s_client.ensure_namespace_exists(application_name)
+        k8s_client = get_k8s_client(cluster)
 
         synced_count = 0
         errors = []
 
+        # Settings do environment (não do componente), os mesmos para todos os componentes
+        settings = (
+            db.query(SettingsModel.Settings)
+            .filter(SettingsModel.Settings.environment_id == db_instance.environment_id)
+            .all()
+        )
+        settings_serialized = serialize_settings(settings)
+        rendered_components = InstanceService._render_instance_components(db, components, settings_serialized)
+
         # Sincronizar cada componente
-        for component in components:
+        for component, component_cluster_instance, kubernetes_payload in rendered_components:
             try:
-                # Buscar cluster_instance associado ao componente
-                component_cluster_instance = (
-                    db.query(ClusterInstanceModel.ClusterInstance)
-                    .filter(ClusterInstanceModel.ClusterInstance.application_component_id == component.id)
-                    .first()
-                )
-
                 if not component_cluster_instance:
                     errors.append({
                         "component": component.name,
@@ -410,40 +503,20 @@ class InstanceService:
                     })
                     continue
 
-                # Serializar o componente para os templates
-                application_component_serialized = serialize_application_component(component)
-                component_type = component.type.value if hasattr(component.type, 'value') else str(component.type)
-
-                # Buscar settings do environment (não do componente)
-                instance = component.instance
-                settings = (
-                    db.query(SettingsModel.Settings)
-                    .filter(SettingsModel.Settings.environment_id == instance.environment_id)
-                    .all()
-                )
-                settings_serialized = serialize_settings(settings)
-
-                component_cluster = component_cluster_instance.cluster
-                gateway_reference = get_gateway_reference_from_cluster(component_cluster)
+                if isinstance(kubernetes_payload, Exception):
+                    raise kubernetes_payload
 
                 if component.enabled:
-                    # Reaplicar componente habilitado no Kubernetes
-                    kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
-                        application_component_serialized, component_type, settings_serialized, db=db,
-                        gateway_reference=gateway_reference
-                    )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="upsert"
+                    # Reaplicar componente habilitado no Kubernetes, reenviando todos os documentos
+                    # para corrigir objetos alterados ou removidos fora do Tron
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="apply", skip_unchanged=False
                     )
                     synced_count += 1
                 else:
                     # Remover componente desabilitado do Kubernetes
-                    kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
-                        application_component_serialized, component_type, settings_serialized, db=db,
-                        gateway_reference=gateway_reference
-                    )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="delete"
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="delete"
                     )
                     synced_count += 1
 
@@ -495,38 +568,28 @@ class InstanceService:
             .all()
         )
 
+        settings = (
+            db.query(SettingsModel.Settings)
+            .filter(SettingsModel.Settings.environment_id == db_instance.environment_id)
+            .all()
+        )
+        settings_serialized = serialize_settings(settings)
+        rendered_components = InstanceService._render_instance_components(db, components, settings_serialized)
+
         # Deletar cada componente e seus recursos do Kubernetes
         # IMPORTANTE: Precisamos deletar os componentes ANTES de deletar a instância
         # para evitar que o SQLAlchemy tente atualizar a foreign key para NULL
-        for component in components:
+        for component, cluster_instance, kubernetes_payload in rendered_components:
             try:
-                # Buscar cluster_instance associado
-                cluster_instance = (
-                    db.query(ClusterInstanceModel.ClusterInstance)
-                    .filter(ClusterInstanceModel.ClusterInstance.application_component_id == component.id)
-                    .first()
-                )
-
                 if cluster_instance:
+                    if isinstance(kubernetes_payload, Exception):
+                        raise kubernetes_payload
                     cluster = cluster_instance.cluster
-                    instance = component.instance
-                    settings = (
-                        db.query(SettingsModel.Settings)
-                        .filter(SettingsModel.Settings.environment_id == instance.environment_id)
-                        .all()
-                    )
-                    settings_serialized = serialize_settings(settings)
-
-                    application_component_serialized = serialize_application_component(component)
-                    component_type = component.type.value if hasattr(component.type, 'value') else str(component.type)
 
                     # Deletar recursos do Kubernetes
-                    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-                    k8s_client.ensure_namespace_exists(application_component_serialized.get("application_name"))
-                    kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
-                        application_component_serialized, component_type, settings_serialized, db=db
-                    )
-                    k8s_client.apply_or_delete_yaml_to_k8s(kubernetes_payload, operation="delete")
+                    k8s_client = get_k8s_client(cluster)
+                    k8s_client.ensure_namespace_exists(application_name)
+                    apply_manifests(cluster, k8s_client, kubernetes_payload, operation="delete")
 
                     # Deletar cluster_instance usando delete direto no banco
                     cluster_instance_id = cluster_instance.id
@@ -561,7 +624,7 @@ class InstanceService:
         # Deletar o namespace em todos os clusters do environment
         for cluster in clusters:
             try:
-                k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                k8s_client = get_k8s_client(cluster)
                 k8s_client.delete_namespace(application_name)
             except Exception as e:
                 # Log do erro mas continua com a deleção em outros clusters
@@ -1,9 +1,51 @@
+import multiprocessing
+import os
+import threading
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
-from jinja2 import Environment, BaseLoader
 from sqlalchemy.orm import Session
 
+import app.models.component_template_config as ComponentTemplateConfigModel
+from app.database import SessionLocal
+from app.k8s.apply import stamp_component_labels
 from app.services.component_template_config import ComponentTemplateConfigService
+from app.services.kubernetes.manifest_cache import manifest_cache, render_key
+from app.services.kubernetes.template_cache import template_cache
+
+
+# Processos usados por render_components para renderizar vários componentes em paralelo
+# (Jinja e yaml.safe_load são CPU-bound e não escalam com threads); 0 renderiza no próprio worker
+TEMPLATE_RENDER_PROCESSES = int(os.getenv("TEMPLATE_RENDER_PROCESSES", "0"))
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> ProcessPoolExecutor | None:
+    """Pool de processos de renderização, criado no primeiro uso (None se desligado)."""
+    global _render_pool
+    if TEMPLATE_RENDER_PROCESSES <= 0:
+        return None
+    with _render_pool_lock:
+        if _render_pool is None:
+            # spawn: fork de um processo com threads (uvicorn, informers) não é seguro
+            _render_pool = ProcessPoolExecutor(
+                max_workers=TEMPLATE_RENDER_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _render_pool
+
+
+def shutdown_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None
+
+
+def _render_in_process(templates, variables: dict, component_uuid: Optional[str] = None) -> list:
+    return KubernetesApplicationComponentManager._render_templates(templates, variables, component_uuid)
 
 
 class KubernetesApplicationComponentManager:
@@ -40,6 +82,121 @@ class KubernetesApplicationComponentManager:
         if db is None:
             raise ValueError("Database session is required")
 
+        templates = KubernetesApplicationComponentManager._get_templates(db, component_type)
+        variables = KubernetesApplicationComponentManager._build_variables(
+            application_component, settings, gateway_reference
+        )
+
+        # Mesmas entradas (templates, componente, ambiente e gateway) produzem os mesmos documentos
+        cache_key = render_key(component_type, templates, variables)
+        if cache_key is not None:
+            cached_payloads = manifest_cache.get(cache_key)
+            if cached_payloads is not None:
+                return cached_payloads
+
+        combined_payloads = KubernetesApplicationComponentManager._render_templates(
+            templates, variables, application_component.get("component_uuid")
+        )
+
+        if cache_key is not None:
+            manifest_cache.set(cache_key, combined_payloads)
+        return combined_payloads
+
+    @staticmethod
+    def render_components(
+        application_components: list[dict],
+        settings: Optional[dict] = None,
+        db: Optional[Session] = None,
+        gateway_reference: Optional[dict] = None
+    ) -> dict:
+        """
+        Renderiza vários componentes que compartilham o ambiente (e o cluster), buscando o
+        conjunto de templates de cada tipo uma única vez. Renderizações que não estão no cache
+        rodam em paralelo no pool de processos quando TEMPLATE_RENDER_PROCESSES > 0.
+
+        Args:
+            application_components: Componentes serializados (serialize_application_component)
+            settings: Dict opcional com configurações do ambiente
+            db: Sessão do banco de dados (obrigatória)
+            gateway_reference: Dict opcional com informações do gateway (namespace, name)
+
+        Returns:
+            Dict component_uuid -> lista de documentos renderizados, ou a exceção
+            (ValueError) do componente que falhou; um erro não interrompe os demais
+        """
+        if db is None:
+            raise ValueError("Database session is required")
+
+        results = {}
+        templates_by_type = {}
+        pending = []
+
+        for application_component in application_components:
+            component_uuid = application_component.get("component_uuid")
+            component_type = application_component.get("component_type")
+            try:
+                if component_type not in templates_by_type:
+                    templates_by_type[component_type] = KubernetesApplicationComponentManager._get_templates(
+                        db, component_type
+                    )
+                templates = templates_by_type[component_type]
+            except ValueError as e:
+                results[component_uuid] = e
+                continue
+
+            variables = KubernetesApplicationComponentManager._build_variables(
+                application_component, settings, gateway_reference
+            )
+            cache_key = render_key(component_type, templates, variables)
+            cached_payloads = manifest_cache.get(cache_key) if cache_key is not None else None
+            if cached_payloads is not None:
+                results[component_uuid] = cached_payloads
+            else:
+                pending.append((component_uuid, cache_key, templates, variables))
+
+        pool = get_render_pool() if len(pending) > 1 else None
+        if pool is not None:
+            futures = [
+                pool.submit(_render_in_process, templates, variables, component_uuid)
+                for component_uuid, _, templates, variables in pending
+            ]
+        for index, (component_uuid, cache_key, templates, variables) in enumerate(pending):
+            try:
+                if pool is not None:
+                    payloads = futures[index].result()
+                else:
+                    payloads = KubernetesApplicationComponentManager._render_templates(
+                        templates, variables, component_uuid
+                    )
+            except Exception as e:
+                results[component_uuid] = e if isinstance(e, ValueError) else ValueError(str(e))
+                continue
+
+            if cache_key is not None:
+                manifest_cache.set(cache_key, payloads)
+            results[component_uuid] = payloads
+
+        return results
+
+    @staticmethod
+    def _get_templates(db: Session, component_type: str):
+        # Buscar templates configurados para o tipo de componente
+        # Os templates já vêm ordenados por render_order
+        templates = ComponentTemplateConfigService.get_templates_for_component(db, component_type)
+
+        if not templates:
+            raise ValueError(
+                f"No templates configured for component type '{component_type}'. "
+                "Please configure templates in the Component Template Config section."
+            )
+        return templates
+
+    @staticmethod
+    def _build_variables(
+        application_component: dict,
+        settings: Optional[dict] = None,
+        gateway_reference: Optional[dict] = None
+    ) -> dict:
         if settings is None:
             settings = {}
 
@@ -51,7 +208,7 @@ class KubernetesApplicationComponentManager:
             }
 
         # Preparar variáveis para os templates
-        variables = {
+        return {
             "application": application_component,
             "environment": settings,
             "cluster": {
@@ -61,26 +218,21 @@ class KubernetesApplicationComponentManager:
             }
         }
 
-        # Buscar templates configurados para o tipo de componente
-        # Os templates já vêm ordenados por render_order
-        templates = ComponentTemplateConfigService.get_templates_for_component(db, component_type)
-
-        if not templates:
-            raise ValueError(
-                f"No templates configured for component type '{component_type}'. "
-                "Please configure templates in the Component Template Config section."
-            )
-
+    @staticmethod
+    def _render_templates(templates, variables: dict, component_uuid: Optional[str] = None) -> list:
         combined_payloads = []
 
         # Renderizar cada template na ordem configurada
         for template in templates:
             try:
                 rendered_yaml = KubernetesApplicationComponentManager.render_template_from_string(
-                    template.content, variables
+                    template.content, variables, template_id=template.id
                 )
                 # Filtrar documentos None (quando template não renderiza nada devido a condições)
                 if rendered_yaml is not None:
+                    # Todos os objetos recebem as labels managed-by/component-uuid (usadas no prune de órfãos)
+                    if component_uuid and isinstance(rendered_yaml, dict) and rendered_yaml.get("metadata"):
+                        rendered_yaml = stamp_component_labels(rendered_yaml, component_uuid)
                     combined_payloads.append(rendered_yaml)
             except Exception as e:
                 raise ValueError(
@@ -90,13 +242,42 @@ class KubernetesApplicationComponentManager:
         return combined_payloads
 
     @staticmethod
-    def render_template_from_string(template_content: str, variables: dict):
+    def prewarm_templates(db: Session) -> int:
+        """
+        Carrega o conjunto de templates de cada tipo de componente configurado e compila
+        todos os templates habilitados, para que a primeira renderização não pague a compilação.
+
+        Returns:
+            Quantidade de templates compilados
+        """
+        component_types = [
+            row.component_type
+            for row in db.query(ComponentTemplateConfigModel.ComponentTemplateConfig.component_type)
+            .filter(ComponentTemplateConfigModel.ComponentTemplateConfig.enabled == "true")
+            .distinct()
+            .all()
+        ]
+
+        compiled = 0
+        for component_type in component_types:
+            for template in ComponentTemplateConfigService.get_templates_for_component(db, component_type):
+                try:
+                    template_cache.get_template(template.content, template.id)
+                    compiled += 1
+                except Exception as e:
+                    print(f"Warning: Could not compile template '{template.name}': {e}")
+        return compiled
+
+    @staticmethod
+    def render_template_from_string(template_content: str, variables: dict, template_id: Optional[int] = None):
         """
         Renderiza um template Jinja2 a partir de uma string.
+        A compilação é reaproveitada entre renderizações (ver template_cache).
 
         Args:
             template_content: Conteúdo do template Jinja2
             variables: Dicionário com variáveis para renderização
+            template_id: ID do template no banco, se houver (chave do cache junto com o conteúdo)
 
         Returns:
             Dicionário Python representando o YAML renderizado
@@ -105,10 +286,8 @@ class KubernetesApplicationComponentManager:
             FileNotFoundError: Se houver erro na criação do template
             ValueError: Se houver erro no parsing do YAML
         """
-        env = Environment(loader=BaseLoader())
-
         try:
-            template = env.from_string(template_content)
+            template = template_cache.get_template(template_content, template_id)
         except Exception as e:
             raise FileNotFoundError(f"Template rendering error: {e}")
 
@@ -129,3 +308,15 @@ class KubernetesApplicationComponentManager:
                 logger = logging.getLogger(__name__)
                 logger.error(f"HTTPRoute YAML parsing error: {e}. Rendered content:\n{rendered_yaml[:500]}")
             raise ValueError(f"Error parsing YAML template: {e}")
+
+
+def prewarm_template_caches():
+    """Pré-aquecimento dos caches de templates na inicialização do worker (ver app.main)."""
+    db = SessionLocal()
+    try:
+        compiled = KubernetesApplicationComponentManager.prewarm_templates(db)
+        print(f"Prewarmed {compiled} templates")
+    except Exception as e:
+        print(f"Warning: Error prewarming templates: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,78 @@
+from app.k8s import formatters, usage
+from app.k8s.registry import get_async_k8s_client, get_k8s_client
+
+
+def _filter_component_pods(raw_pods: list[dict], component_name: str) -> list[dict]:
+    """Pods com a label app=<componente>; na falta deles, os pods cujo nome contém o componente."""
+    pods = [
+        pod for pod in raw_pods
+        if ((pod.get("metadata") or {}).get("labels") or {}).get("app") == component_name
+    ]
+    if not pods:
+        pods = [pod for pod in raw_pods if component_name in (pod.get("metadata") or {}).get("name", "")]
+    return pods
+
+
+def _get_pods_from_informer(cluster, namespace: str, component_name: str):
+    """
+    Lê os pods do componente do cache do informer, sem chamar o API server.
+    Retorna None se os informers estiverem desligados ou ainda não sincronizados.
+    """
+    store = get_k8s_client(cluster).informers.get_store("pods", namespace)
+    if store is None:
+        return None
+
+    pods = store.by_index("app", component_name)
+    if not pods:
+        pods = [pod for pod in store.list_objects() if component_name in pod["metadata"]["name"]]
+    return [formatters.format_pod(pod) for pod in pods]
+
+
+async def get_component_pods_async(cluster, namespace: str, component_name: str) -> list[dict]:
+    """
+    Lista os pods de um componente (webapp ou worker) com o uso real de CPU e memória
+    do metrics-server (cpu_usage/memory_usage, None quando indisponível).
+    """
+    k8s_client = get_async_k8s_client(cluster)
+
+    pods = _get_pods_from_informer(cluster, namespace, component_name)
+    if pods is None:
+        pods = await k8s_client.list_pods(namespace=namespace, label_selector=f"app={component_name}")
+
+        # Se não encontrar com esse seletor, tentar sem seletor e filtrar depois
+        if not pods:
+            all_pods = await k8s_client.list_pods(namespace=namespace)
+            pods = [pod for pod in all_pods if component_name in pod['name']]
+
+    return usage.merge_pod_usage(pods, await k8s_client.get_pod_usage(namespace))
+
+
+async def get_namespace_usage_async(cluster, namespace: str, component_names: list[str]) -> dict:
+    """
+    Agrega requests, limits e uso real dos pods de cada componente de um namespace, com uma
+    única listagem de pods e uma de PodMetrics.
+
+    Returns:
+        Dict com "components" (uso por componente), "total" e "metrics_available"
+    """
+    k8s_client = get_async_k8s_client(cluster)
+
+    store = get_k8s_client(cluster).informers.get_store("pods", namespace)
+    raw_pods = store.list_objects() if store is not None else await k8s_client.list_raw_pods(namespace)
+    pod_usage = await k8s_client.get_pod_usage(namespace)
+
+    components = []
+    all_pods = []
+    for component_name in component_names:
+        pods = [formatters.format_pod(pod) for pod in _filter_component_pods(raw_pods, component_name)]
+        usage.merge_pod_usage(pods, pod_usage)
+        all_pods.extend(pods)
+        components.append({"name": component_name, **usage.aggregate_usage(pods)})
+
+    # Um pod encontrado pelo nome em mais de um componente entra uma única vez no total
+    unique_pods = list({pod["name"]: pod for pod in all_pods}.values())
+    return {
+        "components": components,
+        "total": usage.aggregate_usage(unique_pods),
+        "metrics_available": bool(pod_usage),
+    }
@@ -0,0 +1,94 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from app.services.kubernetes.template_cache import content_hash
+
+
+# Quantidade máxima de renderizações (lista de documentos de um componente) mantidas por worker
+RENDERED_MANIFEST_CACHE_SIZE = int(os.getenv("RENDERED_MANIFEST_CACHE_SIZE", "512"))
+
+
+def render_key(component_type: str, templates: list, variables: dict) -> str | None:
+    """
+    Hash estável das entradas de uma renderização: conjunto de templates (id e hash do
+    conteúdo, na ordem de renderização) e variáveis (componente serializado, settings do
+    ambiente e referência do gateway). Retorna None se as variáveis não forem serializáveis.
+    """
+    try:
+        payload = json.dumps(
+            {
+                "component_type": component_type,
+                "templates": [[template.id, content_hash(template.content)] for template in templates],
+                "variables": variables,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderedManifestCache:
+    """
+    LRU dos manifestos já renderizados e parseados, por render_key. Diff, sync, delete e
+    reativação do mesmo componente reaproveitam a renderização em vez de rodar Jinja e
+    yaml.safe_load de novo. Os documentos são copiados na entrada e na saída: quem chama
+    pode alterá-los sem afetar o cache.
+    """
+
+    def __init__(self, max_size: int = RENDERED_MANIFEST_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> list[dict] | None:
+        with self._lock:
+            documents = self._entries.get(key)
+            if documents is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(documents)
+
+    def set(self, key: str, documents: list[dict]):
+        documents = copy.deepcopy(documents)
+        with self._lock:
+            self._entries[key] = documents
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def render(self) -> str:
+        """Exporta hits, misses e tamanho do cache no formato texto do Prometheus."""
+        stats = self.stats()
+        return "\n".join([
+            "# HELP tron_rendered_manifest_cache_hits_total Component renders served from memory.",
+            "# TYPE tron_rendered_manifest_cache_hits_total counter",
+            f"tron_rendered_manifest_cache_hits_total {stats['hits']}",
+            "# HELP tron_rendered_manifest_cache_misses_total Component renders that ran the templates.",
+            "# TYPE tron_rendered_manifest_cache_misses_total counter",
+            f"tron_rendered_manifest_cache_misses_total {stats['misses']}",
+            "# HELP tron_rendered_manifest_cache_entries Rendered components kept in memory.",
+            "# TYPE tron_rendered_manifest_cache_entries gauge",
+            f"tron_rendered_manifest_cache_entries {stats['entries']}",
+        ]) + "\n"
+
+
+manifest_cache = RenderedManifestCache()
@@ -0,0 +1,64 @@
+from fastapi import WebSocket
+from starlette.websockets import WebSocketDisconnect, WebSocketState
+
+from app.database import SessionLocal, close_after
+from app.dependencies.auth import websocket_subprotocol
+from app.k8s.registry import get_async_k8s_client
+
+
+# Códigos de fechamento do WebSocket do cliente
+WS_CLOSE_NORMAL = 1000
+WS_CLOSE_POLICY_VIOLATION = 1008
+WS_CLOSE_INTERNAL_ERROR = 1011
+
+
+def load_deployment(get_deployment, uuid):
+    """
+    Executa a busca do cluster/namespace de um componente (ex: WebappService._get_webapp_deployment)
+    em uma sessão própria, fechada antes do proxy do exec começar: uma sessão interativa
+    não pode manter uma conexão do pool do banco ocupada.
+    """
+    return close_after(SessionLocal(), get_deployment, uuid)
+
+
+async def run_exec_session(
+    websocket: WebSocket,
+    cluster,
+    namespace: str,
+    pod_name: str,
+    command: list[str],
+    container_name: str = None,
+    tty: bool = False,
+):
+    """
+    Aceita o WebSocket do cliente e faz o proxy do exec do pod até o comando terminar
+    ou o cliente desconectar. Ao final envia {"type": "exit", "code": N} com o exit code
+    real; falhas de conexão com o pod são enviadas como {"type": "error", "message": ...}.
+    """
+    await websocket.accept(subprotocol=websocket_subprotocol(websocket))
+    k8s_client = get_async_k8s_client(cluster)
+
+    try:
+        return_code = await k8s_client.exec_session(
+            websocket,
+            namespace=namespace,
+            pod_name=pod_name,
+            command=command,
+            container_name=container_name,
+            tty=tty,
+        )
+    except WebSocketDisconnect:
+        return
+    except Exception as e:
+        status_code = getattr(getattr(e, "response", None), "status_code", None)
+        message = f"Pod {pod_name} not found" if status_code == 404 else f"Failed to execute command: {str(e)}"
+        print(f"Erro ao executar comando no pod {pod_name}: {e}")
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.send_json({"type": "error", "message": message})
+            await websocket.close(code=WS_CLOSE_INTERNAL_ERROR)
+        return
+
+    # None: o cliente desconectou antes do comando terminar
+    if return_code is not None and websocket.client_state == WebSocketState.CONNECTED:
+        await websocket.send_json({"type": "exit", "code": return_code})
+        await websocket.close(code=WS_CLOSE_NORMAL)
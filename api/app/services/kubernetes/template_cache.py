@@ -0,0 +1,142 @@
+import hashlib
+import os
+import stat
+import tempfile
+import threading
+from collections import OrderedDict
+
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, Template
+
+
+# Quantidade máxima de templates compilados mantidos em memória por worker
+TEMPLATE_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", "256"))
+# Diretório do bytecode compilado, compartilhado pelos workers do nó (vazio desliga).
+# Precisa pertencer ao usuário da API com modo 0700 (ver _create_bytecode_cache)
+TEMPLATE_BYTECODE_CACHE_DIR = os.getenv(
+    "TEMPLATE_BYTECODE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "tron-template-bytecode")
+)
+
+
+def _create_bytecode_cache(directory: str) -> FileSystemBytecodeCache | None:
+    """
+    Cache de bytecode em `directory`, criado com modo 0700. O bytecode é carregado com
+    marshal (execução de código): o diretório só é usado se for um diretório real (não
+    symlink), do usuário do processo e sem permissão para grupo/outros.
+    """
+    if not directory:
+        return None
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        info = os.lstat(directory)
+    except OSError as e:
+        print(f"Warning: Template bytecode cache disabled, could not create '{directory}': {e}")
+        return None
+
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        print(
+            f"Warning: Template bytecode cache disabled, '{directory}' must be a directory "
+            "owned by the API user with mode 0700"
+        )
+        return None
+    return FileSystemBytecodeCache(directory)
+
+
+# Environment compartilhado por todas as renderizações (thread-safe para render)
+environment = Environment(
+    loader=BaseLoader(), bytecode_cache=_create_bytecode_cache(TEMPLATE_BYTECODE_CACHE_DIR)
+)
+
+
+def content_hash(template_content: str) -> str:
+    return hashlib.sha256(template_content.encode("utf-8")).hexdigest()
+
+
+def compile_template(template_content: str) -> Template:
+    """
+    Compila o template, reaproveitando o bytecode em disco gravado por qualquer worker
+    (ou por uma execução anterior) para o mesmo conteúdo.
+    """
+    bytecode_cache = environment.bytecode_cache
+    if bytecode_cache is None:
+        return environment.from_string(template_content)
+
+    # O nome do bucket é o hash do conteúdo; o próprio bucket valida o checksum e a versão do Python
+    bucket = bytecode_cache.get_bucket(environment, content_hash(template_content), None, template_content)
+    code = bucket.code
+    if code is None:
+        code = environment.compile(template_content)
+        bucket.code = code
+        try:
+            bytecode_cache.set_bucket(bucket)
+        except OSError as e:
+            print(f"Warning: Could not write template bytecode: {e}")
+    return environment.template_class.from_code(environment, code, environment.make_globals(None))
+
+
+class CompiledTemplateCache:
+    """
+    LRU de templates Jinja2 já compilados, por (id do template, hash do conteúdo).
+
+    O hash do conteúdo faz parte da chave: uma versão editada em outro worker nunca
+    reaproveita a compilação antiga, mesmo sem invalidação explícita. A invalidação
+    (ver TemplateService) apenas libera as entradas que não serão mais usadas.
+    """
+
+    def __init__(self, max_size: int = TEMPLATE_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_template(self, template_content: str, template_id: int = None) -> Template:
+        """Retorna o template compilado, compilando-o na primeira vez."""
+        key = (template_id, content_hash(template_content))
+        with self._lock:
+            template = self._entries.get(key)
+            if template is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return template
+            self.misses += 1
+
+        # Compilação fora do lock; duas threads podem compilar o mesmo template, sem efeito colateral
+        template = compile_template(template_content)
+
+        with self._lock:
+            self._entries[key] = template
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return template
+
+    def invalidate(self, template_id: int = None):
+        """Descarta as compilações de um template (ou de todos, se template_id for None)."""
+        with self._lock:
+            if template_id is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == template_id]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def render(self) -> str:
+        """Exporta hits, misses e tamanho do cache no formato texto do Prometheus."""
+        stats = self.stats()
+        return "\n".join([
+            "# HELP tron_template_cache_hits_total Renders that reused a compiled template.",
+            "# TYPE tron_template_cache_hits_total counter",
+            f"tron_template_cache_hits_total {stats['hits']}",
+            "# HELP tron_template_cache_misses_total Renders that had to compile the template.",
+            "# TYPE tron_template_cache_misses_total counter",
+            f"tron_template_cache_misses_total {stats['misses']}",
+            "# HELP tron_template_cache_entries Compiled templates kept in memory.",
+            "# TYPE tron_template_cache_entries gauge",
+            f"tron_template_cache_entries {stats['entries']}",
+        ]) + "\n"
+
+
+template_cache = CompiledTemplateCache()
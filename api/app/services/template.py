@@ -2,6 +2,8 @@ from fastapi import HTTPException
 import app.models.template as TemplateModel
 import app.models.component_template_config as ComponentTemplateConfigModel
 import app.schemas.template as TemplateSchema
+from app.services.kubernetes.template_cache import template_cache
+from app.services.template_set_cache import bump_template_set_version
 from sqlalchemy.orm import Session
 from uuid import uuid4
 from uuid import UUID
@@ -22,8 +24,10 @@ class TemplateService:
                 db_template.description = template.description
                 db_template.content = template.content
                 db_template.variables_schema = template.variables_schema
+                bump_template_set_version(db)
                 db.commit()
                 db.refresh(db_template)
+                template_cache.invalidate(db_template.id)
                 return db_template
 
         new_template = TemplateModel.Template(
@@ -35,6 +39,7 @@ class TemplateService:
             variables_schema=template.variables_schema,
         )
         db.add(new_template)
+        bump_template_set_version(db)
 
         try:
             db.commit()
@@ -65,6 +70,7 @@ class TemplateService:
             db_template.content = template_update.content
         if template_update.variables_schema is not None:
             db_template.variables_schema = template_update.variables_schema
+        bump_template_set_version(db)
 
         try:
             db.commit()
@@ -74,6 +80,7 @@ class TemplateService:
             message = {"status": "error", "message": f"{e}"}
             raise HTTPException(status_code=400, detail=message)
 
+        template_cache.invalidate(db_template.id)
         return db_template
 
     def get_template(db: Session, template_uuid: UUID):
@@ -117,13 +124,17 @@ class TemplateService:
                 message = {"status": "error", "message": f"Failed to delete associated configurations: {e}"}
                 raise HTTPException(status_code=400, detail=message)
 
+        template_id = db_template.id
         try:
             db.delete(db_template)
+            bump_template_set_version(db)
             db.commit()
         except Exception as e:
             db.rollback()
             message = {"status": "error", "message": f"{e}"}
             raise HTTPException(status_code=400, detail=message)
 
+        template_cache.invalidate(template_id)
+
         return {"status": "success", "message": "Template deleted successfully"}
 
@@ -0,0 +1,97 @@
+import threading
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.cache_version import CacheVersion
+
+
+# Nome da linha em cache_versions que versiona templates e component_template_configs
+TEMPLATE_SETS_CACHE = "template_sets"
+
+
+class CachedTemplate(NamedTuple):
+    """Cópia dos campos de um Template usados na renderização, desligada da sessão."""
+
+    id: int
+    uuid: UUID
+    name: str
+    category: str
+    content: str
+
+
+def get_template_set_version(db: Session) -> int:
+    version = (
+        db.query(CacheVersion.version)
+        .filter(CacheVersion.name == TEMPLATE_SETS_CACHE)
+        .scalar()
+    )
+    return version or 0
+
+
+def bump_template_set_version(db: Session):
+    """
+    Incrementa a versão dos conjuntos de templates. Deve ser chamado antes do commit
+    da escrita, para que a nova versão e os dados alterados fiquem visíveis juntos.
+
+    Upsert (INSERT ... ON CONFLICT DO UPDATE): bancos criados por create_all não têm a
+    linha semeada pela migration, e o primeiro incremento concorrente não pode falhar.
+    """
+    table = CacheVersion.__table__
+    insert = sqlite_insert if db.get_bind().dialect.name == "sqlite" else postgresql_insert
+    statement = insert(table).values(name=TEMPLATE_SETS_CACHE, version=1)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={"version": table.c.version + 1, "updated_at": func.now()},
+    ))
+
+
+class TemplateSetCache:
+    """
+    Templates habilitados de cada tipo de componente, em ordem de renderização, guardados
+    junto com a versão de cache_versions lida antes da consulta. Cada uso custa apenas a
+    leitura da versão; o conjunto é recarregado quando ela muda (escrita em qualquer worker).
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, component_type: str, load) -> list[CachedTemplate]:
+        """
+        Args:
+            db: Sessão do banco de dados
+            component_type: Tipo do componente (webapp, worker, cron)
+            load: Função (db, component_type) -> lista de Templates, chamada quando o cache está desatualizado
+        """
+        version = get_template_set_version(db)
+        with self._lock:
+            entry = self._entries.get(component_type)
+        if entry is not None and entry[0] == version:
+            return list(entry[1])
+
+        # A versão é lida antes da consulta: uma escrita concorrente só faz a próxima leitura recarregar
+        templates = [
+            CachedTemplate(
+                id=template.id,
+                uuid=template.uuid,
+                name=template.name,
+                category=template.category,
+                content=template.content,
+            )
+            for template in load(db, component_type)
+        ]
+        with self._lock:
+            self._entries[component_type] = (version, templates)
+        return list(templates)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+template_set_cache = TemplateSetCache()
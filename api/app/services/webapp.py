@@ -1,4 +1,6 @@
-from fastapi import HTTPException
+from fastapi import HTTPException, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from uuid import uuid4
 from uuid import UUID
@@ -8,11 +10,15 @@ import app.models.instance as InstanceModel
 import app.models.cluster_instance as ClusterInstanceModel
 import app.models.settings as SettingsModel
 import app.schemas.webapp as WebappSchema
+from app.database import close_after
 from app.helpers.serializers import serialize_application_component, serialize_settings
-from app.k8s.client import K8sClient
+from app.k8s.registry import get_async_k8s_client, get_k8s_client
+from app.services.applied_manifest import apply_manifests
 from app.services.kubernetes.application_component_manager import (
     KubernetesApplicationComponentManager,
 )
+from app.services.kubernetes.component_pods import get_component_pods_async
+from app.services.kubernetes.pod_exec import WS_CLOSE_POLICY_VIOLATION, load_deployment, run_exec_session
 from app.services.cluster_selection import ClusterSelectionService
 from app.services.cluster import get_gateway_reference_from_cluster
 
@@ -41,7 +47,7 @@ def validate_exposure_type_in_gateway_resources(cluster, exposure_type: str):
         return
 
     # Verificar Gateway API e recursos disponíveis
-    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+    k8s_client = get_k8s_client(cluster)
     gateway_api_available = k8s_client.check_api_available("gateway.networking.k8s.io")
 
     if not gateway_api_available:
@@ -138,7 +144,7 @@ class WebappService:
                             temp_cluster = temp_cluster_instance.cluster
 
                         # Verificar se o cluster tem gateway_api disponível
-                        k8s_client_temp = K8sClient(url=temp_cluster.api_address, token=temp_cluster.token)
+                        k8s_client_temp = get_k8s_client(temp_cluster)
                         gateway_api_available = k8s_client_temp.check_api_available("gateway.networking.k8s.io")
 
                         if not gateway_api_available:
@@ -234,7 +240,7 @@ class WebappService:
             # Se o componente foi desativado (enabled mudou de True para False), remover do Kubernetes
             if enabled_changed and was_enabled and not will_be_enabled:
                 try:
-                    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                    k8s_client = get_k8s_client(cluster)
                     application_name = application_component_serialized.get("application_name")
                     if application_name:
                         k8s_client.ensure_namespace_exists(application_name)
@@ -244,8 +250,8 @@ class WebappService:
                         application_component_serialized, component_type, settings_serialized, db=db,
                         gateway_reference=gateway_reference
                     )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="delete"
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="delete"
                     )
 
                     db.commit()
@@ -263,18 +269,15 @@ class WebappService:
             # Se o componente foi reativado (enabled mudou de False para True), reaplicar no Kubernetes
             elif enabled_changed and not was_enabled and will_be_enabled:
                 try:
-                    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-                    application_name = application_component_serialized.get("application_name")
-                    if application_name:
-                        k8s_client.ensure_namespace_exists(application_name)
+                    k8s_client = get_k8s_client(cluster)
 
                     gateway_reference = get_gateway_reference_from_cluster(cluster)
                     kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                         application_component_serialized, component_type, settings_serialized, db=db,
                         gateway_reference=gateway_reference
                     )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="upsert"
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="apply"
                     )
 
                     db.commit()
@@ -291,20 +294,15 @@ class WebappService:
             # Se não houve mudança no enabled ou se está habilitado, aplicar normalmente
             elif not enabled_changed or db_webapp.enabled:
                 try:
-                    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-
-                    # Verificar e criar namespace com o nome da aplicação se não existir
-                    application_name = application_component_serialized.get("application_name")
-                    if application_name:
-                        k8s_client.ensure_namespace_exists(application_name)
+                    k8s_client = get_k8s_client(cluster)
 
                     gateway_reference = get_gateway_reference_from_cluster(cluster)
                     kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                         application_component_serialized, component_type, settings_serialized, db=db,
                         gateway_reference=gateway_reference
                     )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="upsert"
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="apply"
                     )
 
                     db.commit()
@@ -383,7 +381,7 @@ class WebappService:
                         )
 
                     # Verificar se o cluster tem gateway_api disponível
-                    k8s_client_temp = K8sClient(url=cluster.api_address, token=cluster.token)
+                    k8s_client_temp = get_k8s_client(cluster)
                     gateway_api_available = k8s_client_temp.check_api_available("gateway.networking.k8s.io")
 
                     if not gateway_api_available:
@@ -465,7 +463,7 @@ class WebappService:
 
             # Aplicar recursos no Kubernetes
             try:
-                k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                k8s_client = get_k8s_client(cluster)
 
                 # Verificar e criar namespace com o nome da aplicação se não existir
                 application_name = application_component_serialized.get("application_name")
@@ -477,8 +475,8 @@ class WebappService:
                     application_component_serialized, component_type, settings_serialized, db=db,
                     gateway_reference=gateway_reference
                 )
-                k8s_client.apply_or_delete_yaml_to_k8s(
-                    kubernetes_payload, operation="create"
+                apply_manifests(
+                    cluster, k8s_client, kubernetes_payload, operation="create"
                 )
 
                 # Commit do cluster_instance e do componente
@@ -581,7 +579,7 @@ class WebappService:
                 component_type = db_webapp.type.value if hasattr(db_webapp.type, 'value') else str(db_webapp.type)
 
                 # Gerar payload do Kubernetes
-                k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                k8s_client = get_k8s_client(cluster)
                 gateway_reference = get_gateway_reference_from_cluster(cluster)
                 kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                     application_component_serialized, component_type, settings_serialized, db=db,
@@ -589,8 +587,8 @@ class WebappService:
                 )
 
                 # Deletar recursos no Kubernetes
-                k8s_client.apply_or_delete_yaml_to_k8s(
-                    kubernetes_payload, operation="delete"
+                apply_manifests(
+                    cluster, k8s_client, kubernetes_payload, operation="delete"
                 )
             except Exception as e:
                 # Se falhar ao deletar no Kubernetes, ainda deletamos o componente e cluster_instance do banco
@@ -611,9 +609,12 @@ class WebappService:
         return {"detail": "Webapp deleted successfully"}
 
     @staticmethod
-    def get_webapp_pods(db: Session, uuid: UUID):
+    def _get_webapp_deployment(db: Session, uuid: UUID):
         """
-        Busca os pods do Kubernetes relacionados a um webapp.
+        Busca o cluster onde o webapp está implantado.
+
+        Returns:
+            Tupla (cluster, nome da aplicação/namespace, nome do componente)
         """
         # Buscar o componente com relacionamentos
         db_webapp = (
@@ -621,8 +622,6 @@ class WebappService:
             .options(
                 joinedload(ApplicationComponentModel.ApplicationComponent.instance)
                 .joinedload(InstanceModel.Instance.application),
-                joinedload(ApplicationComponentModel.ApplicationComponent.instance)
-                .joinedload(InstanceModel.Instance.environment),
                 joinedload(ApplicationComponentModel.ApplicationComponent.instances)
                 .joinedload(ClusterInstanceModel.ClusterInstance.cluster)
             )
@@ -651,74 +650,30 @@ class WebappService:
                 detail="Webapp is not deployed to any cluster"
             )
 
-        cluster = cluster_instance.cluster
-        application_name = db_webapp.instance.application.name
-        component_name = db_webapp.name
-
-        # Criar cliente Kubernetes
-        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-
-        # Listar pods usando label selector baseado no nome do componente
-        # O label selector pode variar dependendo de como os pods são rotulados
-        # Vamos tentar alguns padrões comuns
-        label_selector = f"app={component_name}"
-        pods = k8s_client.list_pods(namespace=application_name, label_selector=label_selector)
-
-        # Se não encontrar com esse seletor, tentar sem seletor e filtrar depois
-        if not pods:
-            all_pods = k8s_client.list_pods(namespace=application_name)
-            pods = [pod for pod in all_pods if component_name in pod['name']]
-
-        return pods
+        return cluster_instance.cluster, db_webapp.instance.application.name, db_webapp.name
 
     @staticmethod
-    def delete_webapp_pod(db: Session, uuid: UUID, pod_name: str):
+    async def get_webapp_pods_async(db: Session, uuid: UUID):
         """
-        Deleta um pod específico do Kubernetes relacionado a um webapp.
+        Busca os pods do Kubernetes relacionados a um webapp, com o uso real de CPU e memória.
         """
-        # Buscar o componente com relacionamentos
-        db_webapp = (
-            db.query(ApplicationComponentModel.ApplicationComponent)
-            .options(
-                joinedload(ApplicationComponentModel.ApplicationComponent.instance)
-                .joinedload(InstanceModel.Instance.application),
-                joinedload(ApplicationComponentModel.ApplicationComponent.instances)
-                .joinedload(ClusterInstanceModel.ClusterInstance.cluster)
-            )
-            .filter(ApplicationComponentModel.ApplicationComponent.uuid == uuid)
-            .first()
+        cluster, application_name, component_name = await run_in_threadpool(
+            close_after, db, WebappService._get_webapp_deployment, uuid
         )
+        return await get_component_pods_async(cluster, application_name, component_name)
 
-        if db_webapp is None:
-            raise HTTPException(status_code=404, detail="Webapp not found")
-        if db_webapp.type != ApplicationComponentModel.WebappType.webapp:
-            raise HTTPException(
-                status_code=400,
-                detail="Component is not a webapp"
-            )
-
-        # Buscar cluster_instance relacionado
-        cluster_instance = (
-            db.query(ClusterInstanceModel.ClusterInstance)
-            .filter(ClusterInstanceModel.ClusterInstance.application_component_id == db_webapp.id)
-            .first()
+    @staticmethod
+    async def delete_webapp_pod_async(db: Session, uuid: UUID, pod_name: str):
+        """
+        Deleta um pod específico do Kubernetes relacionado a um webapp.
+        """
+        cluster, application_name, _ = await run_in_threadpool(
+            close_after, db, WebappService._get_webapp_deployment, uuid
         )
+        k8s_client = get_async_k8s_client(cluster)
 
-        if not cluster_instance:
-            raise HTTPException(
-                status_code=404,
-                detail="Webapp is not deployed to any cluster"
-            )
-
-        cluster = cluster_instance.cluster
-        application_name = db_webapp.instance.application.name
-
-        # Criar cliente Kubernetes
-        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-
-        # Deletar o pod
         try:
-            k8s_client.delete_pod(namespace=application_name, pod_name=pod_name)
+            await k8s_client.delete_pod(namespace=application_name, pod_name=pod_name)
             return {"detail": f"Pod {pod_name} deleted successfully"}
         except Exception as e:
             raise HTTPException(
@@ -727,59 +682,25 @@ class WebappService:
             )
 
     @staticmethod
-    def get_webapp_pod_logs(db: Session, uuid: UUID, pod_name: str, container_name: str = None, tail_lines: int = 100):
+    async def get_webapp_pod_logs_async(db: Session, uuid: UUID, pod_name: str, container_name: str = None, tail_lines: int = 100):
         """
         Obtém os logs de um pod específico do Kubernetes relacionado a um webapp.
         """
-        # Buscar o componente com relacionamentos
-        db_webapp = (
-            db.query(ApplicationComponentModel.ApplicationComponent)
-            .options(
-                joinedload(ApplicationComponentModel.ApplicationComponent.instance)
-                .joinedload(InstanceModel.Instance.application),
-                joinedload(ApplicationComponentModel.ApplicationComponent.instances)
-                .joinedload(ClusterInstanceModel.ClusterInstance.cluster)
-            )
-            .filter(ApplicationComponentModel.ApplicationComponent.uuid == uuid)
-            .first()
+        cluster, application_name, _ = await run_in_threadpool(
+            close_after, db, WebappService._get_webapp_deployment, uuid
         )
+        k8s_client = get_async_k8s_client(cluster)
 
-        if db_webapp is None:
-            raise HTTPException(status_code=404, detail="Webapp not found")
-        if db_webapp.type != ApplicationComponentModel.WebappType.webapp:
-            raise HTTPException(
-                status_code=400,
-                detail="Component is not a webapp"
-            )
-
-        # Buscar cluster_instance relacionado
-        cluster_instance = (
-            db.query(ClusterInstanceModel.ClusterInstance)
-            .filter(ClusterInstanceModel.ClusterInstance.application_component_id == db_webapp.id)
-            .first()
-        )
-
-        if not cluster_instance:
-            raise HTTPException(
-                status_code=404,
-                detail="Webapp is not deployed to any cluster"
-            )
-
-        cluster = cluster_instance.cluster
-        application_name = db_webapp.instance.application.name
-
-        # Criar cliente Kubernetes
-        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-
-        # Obter logs do pod
         try:
-            logs = k8s_client.get_pod_logs(
+            logs = await k8s_client.get_pod_logs(
                 namespace=application_name,
                 pod_name=pod_name,
                 container_name=container_name,
                 tail_lines=tail_lines
             )
             return {"logs": logs, "pod_name": pod_name, "container_name": container_name}
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=500,
@@ -787,62 +708,91 @@ class WebappService:
             )
 
     @staticmethod
-    def exec_webapp_pod_command(db: Session, uuid: UUID, pod_name: str, command: list[str], container_name: str = None):
+    async def stream_webapp_pod_logs(
+        db: Session,
+        uuid: UUID,
+        pod_name: str,
+        container_name: str = None,
+        follow: bool = False,
+        since_seconds: int = None,
+        timestamps: bool = False,
+        limit_bytes: int = None,
+        tail_lines: int = None,
+        sse: bool = False,
+    ) -> StreamingResponse:
         """
-        Executa um comando em um pod específico do Kubernetes relacionado a um webapp.
+        Retorna os logs do pod como stream, repassando as linhas conforme chegam.
+
+        Com follow=True o stream fica aberto até o container terminar, o cliente desconectar
+        ou o pod ficar sem emitir logs por K8S_LOG_STREAM_IDLE_TIMEOUT segundos.
         """
-        # Buscar o componente com relacionamentos
-        db_webapp = (
-            db.query(ApplicationComponentModel.ApplicationComponent)
-            .options(
-                joinedload(ApplicationComponentModel.ApplicationComponent.instance)
-                .joinedload(InstanceModel.Instance.application),
-                joinedload(ApplicationComponentModel.ApplicationComponent.instances)
-                .joinedload(ClusterInstanceModel.ClusterInstance.cluster)
-            )
-            .filter(ApplicationComponentModel.ApplicationComponent.uuid == uuid)
-            .first()
+        cluster, application_name, _ = await run_in_threadpool(
+            close_after, db, WebappService._get_webapp_deployment, uuid
         )
-
-        if db_webapp is None:
-            raise HTTPException(status_code=404, detail="Webapp not found")
-        if db_webapp.type != ApplicationComponentModel.WebappType.webapp:
-            raise HTTPException(
-                status_code=400,
-                detail="Component is not a webapp"
-            )
-
-        # Buscar cluster_instance relacionado
-        cluster_instance = (
-            db.query(ClusterInstanceModel.ClusterInstance)
-            .filter(ClusterInstanceModel.ClusterInstance.application_component_id == db_webapp.id)
-            .first()
+        k8s_client = get_async_k8s_client(cluster)
+
+        response = await k8s_client.open_pod_log_stream(
+            namespace=application_name,
+            pod_name=pod_name,
+            container_name=container_name,
+            follow=follow,
+            since_seconds=since_seconds,
+            timestamps=timestamps,
+            limit_bytes=limit_bytes,
+            tail_lines=tail_lines,
         )
 
-        if not cluster_instance:
-            raise HTTPException(
-                status_code=404,
-                detail="Webapp is not deployed to any cluster"
-            )
+        return StreamingResponse(
+            k8s_client.iter_log_stream(response, sse=sse),
+            media_type="text/event-stream" if sse else "text/plain; charset=utf-8",
+            # Evitar que proxies (nginx) acumulem o stream em buffer
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
-        cluster = cluster_instance.cluster
-        application_name = db_webapp.instance.application.name
+    @staticmethod
+    async def exec_webapp_pod_command_async(db: Session, uuid: UUID, pod_name: str, command: list[str], container_name: str = None):
+        """
+        Executa um comando em um pod específico do Kubernetes relacionado a um webapp,
+        retornando o exit code real do comando.
+        """
+        cluster, application_name, _ = await run_in_threadpool(
+            close_after, db, WebappService._get_webapp_deployment, uuid
+        )
+        k8s_client = get_async_k8s_client(cluster)
 
-        # Criar cliente Kubernetes
-        k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+        return await k8s_client.exec_pod_command(
+            namespace=application_name,
+            pod_name=pod_name,
+            command=command,
+            container_name=container_name
+        )
 
-        # Executar comando no pod
+    @staticmethod
+    async def exec_webapp_pod_session(
+        websocket: WebSocket,
+        uuid: UUID,
+        pod_name: str,
+        command: list[str],
+        container_name: str = None,
+        tty: bool = False,
+    ):
+        """
+        Sessão de exec interativa (stdin, tty e resize) em um pod do webapp via WebSocket.
+        """
         try:
-            result = k8s_client.exec_pod_command(
-                namespace=application_name,
-                pod_name=pod_name,
-                command=command,
-                container_name=container_name
-            )
-            return result
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to execute command in pod {pod_name}: {str(e)}"
+            cluster, application_name, _ = await run_in_threadpool(
+                load_deployment, WebappService._get_webapp_deployment, uuid
             )
-
+        except HTTPException as e:
+            await websocket.close(code=WS_CLOSE_POLICY_VIOLATION, reason=str(e.detail))
+            return
+
+        await run_exec_session(
+            websocket,
+            cluster,
+            namespace=application_name,
+            pod_name=pod_name,
+            command=command,
+            container_name=container_name,
+            tty=tty,
+        )
@@ -8,7 +8,8 @@ import app.models.settings as SettingsModel
 import app.schemas.instance as InstanceSchema
 
 from app.helpers.serializers import serialize_application_component, serialize_settings
-from app.k8s.client import K8sClient
+from app.k8s.registry import get_k8s_client
+from app.services.applied_manifest import apply_manifests
 from app.services.kubernetes.application_component_manager import (
     KubernetesApplicationComponentManager,
 )
@@ -72,9 +73,9 @@ class InstanceService:
                 gateway_reference=gateway_reference
             )
 
-            k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-            k8s_client.apply_or_delete_yaml_to_k8s(
-                kubernetes_payload, operation="delete"
+            k8s_client = get_k8s_client(cluster)
+            apply_manifests(
+                cluster, k8s_client, kubernetes_payload, operation="delete"
             )
 
             db.delete(db_instance)
@@ -130,7 +131,7 @@ class InstanceService:
                     component_type = application_component.type.value if hasattr(application_component.type, 'value') else str(application_component.type)
                     settings_serialized = serialize_settings(settings)
 
-                    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                    k8s_client = get_k8s_client(cluster)
                     gateway_reference = get_gateway_reference_from_cluster(cluster)
                     kubernetes_payload = (
                         KubernetesApplicationComponentManager.instance_management(
@@ -138,8 +139,8 @@ class InstanceService:
                             gateway_reference=gateway_reference
                         )
                     )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="create"
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="create"
                     )
 
                     db.commit()
@@ -161,14 +162,14 @@ class InstanceService:
             component_type = application_component.type.value if hasattr(application_component.type, 'value') else str(application_component.type)
             settings_serialized = serialize_settings(settings)
 
-            k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+            k8s_client = get_k8s_client(cluster)
             gateway_reference = get_gateway_reference_from_cluster(cluster)
             kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                 application_component_serialized, component_type, settings_serialized, db=db,
                 gateway_reference=gateway_reference
             )
-            k8s_client.apply_or_delete_yaml_to_k8s(
-                kubernetes_payload, operation="create"
+            apply_manifests(
+                cluster, k8s_client, kubernetes_payload, operation="create"
             )
 
             db.commit()
@@ -1,4 +1,5 @@
-from fastapi import HTTPException
+from fastapi import HTTPException, WebSocket
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
 from uuid import uuid4
 from uuid import UUID
@@ -8,11 +9,15 @@ import app.models.instance as InstanceModel
 import app.models.cluster_instance as ClusterInstanceModel
 import app.models.settings as SettingsModel
 import app.schemas.worker as WorkerSchema
+from app.database import close_after
 from app.helpers.serializers import serialize_application_component, serialize_settings
-from app.k8s.client import K8sClient
+from app.k8s.registry import get_k8s_client
+from app.services.applied_manifest import apply_manifests
 from app.services.kubernetes.application_component_manager import (
     KubernetesApplicationComponentManager,
 )
+from app.services.kubernetes.component_pods import get_component_pods_async
+from app.services.kubernetes.pod_exec import WS_CLOSE_POLICY_VIOLATION, load_deployment, run_exec_session
 from app.services.cluster_selection import ClusterSelectionService
 from app.services.cluster import get_gateway_reference_from_cluster
 
@@ -107,7 +112,7 @@ class WorkerService:
             # Se o componente foi desativado (enabled mudou de True para False), remover do Kubernetes
             if enabled_changed and was_enabled and not will_be_enabled:
                 try:
-                    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                    k8s_client = get_k8s_client(cluster)
                     application_name = application_component_serialized.get("application_name")
                     if application_name:
                         k8s_client.ensure_namespace_exists(application_name)
@@ -117,8 +122,8 @@ class WorkerService:
                         application_component_serialized, component_type, settings_serialized, db=db,
                         gateway_reference=gateway_reference
                     )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="delete"
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="delete"
                     )
 
                     db.commit()
@@ -136,18 +141,15 @@ class WorkerService:
             # Se o componente foi reativado (enabled mudou de False para True), reaplicar no Kubernetes
             elif enabled_changed and not was_enabled and will_be_enabled:
                 try:
-                    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-                    application_name = application_component_serialized.get("application_name")
-                    if application_name:
-                        k8s_client.ensure_namespace_exists(application_name)
+                    k8s_client = get_k8s_client(cluster)
 
                     gateway_reference = get_gateway_reference_from_cluster(cluster)
                     kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                         application_component_serialized, component_type, settings_serialized, db=db,
                         gateway_reference=gateway_reference
                     )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="upsert"
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="apply"
                     )
 
                     db.commit()
@@ -164,20 +166,15 @@ class WorkerService:
             # Se não houve mudança no enabled ou se está habilitado, aplicar normalmente
             elif not enabled_changed or db_worker.enabled:
                 try:
-                    k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
-
-                    # Verificar e criar namespace com o nome da aplicação se não existir
-                    application_name = application_component_serialized.get("application_name")
-                    if application_name:
-                        k8s_client.ensure_namespace_exists(application_name)
+                    k8s_client = get_k8s_client(cluster)
 
                     gateway_reference = get_gateway_reference_from_cluster(cluster)
                     kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                         application_component_serialized, component_type, settings_serialized, db=db,
                         gateway_reference=gateway_reference
                     )
-                    k8s_client.apply_or_delete_yaml_to_k8s(
-                        kubernetes_payload, operation="upsert"
+                    apply_manifests(
+                        cluster, k8s_client, kubernetes_payload, operation="apply"
                     )
 
                     db.commit()
@@ -287,7 +284,7 @@ class WorkerService:
 
             # Aplicar recursos no Kubernetes
             try:
-                k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                k8s_client = get_k8s_client(cluster)
 
                 # Verificar e criar namespace com o nome da aplicação se não existir
                 application_name = application_component_serialized.get("application_name")
@@ -297,8 +294,8 @@ class WorkerService:
                 kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                     application_component_serialized, component_type, settings_serialized, db=db
                 )
-                k8s_client.apply_or_delete_yaml_to_k8s(
-                    kubernetes_payload, operation="create"
+                apply_manifests(
+                    cluster, k8s_client, kubernetes_payload, operation="create"
                 )
 
                 # Commit do cluster_instance e do componente
@@ -416,14 +413,14 @@ class WorkerService:
                 component_type = db_worker.type.value if hasattr(db_worker.type, 'value') else str(db_worker.type)
 
                 # Criar cliente Kubernetes
-                k8s_client = K8sClient(url=cluster.api_address, token=cluster.token)
+                k8s_client = get_k8s_client(cluster)
 
                 # Deletar recursos do Kubernetes
                 kubernetes_payload = KubernetesApplicationComponentManager.instance_management(
                     application_component_serialized, component_type, settings_serialized, db=db
                 )
-                k8s_client.apply_or_delete_yaml_to_k8s(
-                    kubernetes_payload, operation="delete"
+                apply_manifests(
+                    cluster, k8s_client, kubernetes_payload, operation="delete"
                 )
             except Exception as e:
                 # Se falhar ao deletar do Kubernetes, logamos o erro mas continuamos
@@ -444,3 +441,84 @@ class WorkerService:
 
         return {"detail": "Worker deleted successfully"}
 
+    @staticmethod
+    def _get_worker_deployment(db: Session, uuid: UUID):
+        """
+        Busca o cluster onde o worker está implantado.
+
+        Returns:
+            Tupla (cluster, nome da aplicação/namespace, nome do componente)
+        """
+        db_worker = (
+            db.query(ApplicationComponentModel.ApplicationComponent)
+            .options(
+                joinedload(ApplicationComponentModel.ApplicationComponent.instance)
+                .joinedload(InstanceModel.Instance.application),
+                joinedload(ApplicationComponentModel.ApplicationComponent.instances)
+                .joinedload(ClusterInstanceModel.ClusterInstance.cluster)
+            )
+            .filter(ApplicationComponentModel.ApplicationComponent.uuid == uuid)
+            .first()
+        )
+
+        if db_worker is None:
+            raise HTTPException(status_code=404, detail="Worker not found")
+        if db_worker.type != ApplicationComponentModel.WebappType.worker:
+            raise HTTPException(
+                status_code=400,
+                detail="Component is not a worker"
+            )
+
+        cluster_instance = (
+            db.query(ClusterInstanceModel.ClusterInstance)
+            .filter(ClusterInstanceModel.ClusterInstance.application_component_id == db_worker.id)
+            .first()
+        )
+
+        if not cluster_instance:
+            raise HTTPException(
+                status_code=404,
+                detail="Worker is not deployed to any cluster"
+            )
+
+        return cluster_instance.cluster, db_worker.instance.application.name, db_worker.name
+
+    @staticmethod
+    async def get_worker_pods_async(db: Session, uuid: UUID):
+        """
+        Busca os pods do Kubernetes relacionados a um worker, com o uso real de CPU e memória.
+        """
+        cluster, application_name, component_name = await run_in_threadpool(
+            close_after, db, WorkerService._get_worker_deployment, uuid
+        )
+        return await get_component_pods_async(cluster, application_name, component_name)
+
+    @staticmethod
+    async def exec_worker_pod_session(
+        websocket: WebSocket,
+        uuid: UUID,
+        pod_name: str,
+        command: list[str],
+        container_name: str = None,
+        tty: bool = False,
+    ):
+        """
+        Sessão de exec interativa (stdin, tty e resize) em um pod do worker via WebSocket.
+        """
+        try:
+            cluster, application_name, _ = await run_in_threadpool(
+                load_deployment, WorkerService._get_worker_deployment, uuid
+            )
+        except HTTPException as e:
+            await websocket.close(code=WS_CLOSE_POLICY_VIOLATION, reason=str(e.detail))
+            return
+
+        await run_exec_session(
+            websocket,
+            cluster,
+            namespace=application_name,
+            pod_name=pod_name,
+            command=command,
+            container_name=container_name,
+            tty=tty,
+        )
@@ -17,6 +17,7 @@ from uuid import uuid4
 
 import app.models.template as TemplateModel
 import app.models.component_template_config as ComponentTemplateConfigModel
+from app.services.template_set_cache import bump_template_set_version
 
 
 def read_template_file(file_path: Path) -> str:
@@ -246,6 +247,8 @@ def load_templates(db: Session):
         created_templates.append(new_template)
         print(f"✓ Template '{template_data['name']}' criado com sucesso")
 
+    # Processos da API em execução recarregam os conjuntos de templates na próxima renderização
+    bump_template_set_version(db)
     db.commit()
     return created_templates
 
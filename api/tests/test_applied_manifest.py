@@ -0,0 +1,134 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.k8s.apply import get_manifest_hash, manifest_hash, manifest_key, stamp_component_labels, stamp_manifest_hash
+from app.k8s.client import K8sClient
+from app.services.applied_manifest import apply_manifests
+
+
+def render(image):
+    return [
+        {"apiVersion": "v1", "kind": "ConfigMap", "metadata": {"name": "web", "namespace": "app"}, "data": {"a": "1"}},
+        {
+            "apiVersion": "apps/v1",
+            "kind": "Deployment",
+            "metadata": {"name": "web", "namespace": "app"},
+            "spec": {"template": {"spec": {"containers": [{"name": "web", "image": image}]}}},
+        },
+    ]
+
+
+def make_client():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.api_client = MagicMock()
+    k8s_client.api_client.call_api.return_value = ({}, 200, {})
+    k8s_client.cleanup_orphaned_gateway_resources = MagicMock()
+    k8s_client.known_namespaces.add("app")
+    return k8s_client
+
+
+def test_manifest_hash_ignores_hash_annotation():
+    document = render("nginx:1")[0]
+
+    assert manifest_hash(stamp_manifest_hash(document)) == manifest_hash(document)
+    assert get_manifest_hash(stamp_manifest_hash(document)) == manifest_hash(document)
+
+
+def test_apply_skips_documents_with_unchanged_hash():
+    k8s_client = make_client()
+    previous = [stamp_manifest_hash(document) for document in render("nginx:1")]
+    applied_hashes = {manifest_key(document): get_manifest_hash(document) for document in previous}
+
+    documents = [stamp_manifest_hash(document) for document in render("nginx:2")]
+    report = k8s_client.apply_or_delete_yaml_to_k8s(documents, operation="apply", applied_hashes=applied_hashes)
+
+    patched_paths = [c.args[0] for c in k8s_client.api_client.call_api.call_args_list]
+    assert patched_paths == ["/apis/apps/v1/namespaces/app/deployments/web"]
+    assert sorted(r["status"] for r in report["results"]) == ["ok", "skipped"]
+
+
+def test_apply_ignores_hashes_in_recreated_namespace():
+    k8s_client = make_client()
+    k8s_client.known_namespaces.clear()
+    k8s_client.ensure_namespace_exists = MagicMock(return_value=True)
+    documents = [stamp_manifest_hash(document) for document in render("nginx:1")]
+    applied_hashes = {manifest_key(document): get_manifest_hash(document) for document in documents}
+
+    k8s_client.apply_or_delete_yaml_to_k8s(documents, operation="apply", applied_hashes=applied_hashes)
+
+    assert k8s_client.api_client.call_api.call_count == 2
+
+
+def test_sync_resends_unchanged_documents():
+    documents = [stamp_manifest_hash(document) for document in render("nginx:1")]
+    rows = {
+        manifest_key(document): SimpleNamespace(manifest_hash=get_manifest_hash(document))
+        for document in documents
+    }
+    k8s_client = MagicMock()
+    k8s_client.apply_or_delete_yaml_to_k8s.return_value = {"results": []}
+
+    with patch("app.services.applied_manifest.SessionLocal"), \
+            patch("app.services.applied_manifest._load_applied_hashes", return_value=rows):
+        apply_manifests(SimpleNamespace(id=1), k8s_client, render("nginx:1"))
+        apply_manifests(SimpleNamespace(id=1), k8s_client, render("nginx:1"), skip_unchanged=False)
+
+    first, second = k8s_client.apply_or_delete_yaml_to_k8s.call_args_list
+    assert first.kwargs["applied_hashes"] == {key: row.manifest_hash for key, row in rows.items()}
+    assert second.kwargs["applied_hashes"] is None
+
+
+def test_no_session_is_open_during_apply():
+    sessions = []
+
+    def session_local():
+        sessions.append(MagicMock())
+        return sessions[-1]
+
+    def apply(documents, operation, applied_hashes, prune):
+        assert all(session.close.called for session in sessions)
+        return {"results": [{"kind": "Deployment", "namespace": "app", "name": "web", "status": "ok"}]}
+
+    k8s_client = MagicMock()
+    k8s_client.apply_or_delete_yaml_to_k8s.side_effect = apply
+
+    with patch("app.services.applied_manifest.SessionLocal", side_effect=session_local), \
+            patch("app.services.applied_manifest._load_applied_hashes", return_value={}), \
+            patch("app.services.applied_manifest.AppliedManifestModel"):
+        apply_manifests(SimpleNamespace(id=1), k8s_client, render("nginx:1"))
+
+    # Uma sessão para ler os hashes e outra para registrar o resultado
+    assert len(sessions) == 2
+    sessions[1].add.assert_called_once()
+    sessions[1].commit.assert_called_once()
+    sessions[1].close.assert_called_once()
+
+
+def test_prune_runs_only_when_component_objects_change():
+    documents = [
+        stamp_component_labels(document, "uuid-web") for document in render("nginx:1")
+    ]
+    keys = {manifest_key(document) for document in documents}
+    k8s_client = MagicMock()
+    k8s_client.apply_or_delete_yaml_to_k8s.return_value = {"results": []}
+
+    for recorded_keys, expected_prune in ((keys, False), (keys | {("Service", "app", "old")}, True)):
+        with patch("app.services.applied_manifest.SessionLocal"), \
+                patch("app.services.applied_manifest._load_applied_hashes", return_value={}), \
+                patch("app.services.applied_manifest._load_component_keys", return_value=recorded_keys) as load:
+            apply_manifests(SimpleNamespace(id=1), k8s_client, documents)
+
+        load.assert_called_once_with(load.call_args.args[0], 1, "uuid-web")
+        assert k8s_client.apply_or_delete_yaml_to_k8s.call_args.kwargs["prune"] is expected_prune
+
+
+def test_apply_without_prune_does_not_list_component_objects():
+    k8s_client = make_client()
+    k8s_client.prune_component_resources = MagicMock(return_value=[])
+    documents = [stamp_component_labels(stamp_manifest_hash(document), "uuid-web") for document in render("nginx:1")]
+
+    k8s_client.apply_or_delete_yaml_to_k8s(documents, operation="apply", prune=False)
+    k8s_client.prune_component_resources.assert_not_called()
+
+    k8s_client.apply_or_delete_yaml_to_k8s(documents, operation="apply")
+    k8s_client.prune_component_resources.assert_called_once()
@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.services.instance import InstanceService
+from app.services.kubernetes import application_component_manager
+from app.services.kubernetes.application_component_manager import KubernetesApplicationComponentManager
+from app.services.kubernetes.manifest_cache import RenderedManifestCache
+
+
+TEMPLATES = {
+    "webapp": [SimpleNamespace(id=1, name="deployment", content="kind: {{ application.settings.kind }}\nmetadata:\n  name: {{ application.component_name }}\n")],
+    "worker": [SimpleNamespace(id=2, name="worker", content="kind: Deployment\nmetadata:\n  name: {{ application.component_name }}-{{ environment.region }}\n")],
+}
+
+
+def component(name, component_type="webapp", kind="Deployment"):
+    return {
+        "component_name": name,
+        "component_uuid": f"uuid-{name}",
+        "component_type": component_type,
+        "settings": {"kind": kind},
+    }
+
+
+def render(components, monkeypatch):
+    monkeypatch.setattr(application_component_manager, "manifest_cache", RenderedManifestCache())
+    get_templates = MagicMock(side_effect=lambda db, component_type: TEMPLATES[component_type])
+    with patch(
+        "app.services.component_template_config.ComponentTemplateConfigService.get_templates_for_component",
+        get_templates,
+    ):
+        results = KubernetesApplicationComponentManager.render_components(
+            components, {"region": "us"}, db=MagicMock()
+        )
+    return results, get_templates
+
+
+def test_render_components_groups_manifests_by_component(monkeypatch):
+    results, get_templates = render(
+        [component("web"), component("api"), component("jobs", component_type="worker")], monkeypatch
+    )
+
+    assert [document["metadata"]["name"] for document in results["uuid-web"]] == ["web"]
+    assert [document["metadata"]["name"] for document in results["uuid-jobs"]] == ["jobs-us"]
+    assert results["uuid-api"][0]["metadata"]["labels"]["tron.io/component-uuid"] == "uuid-api"
+    # Um conjunto de templates por tipo de componente, não por componente
+    assert get_templates.call_count == 2
+
+
+def test_render_components_isolates_failures(monkeypatch):
+    results, _ = render([component("web"), component("broken", kind="[")], monkeypatch)
+
+    assert results["uuid-web"][0]["kind"] == "Deployment"
+    assert isinstance(results["uuid-broken"], ValueError)
+    assert "deployment" in str(results["uuid-broken"])
+
+
+def test_render_components_reuses_cached_renders(monkeypatch):
+    cache = RenderedManifestCache()
+    monkeypatch.setattr(application_component_manager, "manifest_cache", cache)
+    with patch(
+        "app.services.component_template_config.ComponentTemplateConfigService.get_templates_for_component",
+        side_effect=lambda db, component_type: TEMPLATES[component_type],
+    ):
+        KubernetesApplicationComponentManager.instance_management(
+            component("web"), "webapp", {"region": "us"}, db=MagicMock()
+        )
+        results = KubernetesApplicationComponentManager.render_components(
+            [component("web")], {"region": "us"}, db=MagicMock()
+        )
+
+    assert results["uuid-web"][0]["metadata"]["name"] == "web"
+    assert cache.stats()["hits"] == 1
+
+
+def test_render_components_in_process_pool(monkeypatch):
+    monkeypatch.setattr(application_component_manager, "TEMPLATE_RENDER_PROCESSES", 2)
+    try:
+        results, _ = render([component("web"), component("api"), component("broken", kind="[")], monkeypatch)
+    finally:
+        application_component_manager.shutdown_render_pool()
+
+    assert results["uuid-web"][0]["metadata"]["name"] == "web"
+    assert results["uuid-api"][0]["metadata"]["name"] == "api"
+    assert isinstance(results["uuid-broken"], ValueError)
+
+
+def test_render_instance_components_renders_once_per_cluster():
+    clusters = {1: SimpleNamespace(name="prod-a"), 2: SimpleNamespace(name="prod-b")}
+    components = [SimpleNamespace(id=index, uuid=f"uuid-{index}", name=f"c{index}") for index in (10, 11, 12, 13)]
+    cluster_instances = [
+        SimpleNamespace(application_component_id=10, cluster_id=1, cluster=clusters[1]),
+        SimpleNamespace(application_component_id=11, cluster_id=1, cluster=clusters[1]),
+        SimpleNamespace(application_component_id=12, cluster_id=2, cluster=clusters[2]),
+    ]
+    db = MagicMock()
+    db.query.return_value.filter.return_value.order_by.return_value.all.return_value = cluster_instances
+
+    def render_components(serialized, settings, db, gateway_reference):
+        return {item["component_uuid"]: [{"cluster": gateway_reference["name"]}] for item in serialized}
+
+    with patch(
+        "app.services.instance.serialize_application_component",
+        side_effect=lambda component: {"component_uuid": component.uuid},
+    ), patch(
+        "app.services.instance.get_gateway_reference_from_cluster",
+        side_effect=lambda cluster: {"namespace": "gateway", "name": cluster.name},
+    ), patch.object(
+        KubernetesApplicationComponentManager, "render_components", side_effect=render_components
+    ) as batch:
+        rendered = InstanceService._render_instance_components(db, components, {})
+
+    assert batch.call_count == 2
+    assert [(c.name, ci.cluster_id if ci else None, payload) for c, ci, payload in rendered] == [
+        ("c10", 1, [{"cluster": "prod-a"}]),
+        ("c11", 1, [{"cluster": "prod-a"}]),
+        ("c12", 2, [{"cluster": "prod-b"}]),
+        ("c13", None, None),
+    ]
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.cluster_status import ClusterStatus
+from app.services.cluster import ClusterService, probe_clusters, save_cluster_statuses
+
+
+def make_k8s_client(success=True, version="v1.30.2", gateway_kinds=("HTTPRoute",)):
+    k8s_client = MagicMock()
+    if success:
+        k8s_client.validate_connection.return_value = (True, {"status": "ok", "message": "connected"})
+    else:
+        k8s_client.validate_connection.return_value = (
+            False, {"status": "error", "message": {"code": "503", "message": "unreachable"}}
+        )
+    k8s_client.get_server_version.return_value = version
+    k8s_client.check_api_available.return_value = bool(gateway_kinds)
+    k8s_client.get_gateway_api_resources.return_value = list(gateway_kinds)
+    return k8s_client
+
+
+def test_probe_cluster_records_version_latency_and_gateway():
+    probe = ClusterService._probe_cluster(make_k8s_client())
+
+    assert probe["reachable"] is True
+    assert probe["server_version"] == "v1.30.2"
+    assert probe["latency_ms"] >= 0
+    assert probe["gateway_api_enabled"] is True
+    assert probe["gateway_resources"] == ["HTTPRoute"]
+    assert probe["detail"]["status"] == "ok"
+    assert probe["probed_at"] is not None
+
+
+def test_probe_cluster_unreachable_skips_discovery():
+    k8s_client = make_k8s_client(success=False)
+
+    probe = ClusterService._probe_cluster(k8s_client)
+
+    assert probe["reachable"] is False
+    assert probe["server_version"] is None
+    assert probe["gateway_api_enabled"] is False
+    k8s_client.get_server_version.assert_not_called()
+    k8s_client.check_api_available.assert_not_called()
+
+
+def test_probe_cluster_handles_unexpected_errors():
+    k8s_client = make_k8s_client()
+    k8s_client.validate_connection.side_effect = RuntimeError("boom")
+
+    probe = ClusterService._probe_cluster(k8s_client)
+
+    assert probe["reachable"] is False
+    assert probe["detail"] == {"status": "error", "message": "boom"}
+
+
+def test_probe_clusters_keeps_cluster_order():
+    clusters = [SimpleNamespace(id=1), SimpleNamespace(id=2)]
+    k8s_clients = {1: make_k8s_client(version="v1.29.0"), 2: make_k8s_client(success=False)}
+
+    with patch("app.services.cluster.get_k8s_client", side_effect=lambda cluster: k8s_clients[cluster.id]):
+        probes = probe_clusters(clusters)
+
+    assert [probe["reachable"] for probe in probes] == [True, False]
+    assert probes[0]["server_version"] == "v1.29.0"
+
+
+def test_upsert_cluster_closes_validation_client():
+    k8s_client = make_k8s_client(success=False)
+    cluster = SimpleNamespace(api_address="https://k8s.local:6443", token="token")
+
+    with patch("app.services.cluster.K8sClient", return_value=k8s_client), pytest.raises(HTTPException):
+        ClusterService.upsert_cluster(MagicMock(), cluster)
+
+    k8s_client.close.assert_called_once()
+
+
+def test_save_cluster_statuses_upserts():
+    engine = create_engine("sqlite:///:memory:")
+    ClusterStatus.__table__.create(bind=engine)
+    db = sessionmaker(bind=engine)()
+    table = ClusterStatus.__table__
+    clusters = [SimpleNamespace(id=1), SimpleNamespace(id=2)]
+    try:
+        save_cluster_statuses(db, clusters, [ClusterService._probe_cluster(make_k8s_client())] * 2)
+        db.commit()
+        # Linha já existente (ex.: gravada por outro worker) é atualizada em vez de falhar
+        save_cluster_statuses(db, clusters[:1], [ClusterService._probe_cluster(make_k8s_client(success=False))])
+        db.commit()
+
+        rows = db.execute(select(table.c.cluster_id, table.c.reachable).order_by(table.c.cluster_id)).all()
+        assert [tuple(row) for row in rows] == [(1, False), (2, True)]
+    finally:
+        db.close()
@@ -0,0 +1,42 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.k8s.gateway import GatewayReferenceCache
+from app.services.cluster import get_gateway_reference_from_cluster
+
+
+def test_gateway_reference_cache_loads_once():
+    cache = GatewayReferenceCache()
+    loader = MagicMock(return_value={"namespace": "gateway", "name": "public"})
+
+    assert cache.get(loader, wait_timeout=5) == {"namespace": "gateway", "name": "public"}
+    assert cache.get(loader) == {"namespace": "gateway", "name": "public"}
+
+    assert loader.call_count == 1
+    assert cache.loaded is True
+
+
+def test_gateway_reference_cache_cold_get_does_not_block():
+    cache = GatewayReferenceCache()
+    release = threading.Event()
+
+    def slow_loader():
+        release.wait(5)
+        return {"namespace": "gateway", "name": "public"}
+
+    assert cache.get(slow_loader) is None
+    release.set()
+    cache.refresh_async(slow_loader).wait(5)
+
+    assert cache.get(slow_loader) == {"namespace": "gateway", "name": "public"}
+
+
+def test_pinned_gateway_reference_skips_cluster_lookup():
+    cluster = SimpleNamespace(gateway_namespace="infra", gateway_name="edge")
+
+    with patch("app.services.cluster.get_k8s_client") as get_k8s_client:
+        reference = get_gateway_reference_from_cluster(cluster)
+
+    assert reference == {"namespace": "infra", "name": "edge"}
+    get_k8s_client.assert_not_called()
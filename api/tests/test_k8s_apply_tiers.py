@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.k8s.apply import group_documents_by_tier, run_in_tiers
+
+
+def doc(kind, name="web"):
+    return {"apiVersion": "v1", "kind": kind, "metadata": {"name": name, "namespace": "app"}}
+
+
+def test_group_documents_by_tier():
+    documents = [doc("HTTPRoute"), doc("Deployment"), None, doc("Service"), doc("ConfigMap")]
+
+    tiers = group_documents_by_tier(documents)
+
+    assert [[d["kind"] for d in tier] for tier in tiers] == [
+        ["Service", "ConfigMap"],
+        ["Deployment"],
+        ["HTTPRoute"],
+    ]
+    assert [[d["kind"] for d in tier] for tier in group_documents_by_tier(documents, reverse=True)] == [
+        ["HTTPRoute"],
+        ["Deployment"],
+        ["Service", "ConfigMap"],
+    ]
+
+
+def test_run_in_tiers_runs_tier_concurrently():
+    # Os dois documentos do primeiro tier só terminam se rodarem ao mesmo tempo
+    barrier = threading.Barrier(2, timeout=5)
+    applied = []
+
+    def apply_document(document):
+        if document["kind"] in ("Service", "ConfigMap"):
+            barrier.wait()
+        applied.append(document["kind"])
+
+    tiers = group_documents_by_tier([doc("Deployment"), doc("Service"), doc("ConfigMap")])
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        report = run_in_tiers(executor, tiers, apply_document, "apply")
+
+    assert applied[-1] == "Deployment"
+    assert [r["status"] for r in report["results"]] == ["ok", "ok", "ok"]
+
+
+def test_run_in_tiers_stops_after_failed_tier():
+    applied = []
+
+    def apply_document(document):
+        if document["kind"] == "Service":
+            raise ValueError("boom")
+        applied.append(document["kind"])
+
+    tiers = group_documents_by_tier([doc("Deployment"), doc("Service")])
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(ValueError):
+            run_in_tiers(executor, tiers, apply_document, "apply")
+
+    assert applied == []
@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+
+from app.k8s.async_client import AsyncK8sClient, parse_exec_status
+from app.k8s.formatters import format_job, format_pod
+
+
+POD = {
+    "metadata": {"name": "web-abc", "creationTimestamp": "2024-01-01T10:00:00Z"},
+    "spec": {"containers": [{"resources": {"requests": {"cpu": "250m", "memory": "128Mi"}, "limits": {"cpu": "1"}}}]},
+    "status": {"phase": "Running", "hostIP": "10.0.0.1", "containerStatuses": [{"restartCount": 2}]},
+}
+
+
+def make_client(handler):
+    k8s_client = AsyncK8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.http = httpx.AsyncClient(base_url=k8s_client.url, transport=httpx.MockTransport(handler))
+    return k8s_client
+
+
+def test_format_pod_from_raw_json():
+    pod = format_pod(POD)
+
+    assert pod["name"] == "web-abc"
+    assert pod["status"] == "Running"
+    assert pod["restarts"] == 2
+    assert pod["cpu_requests"] == 0.25
+    assert pod["cpu_limits"] == 1.0
+    assert pod["memory_requests"] == 128
+    assert pod["host_ip"] == "10.0.0.1"
+
+
+def test_format_job_duration():
+    job = format_job({
+        "metadata": {"name": "backup-1"},
+        "status": {"succeeded": 1, "startTime": "2024-01-01T10:00:00Z", "completionTime": "2024-01-01T10:01:30Z"},
+    })
+
+    assert job["status"] == "Succeeded"
+    assert job["duration_seconds"] == 90
+    assert job["start_time"] == "2024-01-01T10:00:00+00:00"
+
+
+def test_async_list_pods_uses_label_selector():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"items": [POD]})
+
+    pods = asyncio.run(make_client(handler).list_pods("app", label_selector="app=web"))
+
+    assert [pod["name"] for pod in pods] == ["web-abc"]
+    assert requests[0].url.path == "/api/v1/namespaces/app/pods"
+    assert requests[0].url.params["labelSelector"] == "app=web"
+
+
+def test_async_list_pods_returns_empty_on_api_error():
+    pods = asyncio.run(make_client(lambda request: httpx.Response(403, text="forbidden")).list_pods("app"))
+
+    assert pods == []
+
+
+def test_parse_exec_status():
+    assert parse_exec_status(b'{"status": "Success"}') == 0
+    assert parse_exec_status(
+        b'{"status": "Failure", "reason": "NonZeroExitCode", '
+        b'"details": {"causes": [{"reason": "ExitCode", "message": "3"}]}}'
+    ) == 3
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+import urllib3
+from kubernetes.client.rest import ApiException
+
+from app.k8s.breaker import CircuitBreaker, CircuitOpenError
+from app.k8s.client import K8S_CONNECT_TIMEOUT, K8S_READ_TIMEOUT, K8sClient
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_backoff():
+    breaker = CircuitBreaker(failure_threshold=2, base_backoff=0.05, max_backoff=1)
+
+    breaker.record_failure(Exception("timeout"))
+    breaker.before_call()
+    breaker.record_failure(Exception("timeout"))
+    assert breaker.snapshot()["state"] == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    # Uma única chamada de teste é liberada no half-open
+    breaker.before_call()
+    assert breaker.snapshot()["state"] == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # Falha no half-open reabre com o backoff dobrado
+    breaker.record_failure(Exception("timeout"))
+    assert breaker.snapshot()["state"] == "open"
+    assert breaker.opened_until - time.monotonic() > 0.05
+
+    breaker.opened_until = time.monotonic()
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.snapshot() == {
+        "state": "closed", "consecutive_failures": 0, "retry_in_seconds": None, "last_error": "timeout",
+    }
+
+
+class FakeRestClient:
+    def __init__(self, error=None):
+        self.error = error
+        self.timeouts = []
+        self.pool_manager = urllib3.PoolManager()
+
+    def GET(self, url, query_params=None, _preload_content=True, _request_timeout=None, headers=None):
+        self.timeouts.append(_request_timeout)
+        if self.error:
+            raise self.error
+        return "ok"
+
+
+def test_api_client_applies_default_timeouts():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    rest_client = FakeRestClient()
+    k8s_client.api_client.rest_client = rest_client
+
+    k8s_client.api_client.request("GET", "https://k8s.local:6443/api")
+    k8s_client.api_client.request("GET", "https://k8s.local:6443/api", _request_timeout=60)
+
+    assert rest_client.timeouts == [(K8S_CONNECT_TIMEOUT, K8S_READ_TIMEOUT), 60]
+    k8s_client.close()
+
+
+def test_api_client_fails_fast_when_circuit_is_open():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    timeout = urllib3.exceptions.MaxRetryError(
+        None, "/api", reason=urllib3.exceptions.ConnectTimeoutError(None, "timed out")
+    )
+    rest_client = FakeRestClient(error=timeout)
+    k8s_client.api_client.rest_client = rest_client
+
+    for _ in range(k8s_client.breaker.failure_threshold):
+        with pytest.raises(ApiException) as error:
+            k8s_client.api_client.request("GET", "https://k8s.local:6443/api")
+        assert error.value.status == 504
+
+    with pytest.raises(ApiException) as error:
+        k8s_client.api_client.request("GET", "https://k8s.local:6443/api")
+    assert error.value.status == 503
+    assert "circuit open" in error.value.reason
+    assert len(rest_client.timeouts) == k8s_client.breaker.failure_threshold
+
+    success, message = k8s_client.validate_connection()
+    assert success is False
+    assert message["message"]["code"] == "503"
+    k8s_client.close()
+
+
+def test_client_errors_do_not_trip_the_breaker():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.api_client.rest_client = FakeRestClient(error=ApiException(status=404, reason="Not Found"))
+
+    for _ in range(5):
+        with pytest.raises(ApiException):
+            k8s_client.api_client.request("GET", "https://k8s.local:6443/api")
+
+    assert k8s_client.breaker.snapshot()["state"] == "closed"
+    k8s_client.close()
@@ -0,0 +1,62 @@
+import time
+
+from kubernetes.client import V1Node, V1NodeCondition, V1NodeStatus
+
+from app.k8s.capacity import CapacitySnapshotCache, build_capacity_snapshot
+
+
+def make_node(ready: bool, cpu: str, memory: str, pods: str = "110"):
+    resources = {"cpu": cpu, "memory": memory, "pods": pods}
+    return V1Node(status=V1NodeStatus(
+        capacity=resources,
+        allocatable=resources,
+        conditions=[V1NodeCondition(type="Ready", status="True" if ready else "False")],
+    ))
+
+
+def test_snapshot_parses_quantities_in_one_pass():
+    snapshot = build_capacity_snapshot([
+        make_node(True, "3500m", "16Gi"),
+        make_node(True, "2", "8388608Ki"),
+        make_node(False, "4", "1G"),
+    ])
+
+    assert snapshot["nodes"] == 3
+    assert snapshot["ready_nodes"] == 2
+    assert snapshot["allocatable"] == {"cpu": 5.5, "memory_mb": 24576, "pods": 220}
+    assert snapshot["capacity"]["cpu"] == 9.5
+    assert snapshot["capacity"]["pods"] == 330
+
+
+def test_cache_serves_stale_snapshot_and_refreshes_in_background():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"ready_nodes": len(calls)}
+
+    cache = CapacitySnapshotCache()
+    assert cache.get(loader, wait_timeout=1) == {"ready_nodes": 1}
+
+    # Dentro do TTL não há nova busca
+    assert cache.get(loader, max_age=60) == {"ready_nodes": 1}
+    assert len(calls) == 1
+
+    # Vencido: retorna o valor antigo e agenda a atualização
+    cache._refreshed_at = time.time() - 120
+    assert cache.get(loader, max_age=60) == {"ready_nodes": 1}
+    deadline = time.time() + 1
+    while cache.get(loader, max_age=60) != {"ready_nodes": 2} and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get(loader, max_age=60) == {"ready_nodes": 2}
+
+
+def test_snapshot_keeps_legacy_available_values():
+    nodes = [make_node(True, "4", "16Gi"), make_node(False, "2", "8Gi")]
+    nodes[0].status.allocatable = {"cpu": "3800m", "memory": "16000000Ki", "pods": "110"}
+
+    snapshot = build_capacity_snapshot(nodes)
+
+    # CPU: capacity de todos os nodes; memória: allocatable - capacity, em Ki
+    assert snapshot["available"] == {"cpu": 6, "memory": 16000000 - 16 * 1024 * 1024}
+    assert snapshot["allocatable"]["cpu"] == 3.8
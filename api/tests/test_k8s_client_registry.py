@@ -0,0 +1,100 @@
+from unittest.mock import MagicMock
+
+from app.k8s.registry import K8sClientRegistry, credentials_fingerprint
+
+
+def make_cluster(cluster_id=1, api_address="https://k8s.local:6443", token="token-a"):
+    cluster = MagicMock()
+    cluster.id = cluster_id
+    cluster.api_address = api_address
+    cluster.token = token
+    return cluster
+
+
+def test_registry_reuses_client_for_same_cluster():
+    registry = K8sClientRegistry()
+    cluster = make_cluster()
+
+    first = registry.get(cluster)
+    second = registry.get(cluster)
+
+    assert first is second
+    stats = registry.stats()
+    assert stats["size"] == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_registry_recreates_client_when_token_changes():
+    registry = K8sClientRegistry()
+    cluster = make_cluster()
+
+    first = registry.get(cluster)
+    cluster.token = "token-b"
+    second = registry.get(cluster)
+
+    assert first is not second
+    assert registry.stats()["size"] == 1
+    assert registry.stats()["misses"] == 2
+
+
+def test_registry_invalidate_drops_client():
+    registry = K8sClientRegistry()
+    cluster = make_cluster()
+
+    first = registry.get(cluster)
+    registry.invalidate(cluster.id)
+    second = registry.get(cluster)
+
+    assert first is not second
+    assert registry.stats()["invalidations"] == 1
+
+
+def test_replaced_client_stays_usable_during_grace_period():
+    registry = K8sClientRegistry(retire_grace_seconds=60)
+    cluster = make_cluster()
+
+    first = registry.get(cluster)
+    cluster.token = "token-b"
+    registry.get(cluster)
+    registry.get(cluster)
+
+    # Chamadas em andamento no cliente antigo ainda conseguem usar o apply_executor
+    assert first.apply_executor.submit(lambda: "ok").result() == "ok"
+    assert registry.stats()["retired"] == 1
+
+
+def test_replaced_client_is_closed_after_grace_period():
+    registry = K8sClientRegistry(retire_grace_seconds=0)
+    cluster = make_cluster()
+
+    first = registry.get(cluster)
+    first.close = MagicMock()
+    registry.invalidate(cluster.id)
+    first.close.assert_not_called()
+
+    registry.get(cluster)
+
+    first.close.assert_called_once()
+    assert registry.stats()["retired"] == 0
+
+
+def test_async_lookup_is_counted_once():
+    registry = K8sClientRegistry()
+    cluster = make_cluster()
+
+    first = registry.get_async(cluster)
+    second = registry.get_async(cluster)
+
+    assert first is second
+    assert first.breaker is registry.get(cluster).breaker
+    stats = registry.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+
+def test_fingerprint_does_not_expose_token():
+    fingerprint = credentials_fingerprint("https://k8s.local:6443", "super-secret")
+
+    assert "super-secret" not in fingerprint
+    assert fingerprint == credentials_fingerprint("https://k8s.local:6443", "super-secret")
+    assert fingerprint != credentials_fingerprint("https://other:6443", "super-secret")
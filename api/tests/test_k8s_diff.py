@@ -0,0 +1,100 @@
+import threading
+
+from kubernetes.client.rest import ApiException
+
+from app.k8s.client import K8sClient
+from app.k8s.diff import diff_objects, diff_result
+
+
+DEPLOYMENT = {
+    "apiVersion": "apps/v1",
+    "kind": "Deployment",
+    "metadata": {"name": "web", "namespace": "my-app"},
+    "spec": {"replicas": 2, "template": {"spec": {"containers": [{"name": "web", "image": "nginx:1.0"}]}}},
+}
+
+
+def test_diff_objects_reports_nested_paths():
+    before = {"spec": {"containers": [{"image": "nginx:1.0"}], "paused": True}}
+    after = {"spec": {"containers": [{"image": "nginx:1.1"}], "replicas": 3}}
+
+    assert diff_objects(before, after) == [
+        {"path": "spec.containers[0].image", "op": "replace", "before": "nginx:1.0", "after": "nginx:1.1"},
+        {"path": "spec.paused", "op": "remove", "before": True, "after": None},
+        {"path": "spec.replicas", "op": "add", "before": None, "after": 3},
+    ]
+
+
+def test_diff_result_ignores_volatile_metadata_and_masks_secrets():
+    live = {
+        "kind": "Secret",
+        "metadata": {"name": "s", "resourceVersion": "1", "managedFields": [{}]},
+        "data": {"password": "b2xk"},
+        "status": {},
+    }
+    desired = {"kind": "Secret", "metadata": {"name": "s", "resourceVersion": "2"}, "data": {"password": "bmV3"}}
+
+    result = diff_result({"kind": "Secret", "metadata": {"name": "s", "namespace": "ns"}}, live, desired)
+
+    assert result["action"] == "update"
+    assert result["changes"] == [{"path": "data.password", "op": "replace", "before": "***", "after": "***"}]
+
+
+def test_diff_documents_uses_dry_run_against_live_state():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    dry_runs = []
+
+    def server_side_apply(document, dry_run=False):
+        dry_runs.append(dry_run)
+        return {**document, "status": {"replicas": 2}}
+
+    live_objects = {"web": {**DEPLOYMENT, "spec": {**DEPLOYMENT["spec"], "template": {"spec": {"containers": [{"name": "web", "image": "nginx:0.9"}]}}}}}
+    k8s_client.get_object = lambda document: live_objects.get(document["metadata"]["name"])
+    k8s_client.server_side_apply = server_side_apply
+
+    service = {"apiVersion": "v1", "kind": "Service", "metadata": {"name": "web-svc", "namespace": "my-app"}, "spec": {}}
+    results = k8s_client.diff_documents([DEPLOYMENT, service, None])
+
+    assert dry_runs == [True, True]
+    assert [(r["kind"], r["action"]) for r in results] == [("Deployment", "update"), ("Service", "create")]
+    assert results[0]["changes"] == [{
+        "path": "spec.template.spec.containers[0].image", "op": "replace", "before": "nginx:0.9", "after": "nginx:1.0",
+    }]
+    k8s_client.close()
+
+
+def test_diff_documents_reports_validation_errors():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    error = ApiException(status=422, reason="Unprocessable Entity")
+    error.body = '{"message": "spec.replicas: Invalid value: -1"}'
+
+    def server_side_apply(document, dry_run=False):
+        raise error
+
+    k8s_client.get_object = lambda document: DEPLOYMENT
+    k8s_client.server_side_apply = server_side_apply
+
+    results = k8s_client.diff_documents([DEPLOYMENT])
+
+    assert results[0]["action"] == "error"
+    assert results[0]["error"] == "spec.replicas: Invalid value: -1"
+    k8s_client.close()
+
+
+def test_diff_documents_does_not_use_apply_pool():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.get_object = lambda document: DEPLOYMENT
+    k8s_client.server_side_apply = lambda document, dry_run=False: document
+    release = threading.Event()
+    # Ocupa todos os workers do apply_executor: o diff não pode depender deles
+    blocked = [k8s_client.apply_executor.submit(release.wait) for _ in range(k8s_client.apply_executor._max_workers)]
+
+    try:
+        results = k8s_client.diff_documents([DEPLOYMENT])
+    finally:
+        release.set()
+        for future in blocked:
+            future.result()
+        k8s_client.close()
+
+    assert results[0]["action"] == "unchanged"
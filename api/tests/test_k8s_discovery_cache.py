@@ -0,0 +1,87 @@
+from unittest.mock import MagicMock
+
+from kubernetes.client.rest import ApiException
+
+from app.k8s import discovery
+from app.k8s.client import K8sClient
+from app.k8s.discovery import DiscoveryCache
+
+
+def test_discovery_cache_caches_found_values():
+    cache = DiscoveryCache(ttl=60, negative_ttl=10)
+    loader = MagicMock(return_value=(True, discovery.FOUND))
+
+    assert cache.get("key", loader) is True
+    assert cache.get("key", loader) is True
+
+    assert loader.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_discovery_cache_does_not_cache_errors():
+    cache = DiscoveryCache(ttl=60, negative_ttl=10)
+    loader = MagicMock(return_value=(False, discovery.ERROR))
+
+    cache.get("key", loader)
+    cache.get("key", loader)
+
+    assert loader.call_count == 2
+
+
+def test_discovery_cache_negative_entries_expire():
+    cache = DiscoveryCache(ttl=60, negative_ttl=0)
+    loader = MagicMock(return_value=(False, discovery.NOT_FOUND))
+
+    cache.get("key", loader)
+    cache.get("key", loader)
+
+    assert loader.call_count == 2
+
+
+def test_discovery_cache_refresh_bypasses_cache():
+    cache = DiscoveryCache(ttl=60, negative_ttl=10)
+    loader = MagicMock(return_value=(True, discovery.FOUND))
+
+    cache.get("key", loader)
+    cache.get("key", loader, refresh=True)
+
+    assert loader.call_count == 2
+
+
+def test_check_api_available_caches_404():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.api_client = MagicMock()
+    k8s_client.api_client.call_api.side_effect = ApiException(status=404)
+
+    assert k8s_client.check_api_available("gateway.networking.k8s.io") is False
+    assert k8s_client.check_api_available("gateway.networking.k8s.io") is False
+
+    assert k8s_client.api_client.call_api.call_count == 1
+
+
+def test_get_gateway_api_resources_walks_group_versions():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.api_client = MagicMock()
+
+    def call_api(path, method, **kwargs):
+        if path == "/apis/gateway.networking.k8s.io":
+            return ({"versions": [
+                {"groupVersion": "gateway.networking.k8s.io/v1"},
+                {"groupVersion": "gateway.networking.k8s.io/v1alpha2"},
+            ]}, 200, {})
+        if path == "/apis/gateway.networking.k8s.io/v1":
+            return ({"resources": [
+                {"name": "httproutes", "kind": "HTTPRoute"},
+                {"name": "httproutes/status", "kind": "HTTPRoute"},
+                {"name": "gateways", "kind": "Gateway"},
+            ]}, 200, {})
+        return ({"resources": [{"name": "tcproutes", "kind": "TCPRoute"}]}, 200, {})
+
+    k8s_client.api_client.call_api.side_effect = call_api
+
+    resources = k8s_client.get_gateway_api_resources()
+    cached_resources = k8s_client.get_gateway_api_resources()
+
+    assert resources == ["Gateway", "HTTPRoute", "TCPRoute"]
+    assert cached_resources == resources
+    assert k8s_client.api_client.call_api.call_count == 3
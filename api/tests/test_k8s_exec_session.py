@@ -0,0 +1,100 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+from app.k8s.async_client import (
+    ERROR_CHANNEL,
+    RESIZE_CHANNEL,
+    STDERR_CHANNEL,
+    STDIN_CHANNEL,
+    STDOUT_CHANNEL,
+    AsyncK8sClient,
+)
+
+
+class FakeUpstream:
+    """WebSocket de exec do pod: ecoa o stdin no stdout e termina ao receber 'exit'."""
+
+    def __init__(self):
+        self.sent = []
+        self.queue = asyncio.Queue()
+
+    async def send(self, message: bytes):
+        self.sent.append(message)
+        if message[0] == STDIN_CHANNEL:
+            if message[1:] == b"exit":
+                await self.queue.put(bytes([STDERR_CHANNEL]) + b"bye")
+                await self.queue.put(bytes([ERROR_CHANNEL]) + json.dumps({
+                    "status": "Failure",
+                    "details": {"causes": [{"reason": "ExitCode", "message": "3"}]},
+                }).encode())
+                await self.queue.put(None)
+            else:
+                # Caractere multibyte dividido entre duas mensagens
+                payload = message[1:]
+                await self.queue.put(bytes([STDOUT_CHANNEL]) + payload[:-1])
+                await self.queue.put(bytes([STDOUT_CHANNEL]) + payload[-1:])
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.queue.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+class FakeClientWebSocket:
+    def __init__(self, messages):
+        self.incoming = list(messages)
+        self.outgoing = []
+
+    async def receive(self):
+        if self.incoming:
+            return self.incoming.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send_json(self, data):
+        self.outgoing.append(data)
+
+
+def make_client(upstream):
+    k8s_client = AsyncK8sClient(url="https://k8s.local:6443", token="token")
+
+    @asynccontextmanager
+    async def connect_exec(*args, **kwargs):
+        assert kwargs["stdin"] is True
+        yield upstream
+
+    k8s_client.connect_exec = connect_exec
+    return k8s_client
+
+
+def test_exec_session_proxies_channels_and_returns_exit_code():
+    upstream = FakeUpstream()
+    websocket = FakeClientWebSocket([
+        {"type": "websocket.receive", "text": json.dumps({"type": "resize", "cols": 120, "rows": 40})},
+        {"type": "websocket.receive", "text": json.dumps({"type": "stdin", "data": "olá"})},
+        {"type": "websocket.receive", "bytes": b"exit"},
+    ])
+
+    return_code = asyncio.run(
+        make_client(upstream).exec_session(websocket, "my-app", "web-abc", ["/bin/sh"], tty=True)
+    )
+
+    assert return_code == 3
+    assert upstream.sent[0] == bytes([RESIZE_CHANNEL]) + b'{"Width": 120, "Height": 40}'
+    assert "".join(m["data"] for m in websocket.outgoing if m["type"] == "stdout") == "olá"
+    assert websocket.outgoing[-1] == {"type": "stderr", "data": "bye"}
+
+
+def test_exec_session_returns_none_when_client_disconnects():
+    upstream = FakeUpstream()
+    websocket = FakeClientWebSocket([{"type": "websocket.disconnect", "code": 1000}])
+
+    return_code = asyncio.run(
+        make_client(upstream).exec_session(websocket, "my-app", "web-abc", ["/bin/sh"])
+    )
+
+    assert return_code is None
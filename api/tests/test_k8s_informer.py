@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from kubernetes.client.rest import ApiException
+
+from app.k8s.informer import INFORMER_RESOURCES, IndexedStore, Informer, InformerManager
+
+
+def pod(name, app=None, resource_version="1"):
+    labels = {"app": app} if app else {}
+    return {"metadata": {"name": name, "labels": labels, "resourceVersion": resource_version}}
+
+
+class FakeResponse:
+    def __init__(self, data=b"", lines=()):
+        self.data = data
+        self._lines = lines
+
+    def stream(self, amt=None, decode_content=False):
+        for line in self._lines:
+            yield (json.dumps(line) + "\n").encode()
+        # Mantém o watch "aberto" até o teste terminar
+        time.sleep(0.5)
+
+    def release_conn(self):
+        pass
+
+
+def test_indexed_store_updates_indexes():
+    store = IndexedStore(INFORMER_RESOURCES["pods"]["indexes"])
+    store.replace([pod("web-1", app="web"), pod("worker-1", app="worker")])
+
+    store.upsert(pod("web-1", app="api"))
+    store.delete(pod("worker-1", app="worker"))
+
+    assert store.by_index("app", "web") == []
+    assert [p["metadata"]["name"] for p in store.by_index("app", "api")] == ["web-1"]
+    assert len(store) == 1
+
+
+def test_informer_serves_list_and_watch_events():
+    k8s_client = MagicMock()
+    list_body = {"metadata": {"resourceVersion": "10"}, "items": [pod("web-1", app="web")]}
+    watch_events = [{"type": "ADDED", "object": pod("web-2", app="web", resource_version="11")}]
+
+    def call_api(path, method, query_params=None, **kwargs):
+        if ("watch", "true") in query_params:
+            return (FakeResponse(lines=watch_events), 200, {})
+        return (FakeResponse(data=json.dumps(list_body).encode()), 200, {})
+
+    k8s_client.api_client.call_api.side_effect = call_api
+    informers = InformerManager(k8s_client, enabled=True)
+
+    store = informers.get_store("pods", "app", wait_timeout=2)
+    deadline = time.monotonic() + 2
+    while len(store) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    informers.stop()
+
+    assert sorted(p["metadata"]["name"] for p in store.by_index("app", "web")) == ["web-1", "web-2"]
+
+
+def test_informer_list_is_paginated():
+    k8s_client = MagicMock()
+    pages = {
+        None: {"metadata": {"continue": "page-2", "resourceVersion": "10"}, "items": [pod("web-1", app="web")]},
+        "page-2": {"metadata": {"resourceVersion": "10"}, "items": [pod("web-2", app="web")]},
+    }
+    calls = []
+
+    def call_api(path, method, query_params=None, **kwargs):
+        calls.append(dict(query_params))
+        return (FakeResponse(data=json.dumps(pages[dict(query_params).get("continue")]).encode()), 200, {})
+
+    k8s_client.api_client.call_api.side_effect = call_api
+    informer = Informer(k8s_client, "pods", "app", list_chunk_size=1)
+
+    informer._list()
+
+    assert calls == [{"limit": 1}, {"limit": 1, "continue": "page-2"}]
+    assert len(informer.store) == 2
+    assert informer.resource_version == "10"
+    assert informer.synced
+
+
+def wait_until(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_failed_watch_marks_informer_unsynced():
+    k8s_client = MagicMock()
+    list_body = {"metadata": {"resourceVersion": "10"}, "items": [pod("web-1", app="web")]}
+
+    def call_api(path, method, query_params=None, **kwargs):
+        if ("watch", "true") in query_params:
+            raise ApiException(status=500, reason="Internal Server Error")
+        return (FakeResponse(data=json.dumps(list_body).encode()), 200, {})
+
+    k8s_client.api_client.call_api.side_effect = call_api
+    informer = Informer(k8s_client, "pods", "app")
+    informer.start()
+
+    try:
+        assert informer.wait_for_sync(2)
+        # Após a falha do watch, os leitores voltam a consultar a API até um novo LIST
+        assert wait_until(lambda: not informer.synced)
+        assert informer.resource_version is None
+    finally:
+        informer.stop()
+
+
+def test_stop_interrupts_quiet_watch():
+    interrupted = threading.Event()
+
+    class QuietResponse(FakeResponse):
+        connection = SimpleNamespace(sock=SimpleNamespace(shutdown=lambda how: interrupted.set()))
+
+        def stream(self, amt=None, decode_content=False):
+            interrupted.wait(30)
+            return
+            yield
+
+    k8s_client = MagicMock()
+    list_body = {"metadata": {"resourceVersion": "10"}, "items": []}
+
+    def call_api(path, method, query_params=None, **kwargs):
+        if ("watch", "true") in query_params:
+            return (QuietResponse(), 200, {})
+        return (FakeResponse(data=json.dumps(list_body).encode()), 200, {})
+
+    k8s_client.api_client.call_api.side_effect = call_api
+    informer = Informer(k8s_client, "pods", "app")
+    informer.start()
+    assert wait_until(lambda: informer._response is not None)
+
+    informer.stop()
+
+    assert wait_until(lambda: not informer.alive)
+
+
+def test_informers_disabled_by_default():
+    assert InformerManager(MagicMock(), enabled=False).get_store("pods", "app") is None
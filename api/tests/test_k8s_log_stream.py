@@ -0,0 +1,88 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.k8s import metrics
+from app.k8s.async_client import AsyncK8sClient
+from app.k8s.breaker import CircuitBreaker
+
+
+def make_client(handler):
+    k8s_client = AsyncK8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.http = httpx.AsyncClient(base_url=k8s_client.url, transport=httpx.MockTransport(handler))
+    return k8s_client
+
+
+async def collect(k8s_client, sse=False, **kwargs):
+    response = await k8s_client.open_pod_log_stream("my-app", "web-abc", **kwargs)
+    return b"".join([chunk async for chunk in k8s_client.iter_log_stream(response, sse=sse)])
+
+
+def test_stream_forwards_parameters_and_body():
+    seen = {}
+
+    def handler(request):
+        seen.update(request.url.params)
+        return httpx.Response(200, content=b"line 1\nline 2\n")
+
+    k8s_client = make_client(handler)
+    body = asyncio.run(collect(k8s_client, follow=True, since_seconds=60, timestamps=True, limit_bytes=1024))
+
+    assert body == b"line 1\nline 2\n"
+    assert seen == {"follow": "true", "sinceSeconds": "60", "timestamps": "true", "limitBytes": "1024"}
+
+
+def test_stream_as_server_sent_events():
+    k8s_client = make_client(lambda request: httpx.Response(200, content=b"line 1\nline 2\n"))
+
+    body = asyncio.run(collect(k8s_client, sse=True))
+
+    assert body == b": connected\n\ndata: line 1\n\ndata: line 2\n\nevent: end\ndata: \n\n"
+
+
+def test_stream_missing_pod_raises_before_streaming():
+    k8s_client = make_client(lambda request: httpx.Response(404, json={"reason": "NotFound"}))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(collect(k8s_client))
+    assert error.value.status_code == 404
+
+
+def test_stream_ends_on_idle_timeout():
+    class IdleStream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield b"line 1\n"
+            raise httpx.ReadTimeout("idle")
+
+    k8s_client = make_client(lambda request: httpx.Response(200, stream=IdleStream()))
+
+    body = asyncio.run(collect(k8s_client, sse=True, follow=True))
+
+    assert body == b": connected\n\ndata: line 1\n\nevent: idle-timeout\ndata: \n\n"
+
+
+def test_stream_is_recorded_in_metrics():
+    metrics.api_metrics.reset()
+    k8s_client = make_client(lambda request: httpx.Response(200, content=b"line 1\n"))
+    k8s_client.cluster_name = "prod"
+
+    asyncio.run(collect(k8s_client))
+
+    assert 'tron_k8s_api_requests_total{cluster="prod",verb="GET",resource="pods/log"' in metrics.api_metrics.render()
+
+
+def test_stream_respects_open_breaker():
+    calls = []
+    k8s_client = make_client(lambda request: calls.append(request) or httpx.Response(503))
+    k8s_client.breaker = CircuitBreaker(failure_threshold=1, base_backoff=60)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(collect(k8s_client))
+        assert error.value.status_code == 503
+
+    # A primeira falha abre o circuito; a segunda chamada não chega ao API server
+    assert len(calls) == 1
+    assert k8s_client.breaker.snapshot()["state"] == "open"
@@ -0,0 +1,113 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from kubernetes.client.rest import ApiException
+
+from app.k8s import metrics
+from app.k8s.async_client import AsyncK8sClient
+from app.k8s.client import K8sClient
+from app.k8s.metrics import ApiCallMetrics, debug_headers, resource_from_path, start_request_stats
+
+
+def test_resource_from_path():
+    assert resource_from_path("https://k8s.local/api/v1/namespaces/app/pods/web-1/log?follow=true") == "pods/log"
+    assert resource_from_path("/api/v1/namespaces/app/pods") == "pods"
+    assert resource_from_path("/apis/apps/v1/namespaces/app/deployments/web") == "deployments"
+    assert resource_from_path("/api/v1/namespaces") == "namespaces"
+    assert resource_from_path("/api/v1/namespaces/app") == "namespaces"
+    assert resource_from_path("/apis/gateway.networking.k8s.io") == "discovery"
+    assert resource_from_path("/version") == "version"
+
+
+def test_render_exports_histogram_status_and_bytes():
+    api_metrics = ApiCallMetrics(buckets=(0.1, 1))
+    api_metrics.observe("prod", "GET", "pods", "WebappService.get_webapp_pods", 200, 0.05, bytes_in=100)
+    api_metrics.observe("prod", "GET", "pods", "WebappService.get_webapp_pods", 500, 0.5, retries=1)
+
+    text = api_metrics.render()
+
+    labels = 'cluster="prod",verb="GET",resource="pods",operation="WebappService.get_webapp_pods"'
+    assert f'tron_k8s_api_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'tron_k8s_api_request_duration_seconds_bucket{{{labels},le="1"}} 2' in text
+    assert f'tron_k8s_api_request_duration_seconds_count{{{labels}}} 2' in text
+    assert f'tron_k8s_api_requests_total{{{labels},code="500"}} 1' in text
+    assert f"tron_k8s_api_response_bytes_total{{{labels}}} 100" in text
+    assert f"tron_k8s_api_retries_total{{{labels}}} 1" in text
+
+
+def test_sync_client_records_every_call(monkeypatch):
+    # Os testes fazem o papel de app/services na identificação da operação
+    monkeypatch.setattr(metrics, "_SERVICES_DIR", "tests" + os.sep)
+    metrics.api_metrics.reset()
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token", cluster_name="prod")
+    response = MagicMock(status=200, data=b'{"items": []}')
+    response.retries = None
+    k8s_client.api_client.rest_client = MagicMock()
+    k8s_client.api_client.rest_client.GET.return_value = response
+    k8s_client.api_client.rest_client.DELETE.side_effect = ApiException(status=404, reason="Not Found")
+
+    k8s_client.api_client.request("GET", "https://k8s.local:6443/api/v1/namespaces/app/pods")
+    try:
+        k8s_client.api_client.request("DELETE", "https://k8s.local:6443/api/v1/namespaces/app/pods/web-1")
+    except ApiException:
+        pass
+
+    text = metrics.api_metrics.render()
+    assert 'cluster="prod",verb="GET",resource="pods"' in text
+    assert 'verb="DELETE",resource="pods",operation="test_sync_client_records_every_call",code="404"} 1' in text
+
+
+def test_async_client_records_calls():
+    metrics.api_metrics.reset()
+    k8s_client = AsyncK8sClient(url="https://k8s.local:6443", token="token", cluster_name="prod")
+    k8s_client.http = httpx.AsyncClient(
+        base_url=k8s_client.url,
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"items": [], "metadata": {}})),
+    )
+
+    asyncio.run(k8s_client.list_pods("app"))
+
+    assert 'tron_k8s_api_requests_total{cluster="prod",verb="GET",resource="pods"' in metrics.api_metrics.render()
+
+
+def test_worker_calls_keep_caller_operation_and_request_stats(monkeypatch):
+    monkeypatch.setattr(metrics, "_SERVICES_DIR", "tests" + os.sep)
+    api_metrics = ApiCallMetrics()
+    stats = start_request_stats()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        metrics.submit_with_context(
+            executor, api_metrics.record, "prod", "GET", "/api/v1/namespaces/app/pods", 200, 0.01
+        ).result()
+
+    assert 'operation="test_worker_calls_keep_caller_operation_and_request_stats"' in api_metrics.render()
+    assert stats["calls"] == 1
+    assert debug_headers(stats)["X-K8s-Calls"] == "1"
+
+
+def test_debug_headers_reach_sync_endpoints():
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def k8s_debug_headers(request, call_next):
+        stats = start_request_stats()
+        response = await call_next(request)
+        response.headers.update(debug_headers(stats))
+        return response
+
+    @app.get("/pods")
+    def list_pods():
+        metrics.api_metrics.observe("prod", "GET", "pods", "list_pods", 200, 0.02)
+        metrics.api_metrics.observe("prod", "GET", "pods", "list_pods", 503, 0.01)
+        return []
+
+    response = TestClient(app).get("/pods")
+
+    assert response.headers["X-K8s-Calls"] == "2"
+    assert response.headers["X-K8s-Errors"] == "1"
+    assert float(response.headers["X-K8s-Time-Ms"]) > 0
@@ -0,0 +1,48 @@
+from unittest.mock import MagicMock, patch
+
+from kubernetes.client.rest import ApiException
+
+from app.k8s.client import K8sClient
+
+
+def make_client():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.api_client = MagicMock()
+    k8s_client.api_client.call_api.return_value = ({}, 200, {})
+    return k8s_client
+
+
+def test_ensure_namespace_exists_checks_cluster_once():
+    k8s_client = make_client()
+
+    with patch("app.k8s.client.client.CoreV1Api") as core_v1:
+        k8s_client.ensure_namespace_exists("app")
+        k8s_client.ensure_namespace_exists("app")
+
+    assert core_v1.return_value.read_namespace.call_count == 1
+    assert "app" in k8s_client.known_namespaces
+
+
+def test_ensure_namespace_exists_tolerates_concurrent_create():
+    k8s_client = make_client()
+
+    with patch("app.k8s.client.client.CoreV1Api") as core_v1:
+        core_v1.return_value.read_namespace.side_effect = ApiException(status=404)
+        core_v1.return_value.create_namespace.side_effect = ApiException(status=409)
+        k8s_client.ensure_namespace_exists("app")
+
+    assert "app" in k8s_client.known_namespaces
+
+
+def test_repeated_apply_makes_no_namespace_calls():
+    k8s_client = make_client()
+    documents = [{"apiVersion": "v1", "kind": "ConfigMap", "metadata": {"name": "web", "namespace": "app"}}]
+
+    with patch("app.k8s.client.client.CoreV1Api") as core_v1:
+        k8s_client.apply_or_delete_yaml_to_k8s(documents, operation="apply")
+        k8s_client.apply_or_delete_yaml_to_k8s(documents, operation="apply")
+        assert core_v1.return_value.read_namespace.call_count == 1
+
+        k8s_client.delete_namespace("app")
+
+    assert "app" not in k8s_client.known_namespaces
@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.k8s.async_client import AsyncK8sClient
+from app.k8s.client import list_all_items
+from app.services.cron import CronService
+
+
+def make_client(handler):
+    k8s_client = AsyncK8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.http = httpx.AsyncClient(base_url=k8s_client.url, transport=httpx.MockTransport(handler))
+    return k8s_client
+
+
+def event(name):
+    return {"metadata": {"name": name}, "firstTimestamp": "2024-01-01T10:00:00Z"}
+
+
+def test_list_all_items_follows_continue_tokens():
+    calls = []
+    pages = {None: (["a", "b"], "next"), "next": (["c"], None)}
+
+    def list_func(**kwargs):
+        calls.append(kwargs)
+        items, token = pages[kwargs.get("_continue")]
+        return SimpleNamespace(items=items, metadata=SimpleNamespace(_continue=token))
+
+    items = list_all_items(list_func, namespace="my-app", label_selector=None)
+
+    assert items == ["a", "b", "c"]
+    assert "label_selector" not in calls[0]
+    assert all(call["limit"] > 0 for call in calls)
+
+
+def test_async_list_events_reads_all_pages():
+    def handler(request):
+        if request.url.params.get("continue") == "page-2":
+            return httpx.Response(200, json={"items": [event("e3")], "metadata": {}})
+        return httpx.Response(200, json={"items": [event("e1"), event("e2")], "metadata": {"continue": "page-2"}})
+
+    events = asyncio.run(make_client(handler).list_events("my-app"))
+
+    assert [e["name"] for e in events] == ["e1", "e2", "e3"]
+
+
+def test_async_list_events_page_forwards_filters_and_token():
+    seen = {}
+
+    def handler(request):
+        seen.update(request.url.params)
+        return httpx.Response(200, json={"items": [event("e1")], "metadata": {"continue": "page-2"}})
+
+    events, next_token = asyncio.run(make_client(handler).list_events_page(
+        "my-app", limit=1, field_selector="type=Warning", label_selector="app=web"
+    ))
+
+    assert [e["name"] for e in events] == ["e1"]
+    assert next_token == "page-2"
+    assert seen == {"limit": "1", "fieldSelector": "type=Warning", "labelSelector": "app=web"}
+
+
+def test_async_list_page_expired_token():
+    k8s_client = make_client(lambda request: httpx.Response(410, json={"reason": "Expired"}))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(k8s_client.list_jobs_page("my-app", limit=10, continue_token="old"))
+    assert error.value.status_code == 410
+
+
+def job(name):
+    return {"metadata": {"name": name}, "status": {}}
+
+
+def test_paginated_cron_jobs_fall_back_to_name_filter():
+    seen = []
+
+    def handler(request):
+        params = dict(request.url.params)
+        seen.append(params)
+        if "labelSelector" in params:
+            return httpx.Response(200, json={"items": [], "metadata": {}})
+        if params.get("continue") == "page-2":
+            return httpx.Response(200, json={"items": [job("backup-3")], "metadata": {}})
+        return httpx.Response(200, json={"items": [job("backup-1"), job("other-1")], "metadata": {"continue": "page-2"}})
+
+    k8s_client = make_client(handler)
+
+    def get_jobs(continue_token=None):
+        with patch.object(CronService, "_get_cron_deployment", return_value=("cluster", "my-app", "backup")), \
+                patch("app.services.cron.get_async_k8s_client", return_value=k8s_client):
+            return asyncio.run(CronService.get_cron_jobs_async(MagicMock(), "uuid", limit=2, continue_token=continue_token))
+
+    jobs, next_token = get_jobs()
+    assert [j["name"] for j in jobs] == ["backup-1"]
+    assert next_token == "name:page-2"
+
+    jobs, next_token = get_jobs(next_token)
+    assert [j["name"] for j in jobs] == ["backup-3"]
+    assert next_token is None
+    # A página seguinte continua a busca por nome, sem voltar ao seletor app=<cron>
+    assert seen[-1] == {"limit": "2", "continue": "page-2"}
@@ -0,0 +1,130 @@
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from app.k8s import usage
+from app.k8s.async_client import AsyncK8sClient
+from app.k8s.client import K8sClient
+from app.services.webapp import WebappService
+
+
+POD_METRICS = {
+    "items": [
+        {
+            "metadata": {"name": "web-1"},
+            "containers": [
+                {"name": "web", "usage": {"cpu": "250000000n", "memory": "262144Ki"}},
+                {"name": "sidecar", "usage": {"cpu": "50m", "memory": "64Mi"}},
+            ],
+        },
+        {"metadata": {"name": "worker-1"}, "containers": [{"name": "worker", "usage": {"cpu": "1", "memory": "1Gi"}}]},
+    ],
+    "metadata": {},
+}
+
+
+def test_build_pod_usage_sums_containers():
+    pod_usage = usage.build_pod_usage(POD_METRICS["items"])
+
+    assert pod_usage == {
+        "web-1": {"cpu_usage": 0.3, "memory_usage": 320},
+        "worker-1": {"cpu_usage": 1.0, "memory_usage": 1024},
+    }
+
+
+def test_merge_and_aggregate_usage():
+    pods = [
+        {"name": "web-1", "cpu_requests": 0.25, "cpu_limits": 0.5, "memory_requests": 256, "memory_limits": 512},
+        {"name": "web-2", "cpu_requests": 0.25, "cpu_limits": 0.5, "memory_requests": 256, "memory_limits": 512},
+    ]
+
+    usage.merge_pod_usage(pods, usage.build_pod_usage(POD_METRICS["items"]))
+
+    assert pods[1]["cpu_usage"] is None and pods[1]["memory_usage"] is None
+    assert usage.aggregate_usage(pods) == {
+        "pods": 2,
+        "cpu_requests": 0.5,
+        "cpu_limits": 1.0,
+        "memory_requests": 512,
+        "memory_limits": 1024,
+        "cpu_usage": 0.3,
+        "memory_usage": 320,
+    }
+    assert usage.aggregate_usage(pods[1:])["cpu_usage"] is None
+
+
+def test_pod_metrics_cache_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(usage.time, "monotonic", lambda: now[0])
+    cache = usage.PodMetricsCache(ttl=15)
+
+    cache.set("app", {"web-1": {}})
+    now[0] += 10
+    assert cache.get("app") == {"web-1": {}}
+    now[0] += 10
+    assert cache.get("app") is None
+
+
+def test_sync_get_pod_usage_lists_once_per_ttl():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.check_api_available = MagicMock(return_value=True)
+    k8s_client.api_client = MagicMock()
+    k8s_client.api_client.call_api.return_value = (MagicMock(data=json.dumps(POD_METRICS).encode()), 200, {})
+
+    assert k8s_client.get_pod_usage("app")["web-1"] == {"cpu_usage": 0.3, "memory_usage": 320}
+    k8s_client.get_pod_usage("app")
+
+    k8s_client.api_client.call_api.assert_called_once()
+    assert k8s_client.api_client.call_api.call_args.args[0] == "/apis/metrics.k8s.io/v1beta1/namespaces/app/pods"
+
+
+def test_sync_get_pod_usage_without_metrics_server():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.check_api_available = MagicMock(return_value=False)
+    k8s_client.api_client = MagicMock()
+
+    assert k8s_client.get_pod_usage("app") == {}
+    k8s_client.api_client.call_api.assert_not_called()
+
+
+def make_async_client(handler):
+    k8s_client = AsyncK8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.http = httpx.AsyncClient(base_url=k8s_client.url, transport=httpx.MockTransport(handler))
+    return k8s_client
+
+
+def test_async_get_pod_usage():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json=POD_METRICS)
+
+    k8s_client = make_async_client(handler)
+
+    assert asyncio.run(k8s_client.get_pod_usage("app"))["worker-1"] == {"cpu_usage": 1.0, "memory_usage": 1024}
+    asyncio.run(k8s_client.get_pod_usage("app"))
+    assert calls == ["/apis/metrics.k8s.io/v1beta1/namespaces/app/pods"]
+
+
+def test_async_get_pod_usage_without_metrics_server():
+    k8s_client = make_async_client(lambda request: httpx.Response(404, json={"reason": "NotFound"}))
+
+    assert asyncio.run(k8s_client.get_pod_usage("app")) == {}
+
+
+def test_pods_endpoint_releases_db_session_before_calling_cluster():
+    db = MagicMock()
+
+    async def get_component_pods(cluster, namespace, component_name):
+        # A conexão do banco já foi devolvida ao pool quando o cluster é consultado
+        db.close.assert_called_once()
+        return []
+
+    with patch.object(WebappService, "_get_webapp_deployment", return_value=("cluster", "my-app", "web")), \
+            patch("app.services.webapp.get_component_pods_async", side_effect=get_component_pods) as pods:
+        assert asyncio.run(WebappService.get_webapp_pods_async(db, "uuid")) == []
+
+    pods.assert_called_once_with("cluster", "my-app", "web")
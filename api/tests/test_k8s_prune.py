@@ -0,0 +1,120 @@
+import json
+from unittest.mock import MagicMock
+
+from kubernetes.client.rest import ApiException
+
+from app.k8s.apply import COMPONENT_UUID_LABEL, MANAGED_BY_LABEL, get_component_uuid, stamp_component_labels
+from app.k8s.client import K8sClient
+
+
+UUID = "0b5c3a0e-1111-2222-3333-444455556666"
+
+
+def render():
+    documents = [
+        {"apiVersion": "v1", "kind": "Service", "metadata": {"name": "web", "namespace": "app"}},
+        {"apiVersion": "apps/v1", "kind": "Deployment", "metadata": {"name": "web", "namespace": "app"}},
+    ]
+    return [stamp_component_labels(document, UUID) for document in documents]
+
+
+def make_client(live: dict, gateway_kinds=("HTTPRoute",)):
+    """`live` mapeia o path da coleção para os nomes dos objetos com as labels do componente."""
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.known_namespaces.add("app")
+    k8s_client.check_api_available = MagicMock(return_value=bool(gateway_kinds))
+    k8s_client.get_gateway_api_resources = MagicMock(return_value=list(gateway_kinds))
+    k8s_client.cleanup_orphaned_gateway_resources = MagicMock()
+
+    def call_api(path, method, **kwargs):
+        if method == "GET":
+            names = live.get(path, [])
+            body = {"items": [{"metadata": {"name": name}} for name in names], "metadata": {}}
+            return MagicMock(data=json.dumps(body).encode()), 200, {}
+        return {}, 200, {}
+
+    k8s_client.api_client = MagicMock()
+    k8s_client.api_client.call_api.side_effect = call_api
+    return k8s_client
+
+
+def deleted_paths(k8s_client):
+    return [
+        c.args[0] for c in k8s_client.api_client.call_api.call_args_list
+        if c.args[1] == "DELETE"
+    ]
+
+
+def test_stamp_component_labels_only_touches_metadata():
+    document = {
+        "kind": "Deployment",
+        "metadata": {"name": "web", "labels": {"app": "web"}},
+        "spec": {"selector": {"matchLabels": {"app": "web"}}},
+    }
+
+    stamped = stamp_component_labels(document, UUID)
+
+    assert stamped["metadata"]["labels"] == {"app": "web", MANAGED_BY_LABEL: "tron", COMPONENT_UUID_LABEL: UUID}
+    assert stamped["spec"] == document["spec"]
+    assert document["metadata"]["labels"] == {"app": "web"}
+    assert get_component_uuid(stamped) == UUID
+
+
+def test_apply_prunes_objects_not_rendered():
+    k8s_client = make_client({
+        "/api/v1/namespaces/app/services": ["web"],
+        "/api/v1/namespaces/app/configmaps": ["web-env"],
+        "/apis/autoscaling/v2/namespaces/app/horizontalpodautoscalers": ["web"],
+        "/apis/gateway.networking.k8s.io/v1/namespaces/app/httproutes": ["web"],
+    })
+
+    report = k8s_client.apply_or_delete_yaml_to_k8s(render(), operation="apply")
+
+    assert sorted(deleted_paths(k8s_client)) == [
+        "/api/v1/namespaces/app/configmaps/web-env",
+        "/apis/autoscaling/v2/namespaces/app/horizontalpodautoscalers/web",
+        "/apis/gateway.networking.k8s.io/v1/namespaces/app/httproutes/web",
+    ]
+    assert sorted(r["kind"] for r in report["results"] if r["status"] == "pruned") == [
+        "ConfigMap", "HTTPRoute", "HorizontalPodAutoscaler",
+    ]
+    k8s_client.cleanup_orphaned_gateway_resources.assert_not_called()
+
+
+def test_prune_lists_each_kind_once_with_label_selector():
+    k8s_client = make_client({}, gateway_kinds=())
+
+    k8s_client.prune_component_resources("app", UUID, render())
+
+    gets = [c for c in k8s_client.api_client.call_api.call_args_list if c.args[1] == "GET"]
+    paths = [c.args[0] for c in gets]
+    assert len(paths) == len(set(paths)) == 5
+    assert not any("gateway.networking.k8s.io" in path for path in paths)
+    for c in gets:
+        assert ("labelSelector", f"{MANAGED_BY_LABEL}=tron,{COMPONENT_UUID_LABEL}={UUID}") in c.kwargs["query_params"]
+
+
+def test_prune_failure_does_not_fail_apply():
+    k8s_client = make_client({"/api/v1/namespaces/app/configmaps": ["web-env"]})
+    call_api = k8s_client.api_client.call_api.side_effect
+
+    def failing_delete(path, method, **kwargs):
+        if method == "DELETE":
+            raise ApiException(status=403, reason="Forbidden")
+        return call_api(path, method, **kwargs)
+
+    k8s_client.api_client.call_api.side_effect = failing_delete
+
+    report = k8s_client.apply_or_delete_yaml_to_k8s(render(), operation="apply")
+
+    assert [r["status"] for r in report["results"] if r["kind"] == "ConfigMap"] == ["prune_error"]
+
+
+def test_unlabelled_documents_use_legacy_cleanup():
+    k8s_client = make_client({})
+    documents = [{"apiVersion": "v1", "kind": "Service", "metadata": {"name": "web", "namespace": "app"}}]
+
+    k8s_client.apply_or_delete_yaml_to_k8s(documents, operation="apply")
+
+    k8s_client.cleanup_orphaned_gateway_resources.assert_called_once_with("app", "web", documents)
+    assert deleted_paths(k8s_client) == []
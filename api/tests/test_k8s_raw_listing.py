@@ -0,0 +1,82 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import httpx
+
+from app.k8s.async_client import AsyncK8sClient
+from app.k8s.client import PARTIAL_OBJECT_METADATA_ACCEPT, K8sClient
+
+
+POD = {
+    "metadata": {"name": "web-1", "creationTimestamp": "2024-01-01T10:00:00Z"},
+    "spec": {"containers": [{"name": "web", "resources": {"requests": {"cpu": "250m", "memory": "256Mi"}}}]},
+    "status": {"phase": "Running", "hostIP": "10.0.0.1", "containerStatuses": [{"restartCount": 2}]},
+}
+
+
+def make_client(pages):
+    """`pages` mapeia o continue token recebido para o corpo JSON da página."""
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.api_client = MagicMock()
+
+    def call_api(path, method, query_params=None, **kwargs):
+        token = dict(query_params).get("continue")
+        return MagicMock(data=json.dumps(pages[token]).encode()), 200, {}
+
+    k8s_client.api_client.call_api.side_effect = call_api
+    return k8s_client
+
+
+def test_list_pods_parses_raw_json_without_models():
+    k8s_client = make_client({None: {"items": [POD], "metadata": {}}})
+
+    pods = k8s_client.list_pods("my-app", label_selector="app=web")
+
+    assert pods[0]["name"] == "web-1"
+    assert pods[0]["status"] == "Running"
+    assert pods[0]["restarts"] == 2
+    assert pods[0]["cpu_requests"] == 0.25
+    assert pods[0]["memory_requests"] == 256
+    assert pods[0]["host_ip"] == "10.0.0.1"
+
+    call = k8s_client.api_client.call_api.call_args
+    assert call.kwargs["_preload_content"] is False
+    assert ("labelSelector", "app=web") in call.kwargs["query_params"]
+
+
+def test_list_jobs_follows_continue_tokens():
+    job = {"metadata": {"name": "job-1"}, "status": {"succeeded": 1}}
+    k8s_client = make_client({
+        None: {"items": [job], "metadata": {"continue": "page-2"}},
+        "page-2": {"items": [{**job, "metadata": {"name": "job-2"}}], "metadata": {}},
+    })
+
+    jobs = k8s_client.list_jobs("my-app")
+
+    assert sorted(j["name"] for j in jobs) == ["job-1", "job-2"]
+    assert all(j["status"] == "Succeeded" for j in jobs)
+
+
+def test_list_pod_names_requests_metadata_only():
+    k8s_client = make_client({None: {"items": [{"metadata": {"name": "web-1"}}], "metadata": {}}})
+
+    assert k8s_client.list_pod_names("my-app", label_selector="job-name=job-1") == ["web-1"]
+
+    call = k8s_client.api_client.call_api.call_args
+    assert call.args[0] == "/api/v1/namespaces/my-app/pods"
+    assert call.kwargs["header_params"]["Accept"] == PARTIAL_OBJECT_METADATA_ACCEPT
+
+
+def test_async_list_pod_names_requests_metadata_only():
+    seen = {}
+
+    def handler(request):
+        seen["accept"] = request.headers["accept"]
+        return httpx.Response(200, json={"items": [{"metadata": {"name": "web-1"}}], "metadata": {}})
+
+    k8s_client = AsyncK8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.http = httpx.AsyncClient(base_url=k8s_client.url, transport=httpx.MockTransport(handler))
+
+    assert asyncio.run(k8s_client.list_pod_names("my-app")) == ["web-1"]
+    assert seen["accept"] == PARTIAL_OBJECT_METADATA_ACCEPT
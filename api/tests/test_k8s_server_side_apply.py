@@ -0,0 +1,67 @@
+from unittest.mock import MagicMock
+
+from app.k8s.client import K8sClient, resource_collection_path
+
+
+def make_client():
+    k8s_client = K8sClient(url="https://k8s.local:6443", token="token")
+    k8s_client.api_client = MagicMock()
+    k8s_client.api_client.call_api.return_value = ({}, 200, {})
+    k8s_client.ensure_namespace_exists = MagicMock()
+    return k8s_client
+
+
+def test_resource_collection_path():
+    assert resource_collection_path("apps/v1", "Deployment", "app") == "/apis/apps/v1/namespaces/app/deployments"
+    assert resource_collection_path("v1", "ConfigMap", "app") == "/api/v1/namespaces/app/configmaps"
+    assert (
+        resource_collection_path("networking.k8s.io/v1", "Ingress", "app")
+        == "/apis/networking.k8s.io/v1/namespaces/app/ingresses"
+    )
+
+
+def test_apply_uses_one_patch_per_document():
+    k8s_client = make_client()
+    documents = [
+        {"apiVersion": "v1", "kind": "Service", "metadata": {"name": "web", "namespace": "app"}},
+        {
+            "apiVersion": "gateway.networking.k8s.io/v1",
+            "kind": "HTTPRoute",
+            "metadata": {"name": "web", "namespace": "app"},
+        },
+    ]
+    k8s_client.cleanup_orphaned_gateway_resources = MagicMock()
+
+    k8s_client.apply_or_delete_yaml_to_k8s(documents, operation="apply")
+
+    calls = k8s_client.api_client.call_api.call_args_list
+    assert [c.args for c in calls] == [
+        ("/api/v1/namespaces/app/services/web", "PATCH"),
+        ("/apis/gateway.networking.k8s.io/v1/namespaces/app/httproutes/web", "PATCH"),
+    ]
+    assert calls[0].kwargs["header_params"]["Content-Type"] == "application/apply-patch+yaml"
+    assert ("fieldManager", "tron") in calls[0].kwargs["query_params"]
+
+
+def test_apply_drops_replicas_of_hpa_targets():
+    k8s_client = make_client()
+    deployment = {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {"name": "web", "namespace": "app"},
+        "spec": {"replicas": 2, "template": {}},
+    }
+    hpa = {
+        "apiVersion": "autoscaling/v2",
+        "kind": "HorizontalPodAutoscaler",
+        "metadata": {"name": "web", "namespace": "app"},
+        "spec": {"scaleTargetRef": {"apiVersion": "apps/v1", "kind": "Deployment", "name": "web"}},
+    }
+    k8s_client.cleanup_orphaned_gateway_resources = MagicMock()
+
+    k8s_client.apply_or_delete_yaml_to_k8s([deployment, hpa], operation="apply")
+
+    applied_deployment = k8s_client.api_client.call_api.call_args_list[0].kwargs["body"]
+    assert "replicas" not in applied_deployment["spec"]
+    # O documento original não é alterado
+    assert deployment["spec"]["replicas"] == 2
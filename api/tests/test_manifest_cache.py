@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.services.kubernetes.application_component_manager import KubernetesApplicationComponentManager
+from app.services.kubernetes.manifest_cache import RenderedManifestCache, render_key
+
+
+TEMPLATES = [
+    SimpleNamespace(id=1, name="service", content="kind: Service\nmetadata:\n  name: {{ application.name }}\n"),
+    SimpleNamespace(id=2, name="empty", content="{% if false %}kind: ConfigMap{% endif %}"),
+]
+COMPONENT = {"name": "web", "component_uuid": "0b5c3a0e-1111-2222-3333-444455556666"}
+
+
+def render(component=COMPONENT, settings=None, templates=TEMPLATES):
+    with patch(
+        "app.services.component_template_config.ComponentTemplateConfigService.get_templates_for_component",
+        return_value=templates,
+    ):
+        return KubernetesApplicationComponentManager.instance_management(
+            component, "webapp", settings or {"env": "prod"}, db=MagicMock()
+        )
+
+
+def test_same_inputs_render_once(monkeypatch):
+    cache = RenderedManifestCache()
+    monkeypatch.setattr("app.services.kubernetes.application_component_manager.manifest_cache", cache)
+    render_template = MagicMock(wraps=KubernetesApplicationComponentManager.render_template_from_string)
+    monkeypatch.setattr(KubernetesApplicationComponentManager, "render_template_from_string", render_template)
+
+    first = render()
+    second = render()
+
+    assert first == second == [{
+        "kind": "Service",
+        "metadata": {
+            "name": "web",
+            "labels": {
+                "app.kubernetes.io/managed-by": "tron",
+                "tron.io/component-uuid": COMPONENT["component_uuid"],
+            },
+        },
+    }]
+    assert render_template.call_count == len(TEMPLATES)
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+
+def test_cached_documents_are_copies(monkeypatch):
+    cache = RenderedManifestCache()
+    monkeypatch.setattr("app.services.kubernetes.application_component_manager.manifest_cache", cache)
+
+    render()[0]["metadata"]["name"] = "changed"
+
+    assert render()[0]["metadata"]["name"] == "web"
+
+
+def test_render_key_changes_with_any_input():
+    variables = {"application": COMPONENT, "environment": {"env": "prod"}}
+    key = render_key("webapp", TEMPLATES, variables)
+
+    assert render_key("webapp", TEMPLATES, dict(reversed(list(variables.items())))) == key
+    assert render_key("worker", TEMPLATES, variables) != key
+    assert render_key("webapp", TEMPLATES[:1], variables) != key
+    assert render_key("webapp", TEMPLATES, {**variables, "environment": {"env": "dev"}}) != key
+    edited = [SimpleNamespace(id=1, name="service", content="kind: Service"), TEMPLATES[1]]
+    assert render_key("webapp", edited, variables) != key
+
+
+def test_lru_eviction():
+    cache = RenderedManifestCache(max_size=2)
+    cache.set("a", [{}])
+    cache.set("b", [{}])
+    cache.get("a")
+    cache.set("c", [{}])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [{}]
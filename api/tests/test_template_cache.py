@@ -0,0 +1,133 @@
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache
+
+from app.services.kubernetes import template_cache as template_cache_module
+from app.services.kubernetes.application_component_manager import KubernetesApplicationComponentManager
+from app.services.kubernetes.template_cache import CompiledTemplateCache
+
+
+TEMPLATE = "kind: Service\nmetadata:\n  name: {{ application.name }}\n"
+
+
+def test_compiled_template_is_reused(monkeypatch):
+    cache = CompiledTemplateCache()
+    monkeypatch.setattr(template_cache_module, "template_cache", cache)
+    compile_template = MagicMock(wraps=template_cache_module.compile_template)
+    monkeypatch.setattr(template_cache_module, "compile_template", compile_template)
+
+    for name in ("web", "api"):
+        cache.get_template(TEMPLATE, template_id=1).render(application={"name": name})
+
+    assert compile_template.call_count == 1
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+
+def test_changed_content_is_recompiled():
+    cache = CompiledTemplateCache()
+
+    first = cache.get_template(TEMPLATE, template_id=1)
+    second = cache.get_template(TEMPLATE.replace("Service", "ConfigMap"), template_id=1)
+
+    assert first is not second
+    assert second.render(application={"name": "web"}).startswith("kind: ConfigMap")
+
+
+def test_lru_eviction_and_invalidation():
+    cache = CompiledTemplateCache(max_size=2)
+    cache.get_template("a", template_id=1)
+    cache.get_template("b", template_id=2)
+    cache.get_template("a", template_id=1)
+    cache.get_template("c", template_id=3)
+
+    assert [key[0] for key in cache._entries] == [1, 3]
+
+    cache.invalidate(1)
+    assert [key[0] for key in cache._entries] == [3]
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
+
+
+def test_render_template_from_string_uses_cache(monkeypatch):
+    cache = CompiledTemplateCache()
+    monkeypatch.setattr("app.services.kubernetes.application_component_manager.template_cache", cache)
+
+    for _ in range(3):
+        rendered = KubernetesApplicationComponentManager.render_template_from_string(
+            TEMPLATE, {"application": {"name": "web"}}, template_id=7
+        )
+
+    assert rendered == {"kind": "Service", "metadata": {"name": "web"}}
+    assert cache.stats() == {"entries": 1, "hits": 2, "misses": 1}
+    assert "tron_template_cache_hits_total 2" in cache.render()
+
+
+def test_bytecode_is_shared_through_disk(monkeypatch, tmp_path):
+    writer = Environment(loader=BaseLoader(), bytecode_cache=FileSystemBytecodeCache(str(tmp_path)))
+    monkeypatch.setattr(template_cache_module, "environment", writer)
+    template_cache_module.compile_template(TEMPLATE)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # Outro worker: Environment novo sobre o mesmo diretório não recompila o template
+    reader = Environment(loader=BaseLoader(), bytecode_cache=FileSystemBytecodeCache(str(tmp_path)))
+    reader.compile = MagicMock(side_effect=AssertionError("template recompiled"))
+    monkeypatch.setattr(template_cache_module, "environment", reader)
+
+    template = template_cache_module.compile_template(TEMPLATE)
+
+    assert template.render(application={"name": "web"}).startswith("kind: Service")
+
+
+def test_prewarm_compiles_enabled_templates(monkeypatch):
+    cache = CompiledTemplateCache()
+    monkeypatch.setattr("app.services.kubernetes.application_component_manager.template_cache", cache)
+    db = MagicMock()
+    db.query.return_value.filter.return_value.distinct.return_value.all.return_value = [
+        SimpleNamespace(component_type="webapp"), SimpleNamespace(component_type="worker"),
+    ]
+    templates = {
+        "webapp": [SimpleNamespace(id=1, name="service", content=TEMPLATE)],
+        "worker": [SimpleNamespace(id=2, name="broken", content="{% if %}")],
+    }
+
+    with patch(
+        "app.services.component_template_config.ComponentTemplateConfigService.get_templates_for_component",
+        side_effect=lambda db, component_type: templates[component_type],
+    ):
+        compiled = KubernetesApplicationComponentManager.prewarm_templates(db)
+
+    assert compiled == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_bytecode_cache_directory_is_private(tmp_path):
+    directory = tmp_path / "bytecode"
+
+    assert template_cache_module._create_bytecode_cache(str(directory)) is not None
+    assert directory.stat().st_mode & 0o777 == 0o700
+
+
+def test_bytecode_cache_rejects_shared_directory(tmp_path):
+    directory = tmp_path / "bytecode"
+    directory.mkdir(mode=0o777)
+    directory.chmod(0o777)
+
+    assert template_cache_module._create_bytecode_cache(str(directory)) is None
+
+
+def test_bytecode_cache_rejects_symlink(tmp_path):
+    target = tmp_path / "target"
+    target.mkdir(mode=0o700)
+    link = tmp_path / "bytecode"
+    link.symlink_to(target)
+
+    assert template_cache_module._create_bytecode_cache(str(link)) is None
+
+
+def test_bytecode_cache_rejects_foreign_owner(tmp_path, monkeypatch):
+    other_uid = os.getuid() + 1
+    monkeypatch.setattr(template_cache_module.os, "getuid", lambda: other_uid)
+
+    assert template_cache_module._create_bytecode_cache(str(tmp_path / "bytecode")) is None
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import app.schemas.template as TemplateSchema
+from app.services import template_set_cache as template_set_cache_module
+from app.services.component_template_config import ComponentTemplateConfigService
+from app.services.template import TemplateService
+from app.models.cache_version import CacheVersion
+from app.services.template_set_cache import TemplateSetCache, bump_template_set_version
+
+
+def make_template(name, content, id=1):
+    return SimpleNamespace(id=id, uuid=uuid4(), name=name, category="webapp", content=content)
+
+
+def test_template_set_is_loaded_once_per_version():
+    cache = TemplateSetCache()
+    load = MagicMock(return_value=[make_template("deployment", "kind: Deployment"), make_template("service", "kind: Service", 2)])
+
+    with patch.object(template_set_cache_module, "get_template_set_version", return_value=3):
+        for _ in range(3):
+            templates = cache.get(MagicMock(), "webapp", load)
+
+    load.assert_called_once()
+    assert [template.name for template in templates] == ["deployment", "service"]
+    assert templates[0].content == "kind: Deployment"
+
+
+def test_new_version_reloads_template_set():
+    cache = TemplateSetCache()
+    load = MagicMock(side_effect=[[make_template("service", "kind: Service")], [make_template("service", "kind: ConfigMap")]])
+    versions = iter([1, 1, 2])
+
+    with patch.object(template_set_cache_module, "get_template_set_version", side_effect=lambda db: next(versions)):
+        contents = [cache.get(MagicMock(), "webapp", load)[0].content for _ in range(3)]
+
+    assert contents == ["kind: Service", "kind: Service", "kind: ConfigMap"]
+    assert load.call_count == 2
+
+
+def test_component_types_are_cached_separately():
+    cache = TemplateSetCache()
+    load = MagicMock(side_effect=lambda db, component_type: [make_template(component_type, "")])
+
+    with patch.object(template_set_cache_module, "get_template_set_version", return_value=1):
+        assert cache.get(MagicMock(), "webapp", load)[0].name == "webapp"
+        assert cache.get(MagicMock(), "worker", load)[0].name == "worker"
+
+
+def test_get_templates_for_component_uses_cache():
+    with patch.object(template_set_cache_module.template_set_cache, "get", return_value=["cached"]) as get:
+        assert ComponentTemplateConfigService.get_templates_for_component(MagicMock(), "webapp") == ["cached"]
+
+    assert get.call_args.args[1] == "webapp"
+
+
+def test_template_writes_bump_version_before_commit():
+    db = MagicMock()
+    db_template = make_template("service", "kind: Service")
+    db.query.return_value.filter.return_value.first.return_value = db_template
+    calls = []
+    db.commit.side_effect = lambda: calls.append("commit")
+
+    with patch("app.services.template.bump_template_set_version", side_effect=lambda db: calls.append("bump")):
+        TemplateService.update_template(db, db_template.uuid, TemplateSchema.TemplateUpdate(content="kind: ConfigMap"))
+
+    assert calls == ["bump", "commit"]
+
+
+def test_bump_template_set_version_upserts():
+    engine = create_engine("sqlite:///:memory:")
+    CacheVersion.__table__.create(bind=engine)
+    db = sessionmaker(bind=engine)()
+    version = select(CacheVersion.__table__.c.version)
+    try:
+        # Sem a linha semeada pela migration (banco criado por create_all)
+        bump_template_set_version(db)
+        db.commit()
+        assert db.execute(version).scalar_one() == 1
+
+        bump_template_set_version(db)
+        db.commit()
+        assert db.execute(version).scalar_one() == 2
+    finally:
+        db.close()
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.dependencies.auth import authenticate_websocket, websocket_credentials, websocket_subprotocol
+from app.models.user import User, UserRole
+from app.services.kubernetes.pod_exec import load_deployment
+
+
+def make_websocket(headers=None, subprotocols=(), query_params=None):
+    return SimpleNamespace(
+        headers=headers or {},
+        scope={"subprotocols": list(subprotocols)},
+        query_params=query_params or {},
+    )
+
+
+def test_credentials_from_subprotocols():
+    websocket = make_websocket(subprotocols=["tron.exec", "bearer.eyJhbGciOi.payload.sig"])
+
+    assert websocket_credentials(websocket) == (None, "eyJhbGciOi.payload.sig")
+    assert websocket_subprotocol(websocket) == "tron.exec"
+
+    websocket = make_websocket(subprotocols=["tron.exec", "tron-token.abc123"])
+    assert websocket_credentials(websocket) == ("abc123", None)
+
+
+def test_credentials_from_headers():
+    websocket = make_websocket(headers={"authorization": "Bearer jwt", "x-tron-token": "abc"})
+
+    assert websocket_credentials(websocket) == ("abc", "jwt")
+    assert websocket_subprotocol(websocket) is None
+
+
+def test_query_params_are_not_accepted():
+    websocket = make_websocket(query_params={"token": "jwt", "x_tron_token": "abc"})
+
+    assert websocket_credentials(websocket) == (None, None)
+
+
+def test_authenticate_websocket_closes_its_session():
+    db = MagicMock()
+    user = MagicMock(spec=User)
+    user.role = UserRole.ADMIN.value
+    websocket = make_websocket(subprotocols=["tron.exec", "bearer.jwt"])
+
+    with patch("app.dependencies.auth.SessionLocal", return_value=db), \
+            patch("app.dependencies.auth.authenticate", return_value=user) as authenticate:
+        assert authenticate_websocket(websocket, [UserRole.ADMIN]) is user
+
+    authenticate.assert_called_once_with(db, None, "jwt")
+    db.close.assert_called_once()
+
+
+def test_load_deployment_closes_session_before_returning():
+    db = MagicMock()
+    get_deployment = MagicMock(return_value=("cluster", "app", "web"))
+
+    with patch("app.services.kubernetes.pod_exec.SessionLocal", return_value=db):
+        assert load_deployment(get_deployment, "uuid") == ("cluster", "app", "web")
+
+    get_deployment.assert_called_once_with(db, "uuid")
+    db.close.assert_called_once()